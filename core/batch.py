@@ -0,0 +1,156 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from core.engine import CompiledTable, HALTED, NO_RULE, LIMIT
+from core.machine import no_rule_message, step_limit_message
+from core.tape import Direction
+
+
+# Пакетное исполнение одной машины на множестве входов в ногу (lockstep).
+# Все экземпляры хранятся массивами: вектор состояний, вектор головок и
+# матрица ленты (строка — экземпляр, ячейка — id символа). Шаг для всех живых
+# экземпляров — одна выборка по таблице переходов и одна запись в матрицу;
+# остановившиеся экземпляры отбрасываются из рабочих векторов.
+class BatchSimulator:
+    def __init__(
+            self,
+            initial_state: str,
+            final_states: Set[str],
+            transition_table: Dict[Tuple[str, str], Tuple[str, Direction, str]],
+            blank_symbol: str = "_",
+            max_steps: int = 1000
+    ):
+        if np is None:
+            raise RuntimeError("Для пакетного исполнения требуется NumPy")
+        self.initial_state = initial_state
+        self.final_states = final_states
+        self.transition_table = transition_table
+        self.blank = blank_symbol
+        self.max_steps = max_steps
+
+    def _compile(self, inputs: List[str]) -> CompiledTable:
+        symbols = set()
+        for input_str in inputs:
+            symbols.update(input_str)
+        table = CompiledTable(
+            self.transition_table,
+            self.final_states,
+            self.blank,
+            extra_states=(self.initial_state,),
+            extra_symbols=sorted(symbols)
+        )
+        # Плоские массивы действий по индексу state * width + symbol, где state —
+        # номер состояния (а не смещение строки, как в CompiledTable.actions)
+        size = len(table.actions)
+        self._has_rule = np.zeros(size, dtype=bool)
+        self._write = np.zeros(size, dtype=np.int32)
+        self._move = np.zeros(size, dtype=np.int64)
+        self._next = np.zeros(size, dtype=np.int64)
+        for idx, action in enumerate(table.actions):
+            if action is not None:
+                write, move, next_row = action
+                self._has_rule[idx] = True
+                self._write[idx] = write
+                self._move[idx] = move
+                self._next[idx] = next_row // table.width
+        self._is_final = np.array(table.is_final[::table.width], dtype=bool)
+        return table
+
+    def run(self, inputs: Iterable[str]) -> List[dict]:
+        inputs = list(inputs)
+        table = self._compile(inputs)
+        count = len(inputs)
+        width = table.width
+        dtype = np.uint8 if width <= 256 else np.int32
+
+        # Головка сдвигается не более чем на клетку за шаг, поэтому запаса margin
+        # с каждой стороны хватает на margin шагов без проверки границ
+        length = max((len(s) for s in inputs), default=0)
+        margin = min(max(self.max_steps, 1), 64)
+        tape = np.zeros((count, length + 2 * margin), dtype=dtype)
+        ids = table.symbol_ids
+        for i, input_str in enumerate(inputs):
+            tape[i, margin:margin + len(input_str)] = [ids[ch] for ch in input_str]
+        origin = margin
+
+        status = np.full(count, LIMIT, dtype=np.int8)
+        final_state = np.zeros(count, dtype=np.int64)
+        final_pos = np.zeros(count, dtype=np.int64)
+        steps_done = np.zeros(count, dtype=np.int64)
+
+        rows = np.arange(count)
+        state = np.full(count, table.state_ids[self.initial_state], dtype=np.int64)
+        pos = np.full(count, origin, dtype=np.int64)
+
+        step = 0
+        while rows.size and step < self.max_steps:
+            room = min(int(pos.min()), tape.shape[1] - 1 - int(pos.max()))
+            if room == 0:
+                extra = tape.shape[1]
+                grown = np.zeros((count, tape.shape[1] + 2 * extra), dtype=dtype)
+                grown[:, extra:extra + tape.shape[1]] = tape
+                tape = grown
+                origin += extra
+                pos += extra
+                final_pos += extra
+                continue
+
+            for _ in range(min(room, self.max_steps - step)):
+                idx = state * width + tape[rows, pos]
+                ok = self._has_rule[idx]
+                if not ok.all():
+                    stopped = ~ok
+                    status[rows[stopped]] = NO_RULE
+                    final_state[rows[stopped]] = state[stopped]
+                    final_pos[rows[stopped]] = pos[stopped]
+                    steps_done[rows[stopped]] = step
+                    rows, state, pos, idx = rows[ok], state[ok], pos[ok], idx[ok]
+                    if not rows.size:
+                        break
+
+                tape[rows, pos] = self._write[idx]
+                pos = pos + self._move[idx]
+                state = self._next[idx]
+                step += 1
+
+                done = self._is_final[state]
+                if done.any():
+                    status[rows[done]] = HALTED
+                    final_state[rows[done]] = state[done]
+                    final_pos[rows[done]] = pos[done]
+                    steps_done[rows[done]] = step
+                    live = ~done
+                    rows, state, pos = rows[live], state[live], pos[live]
+                    if not rows.size:
+                        break
+
+        final_state[rows] = state
+        final_pos[rows] = pos
+        steps_done[rows] = step
+
+        symbols = table.symbols
+        results = []
+        for i, input_str in enumerate(inputs):
+            cells = np.flatnonzero(tape[i])
+            output = ""
+            if cells.size:
+                output = "".join(symbols[c] for c in tape[i, cells[0]:cells[-1] + 1].tolist())
+            state_name = table.states[final_state[i]]
+            error = None
+            if status[i] == NO_RULE:
+                error = no_rule_message(state_name, symbols[tape[i, final_pos[i]]])
+            elif status[i] == LIMIT:
+                error = step_limit_message(self.max_steps)
+            results.append({
+                "input": input_str,
+                "state": state_name,
+                "tape": output,
+                "head": int(final_pos[i]) - origin,
+                "steps": int(steps_done[i]),
+                "error": error
+            })
+        return results
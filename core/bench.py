@@ -0,0 +1,348 @@
+"""Замеры производительности движков и лент.
+
+    python -m core.bench -o results.json
+
+прогоняет эталонные машины на всех движках и бэкендах ленты и записывает
+шаги в секунду, пиковую память и стоимость операций ленты в JSON;
+
+    python -m core.bench -o results.json --baseline baseline.json --threshold 10
+
+дополнительно сравнивает результаты с сохранённым прогоном и завершается
+с кодом 1, если какой-либо показатель ухудшился больше чем на 10%.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from core.project import build_machine
+from core.tape import TAPE_BACKENDS, Direction, make_tape
+from core.trace import TRACE_OFF
+
+R, L, S = Direction.RIGHT, Direction.LEFT, Direction.STAY
+
+ENGINES = ("interpreter", "compiled", "macro", "codegen")
+MIN_TIME = 0.5
+THRESHOLD = 10.0
+TAPE_OPS = 100000
+
+# Двоичный инкремент: на входе из одних единиц перенос идёт через всё число
+INCREMENT = {
+    ('Q0', '0'): ('0', R, 'Q0'),
+    ('Q0', '1'): ('1', R, 'Q0'),
+    ('Q0', '_'): ('_', L, 'Q1'),
+    ('Q1', '1'): ('0', L, 'Q1'),
+    ('Q1', '0'): ('1', S, 'Qa'),
+    ('Q1', '_'): ('1', S, 'Qa'),
+}
+
+# Унарное сложение: 1^a 0 1^b -> 1^(a+b)
+UNARY_ADD = {
+    ('Q0', '1'): ('1', R, 'Q0'),
+    ('Q0', '0'): ('1', R, 'Q1'),
+    ('Q1', '1'): ('1', R, 'Q1'),
+    ('Q1', '_'): ('_', L, 'Q2'),
+    ('Q2', '1'): ('_', L, 'Q3'),
+    ('Q3', '1'): ('1', L, 'Q3'),
+    ('Q3', '_'): ('_', R, 'Qa'),
+}
+
+# Палиндром на одной ленте за O(n^2): стираем первый символ, сравниваем
+# с последним, стираем его и возвращаемся к началу
+PALINDROME = {
+    ('Q0', '0'): ('_', R, 'Q1'),
+    ('Q0', '1'): ('_', R, 'Q2'),
+    ('Q0', '_'): ('_', S, 'Qa'),
+    ('Q1', '0'): ('0', R, 'Q1'),
+    ('Q1', '1'): ('1', R, 'Q1'),
+    ('Q1', '_'): ('_', L, 'Q3'),
+    ('Q2', '0'): ('0', R, 'Q2'),
+    ('Q2', '1'): ('1', R, 'Q2'),
+    ('Q2', '_'): ('_', L, 'Q4'),
+    ('Q3', '0'): ('_', L, 'Q5'),
+    ('Q3', '_'): ('_', S, 'Qa'),
+    ('Q4', '1'): ('_', L, 'Q5'),
+    ('Q4', '_'): ('_', S, 'Qa'),
+    ('Q5', '0'): ('0', L, 'Q5'),
+    ('Q5', '1'): ('1', L, 'Q5'),
+    ('Q5', '_'): ('_', R, 'Q0'),
+}
+
+# Чемпионы «усердного бобра»: 4 состояния — 107 шагов, 5 состояний — 47 176 870 шагов
+BUSY_BEAVER_4 = {
+    ('Q0', '_'): ('1', R, 'Q1'),
+    ('Q0', '1'): ('1', L, 'Q1'),
+    ('Q1', '_'): ('1', L, 'Q0'),
+    ('Q1', '1'): ('_', L, 'Q2'),
+    ('Q2', '_'): ('1', R, 'Qa'),
+    ('Q2', '1'): ('1', L, 'Q3'),
+    ('Q3', '_'): ('1', R, 'Q3'),
+    ('Q3', '1'): ('_', R, 'Q0'),
+}
+
+BUSY_BEAVER_5 = {
+    ('Q0', '_'): ('1', R, 'Q1'),
+    ('Q0', '1'): ('1', L, 'Q2'),
+    ('Q1', '_'): ('1', R, 'Q2'),
+    ('Q1', '1'): ('1', R, 'Q1'),
+    ('Q2', '_'): ('1', R, 'Q3'),
+    ('Q2', '1'): ('_', L, 'Q4'),
+    ('Q3', '_'): ('1', L, 'Q0'),
+    ('Q3', '1'): ('1', L, 'Q3'),
+    ('Q4', '_'): ('1', R, 'Qa'),
+    ('Q4', '1'): ('_', L, 'Q0'),
+}
+
+# Челнок: дописывает единицу то справа, то слева от растущего блока,
+# каждый раз проходя его целиком; не останавливается
+SWEEP = {
+    ('Q0', '1'): ('1', R, 'Q0'),
+    ('Q0', '_'): ('1', L, 'Q1'),
+    ('Q1', '1'): ('1', L, 'Q1'),
+    ('Q1', '_'): ('1', R, 'Q0'),
+}
+
+
+# Эталонная машина: таблица, алфавит и функция масштаба -> (вход, ограничение шагов)
+class Benchmark:
+    def __init__(self, name: str, transitions: dict, alphabet, workload):
+        self.name = name
+        self.transitions = transitions
+        self.alphabet = list(alphabet)
+        self.workload = workload
+
+    def project(self) -> dict:
+        return {"alphabet": self.alphabet, "transitions": self.transitions, "tape_count": 1}
+
+
+BENCHMARKS = [
+    Benchmark("increment", INCREMENT, "01", lambda scale: ("1" * int(25000 * scale), 10 ** 9)),
+    Benchmark(
+        "unary_add", UNARY_ADD, "01",
+        lambda scale: ("1" * int(12500 * scale) + "0" + "1" * int(12500 * scale), 10 ** 9)
+    ),
+    Benchmark(
+        "palindrome", PALINDROME, "01",
+        lambda scale: ("011" * int(50 * scale) + "110" * int(50 * scale), 10 ** 9)
+    ),
+    Benchmark("busy_beaver_4", BUSY_BEAVER_4, "1", lambda scale: ("", 1000)),
+    Benchmark("busy_beaver_5", BUSY_BEAVER_5, "1", lambda scale: ("", int(200000 * scale))),
+    Benchmark("sweep", SWEEP, "1", lambda scale: ("", int(200000 * scale))),
+]
+
+
+def _outcome(tm) -> tuple:
+    return tm.current_state, tm.tape.head, str(tm.tape), tm.steps_done, tm.error_message
+
+
+def run_case(benchmark: Benchmark, engine: str, backend: str, scale: float = 1.0,
+             min_time: float = MIN_TIME, memory: bool = True) -> dict:
+    # Машина собирается заново на каждый прогон, поэтому в замер попадает и
+    # компиляция таблицы; короткие машины прогоняются, пока не наберётся min_time
+    input_str, max_steps = benchmark.workload(scale)
+    project = benchmark.project()
+
+    def build():
+        return build_machine(project, input_str, max_steps, engine, backend, trace=TRACE_OFF)
+
+    runs = steps = 0
+    elapsed = 0.0
+    while runs == 0 or elapsed < min_time:
+        tm = build()
+        start = time.perf_counter()
+        tm.run()
+        elapsed += time.perf_counter() - start
+        steps += tm.steps_done
+        runs += 1
+    outcome = _outcome(tm)
+
+    peak = None
+    if memory:
+        # Отдельный прогон: tracemalloc заметно замедляет исполнение
+        tracemalloc.start()
+        try:
+            build().run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "machine": benchmark.name,
+        "engine": engine,
+        "backend": backend,
+        "steps": outcome[3],
+        "runs": runs,
+        "seconds": elapsed,
+        "steps_per_sec": steps / elapsed if elapsed else None,
+        "peak_bytes": peak,
+        "halted": not outcome[4],
+        "outcome": outcome
+    }
+
+
+def tape_costs(backend: str, ops: int = TAPE_OPS) -> dict:
+    # Стоимость элементарных операций ленты в наносекундах: read/write/move — на
+    # операцию, load/image — на ячейку ленты длиной ops
+    content = "1_1" * (ops // 3)
+    tape = make_tape("", "_", "1_", backend)
+    tape.load(content)
+    costs = {}
+
+    def measure(name, body, count):
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            body()
+            spent = time.perf_counter() - start
+            best = spent if best is None else min(best, spent)
+        costs[name] = best * 1e9 / count
+
+    def read():
+        for _ in range(ops):
+            tape.read()
+
+    def write():
+        for i in range(ops // 2):
+            tape.write("1")
+            tape.write("_")
+
+    def move():
+        for _ in range(ops // 2):
+            tape.move(R)
+        for _ in range(ops // 2):
+            tape.move(L)
+
+    measure("read", read, ops)
+    measure("write", write, ops // 2 * 2)
+    measure("move", move, ops // 2 * 2)
+    measure("load", lambda: tape.load(content), len(content))
+    measure("image", tape.image, len(content))
+    return costs
+
+
+def _backend_supports(benchmark: Benchmark, backend: str) -> bool:
+    try:
+        make_tape("", "_", benchmark.alphabet, backend)
+    except ValueError:
+        return False
+    return True
+
+
+def run_suite(machines=None, engines=ENGINES, backends=tuple(TAPE_BACKENDS), scale: float = 1.0,
+              min_time: float = MIN_TIME, memory: bool = True, tape_ops: int = TAPE_OPS, log=None) -> dict:
+    cases = []
+    mismatches = []
+    for benchmark in BENCHMARKS:
+        if machines and benchmark.name not in machines:
+            continue
+        reference = None
+        for engine in engines:
+            for backend in backends:
+                if not _backend_supports(benchmark, backend):
+                    continue
+                case = run_case(benchmark, engine, backend, scale, min_time, memory)
+                outcome = case.pop("outcome")
+                # Все движки и ленты обязаны приходить к одной конфигурации
+                if reference is None:
+                    reference = outcome
+                elif outcome != reference:
+                    mismatches.append(case_key(case))
+                cases.append(case)
+                if log is not None:
+                    log(f"{case_key(case)}: {case['steps_per_sec']:.0f} шагов/с")
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "cases": cases,
+        "tape_ops": {backend: tape_costs(backend, tape_ops) for backend in backends},
+        "mismatches": mismatches
+    }
+
+
+def case_key(case: dict) -> str:
+    return f"{case['machine']}/{case['engine']}/{case['backend']}"
+
+
+def _metrics(results: dict):
+    # (ключ, значение, True если больше — лучше)
+    for case in results.get("cases", []):
+        key = case_key(case)
+        yield f"{key}:steps_per_sec", case.get("steps_per_sec"), True
+        yield f"{key}:peak_bytes", case.get("peak_bytes"), False
+    for backend, costs in results.get("tape_ops", {}).items():
+        for op, cost in costs.items():
+            yield f"tape/{backend}/{op}:ns", cost, False
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD) -> list:
+    # Ухудшения больше threshold процентов относительно baseline
+    old = {key: value for key, value, _ in _metrics(baseline)}
+    regressions = []
+    for key, value, higher_is_better in _metrics(results):
+        before = old.get(key)
+        if not before or value is None:
+            continue
+        change = (value - before) / before * 100
+        worse = -change if higher_is_better else change
+        if worse > threshold:
+            regressions.append({"metric": key, "baseline": before, "value": value, "change": change})
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.bench", description="Замеры производительности")
+    parser.add_argument("-o", "--output", default="-", help="файл для результатов JSON (- для stdout)")
+    parser.add_argument("--baseline", help="результаты прошлого прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="допустимое ухудшение, %%")
+    parser.add_argument("--machines", nargs="+", choices=[b.name for b in BENCHMARKS], default=None)
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--backends", nargs="+", choices=list(TAPE_BACKENDS), default=list(TAPE_BACKENDS))
+    parser.add_argument("--scale", type=float, default=1.0, help="множитель размера входов и ограничений шагов")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="минимальное время замера, с")
+    parser.add_argument("--no-memory", action="store_true", help="не измерять пиковую память")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка чтения файла: {e}", file=sys.stderr)
+            return 2
+
+    results = run_suite(
+        args.machines, args.engines, args.backends, args.scale, args.min_time,
+        memory=not args.no_memory, log=lambda line: print(line, file=sys.stderr)
+    )
+    code = 0
+    if results["mismatches"]:
+        print("Результаты движков расходятся: " + ", ".join(results["mismatches"]), file=sys.stderr)
+        code = 1
+    if baseline is not None:
+        results["regressions"] = compare(results, baseline, args.threshold)
+        for regression in results["regressions"]:
+            print(
+                f"Ухудшение {regression['metric']}: {regression['baseline']:.4g} -> "
+                f"{regression['value']:.4g} ({regression['change']:+.1f}%)",
+                file=sys.stderr
+            )
+        if results["regressions"]:
+            code = 1
+
+    text = json.dumps(results, ensure_ascii=False, indent=4)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
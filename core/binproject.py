@@ -0,0 +1,383 @@
+import json
+import re
+import struct
+import zlib
+from array import array
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+from core.tape import EXPORT_CHUNK, Direction
+
+# Двоичный формат проекта. После заголовка идут секции (тег, длина, данные),
+# поэтому файл читается потоком, а незнакомые секции пропускаются:
+#   META — JSON с числом лент, заметками и, в контрольной точке, конфигурацией
+#          исполнения (см. core.checkpoint);
+#   SYMB — таблица символов (id 0 — пустой символ), дальше символы задаются id;
+#   ALPH — алфавит как список id;
+#   STAT — таблица состояний;
+#   RULE — правила: состояние, k символов, k новых символов, k сдвигов, новое состояние;
+#   TAPE — по одной на ленту: головка и непустые отрезки ленты. Пробелы из
+#          пустых символов длиннее GAP не хранятся, длинные отрезки сжимаются zlib.
+#          Отрезки идут по возрастанию позиций и при чтении не склеиваются.
+MAGIC = b"TMBIN\0"
+VERSION = 1
+
+GAP = 16
+COMPRESS_MIN = 4096
+
+_HEADER = struct.Struct("<6sH")
+_SECTION = struct.Struct("<4sQ")
+_COUNT = struct.Struct("<I")
+_TAPE = struct.Struct("<qqIB")
+_SEGMENT = struct.Struct("<qQBQ")
+
+_OFFSETS = {Direction.LEFT: -1, Direction.STAY: 0, Direction.RIGHT: 1}
+_DIRECTIONS = {offset: direction for direction, offset in _OFFSETS.items()}
+
+# Отрезок ленты (позиция начала, содержимое): по краям непустые символы,
+# внутри пробелы из пустых символов короче GAP
+Segment = Tuple[int, str]
+# (отрезки ленты по возрастанию позиций, головка)
+TapeImage = Tuple[List[Segment], int]
+
+
+class BinaryFormatError(ValueError):
+    pass
+
+
+def is_binary(f: BinaryIO) -> bool:
+    # Проверяет сигнатуру и возвращает поток в исходное положение
+    start = f.tell()
+    magic = f.read(len(MAGIC))
+    f.seek(start)
+    return magic == MAGIC
+
+
+def _pack_strings(strings) -> bytes:
+    parts = [_COUNT.pack(len(strings))]
+    for s in strings:
+        data = s.encode("utf-8")
+        parts.append(struct.pack("<H", len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def _unpack_strings(data: bytes) -> List[str]:
+    (count,), pos = _COUNT.unpack_from(data), _COUNT.size
+    result = []
+    for _ in range(count):
+        (size,) = struct.unpack_from("<H", data, pos)
+        pos += 2
+        result.append(data[pos:pos + size].decode("utf-8"))
+        pos += size
+    return result
+
+
+def _rule_struct(tape_count: int) -> struct.Struct:
+    k = tape_count
+    return struct.Struct(f"<I{k}I{k}I{k}bI")
+
+
+def _segments(content: str, blank: str) -> Iterator[Segment]:
+    # Непустые отрезки содержимого: пробелы короче GAP остаются внутри отрезка
+    start = len(content) - len(content.lstrip(blank))
+    end = len(content.rstrip(blank))
+    gaps = re.compile(f"(?:{re.escape(blank)}){{{GAP},}}")
+    for gap in gaps.finditer(content, start, end):
+        yield start, content[start:gap.start()]
+        start = gap.end()
+    if start < end:
+        yield start, content[start:end]
+
+
+def content_segments(content: str, origin: int = 0, blank: str = "_") -> List[Segment]:
+    # Отрезки строки, начинающейся с ячейки origin
+    return [(origin + start, segment) for start, segment in _segments(content, blank)]
+
+
+def tape_segments(tape, chunk: int = EXPORT_CHUNK) -> List[Segment]:
+    # Отрезки ленты: содержимое читается кусками по chunk ячеек, а длинные
+    # пустые промежутки перескакиваются через next_nonblank, не разворачиваясь в строку
+    extent = tape.extent()
+    if extent is None:
+        return []
+    blank = tape.blank
+    hi = extent[1]
+    result = []
+    pos = extent[0]
+    while pos is not None and pos <= hi:
+        stop = min(pos + chunk, hi + 1)
+        for start, segment in _segments(tape.span(pos, stop - 1), blank):
+            start += pos
+            if result and start - (result[-1][0] + len(result[-1][1])) < GAP:
+                prev_start, prev = result[-1]
+                result[-1] = (prev_start, prev + blank * (start - prev_start - len(prev)) + segment)
+            else:
+                result.append((start, segment))
+        pos = tape.next_nonblank(stop - 1)
+    return result
+
+
+def segments_content(segments: List[Segment], blank: str = "_") -> Tuple[int, str]:
+    # Обратно в (позиция начала, содержимое) — для форматов, хранящих ленту строкой
+    if not segments:
+        return 0, ""
+    origin = segments[0][0]
+    parts = []
+    end = origin
+    for start, segment in segments:
+        parts.append(blank * (start - end))
+        parts.append(segment)
+        end = start + len(segment)
+    return origin, "".join(parts)
+
+
+def _write_section(f: BinaryIO, tag: bytes, data: bytes):
+    f.write(_SECTION.pack(tag, len(data)))
+    f.write(data)
+
+
+def _begin_section(f: BinaryIO, tag: bytes) -> Tuple[bytes, int]:
+    # Длина секции дописывается в _end_section, когда данные уже записаны
+    start = f.tell()
+    f.write(_SECTION.pack(tag, 0))
+    return tag, start
+
+
+def _end_section(f: BinaryIO, section: Tuple[bytes, int]):
+    tag, start = section
+    end = f.tell()
+    f.seek(start)
+    f.write(_SECTION.pack(tag, end - start - _SECTION.size))
+    f.seek(end)
+
+
+def _narrow(symbols: List[str]) -> bool:
+    # Односимвольные символы и id в байт: кодирование через str.translate
+    return len(symbols) <= 256 and all(len(symbol) == 1 for symbol in symbols)
+
+
+def _encoder(symbol_ids: Dict[str, int], wide: bool):
+    if not wide and _narrow(list(symbol_ids)):
+        table = str.maketrans({symbol: chr(sid) for symbol, sid in symbol_ids.items()})
+        return lambda segment: segment.translate(table).encode("latin-1")
+    if wide:
+        return lambda segment: array("I", map(symbol_ids.__getitem__, segment)).tobytes()
+    return lambda segment: bytes(map(symbol_ids.__getitem__, segment))
+
+
+def _decoder(symbols: List[str], width: int):
+    if width == 1 and _narrow(symbols):
+        table = str.maketrans({chr(sid): symbol for sid, symbol in enumerate(symbols)})
+        known = bytes(range(len(symbols)))
+
+        def decode(data: bytes) -> str:
+            if data.translate(None, known):
+                raise BinaryFormatError("Неизвестный id символа на ленте")
+            return data.decode("latin-1").translate(table)
+        return decode
+
+    def decode_ids(data: bytes) -> str:
+        try:
+            return "".join(map(symbols.__getitem__, array("I", data) if width == 4 else data))
+        except IndexError:
+            raise BinaryFormatError("Неизвестный id символа на ленте") from None
+    return decode_ids
+
+
+def write_binary(
+        f: BinaryIO,
+        alphabet,
+        tapes: List[TapeImage],
+        transitions: dict,
+        notes: dict,
+        tape_count: int = 1,
+        blank: str = "_",
+        execution: dict = None
+):
+    symbols = [blank]
+    symbol_ids = {blank: 0}
+
+    def symbol_id(symbol: str) -> int:
+        sid = symbol_ids.get(symbol)
+        if sid is None:
+            sid = symbol_ids[symbol] = len(symbols)
+            symbols.append(symbol)
+        return sid
+
+    states = []
+    state_ids = {}
+
+    def state_id(state: str) -> int:
+        sid = state_ids.get(state)
+        if sid is None:
+            sid = state_ids[state] = len(states)
+            states.append(state)
+        return sid
+
+    for symbol in alphabet:
+        symbol_id(symbol)
+    for segments, _ in tapes:
+        for _, segment in segments:
+            for ch in set(segment):
+                symbol_id(ch)
+
+    rule_struct = _rule_struct(tape_count)
+    rules = bytearray()
+    for (state, symbol), (new_symbol, direction, next_state) in transitions.items():
+        if tape_count == 1:
+            symbol, new_symbol, direction = (symbol,), (new_symbol,), (direction,)
+        rules += rule_struct.pack(
+            state_id(state),
+            *map(symbol_id, symbol),
+            *map(symbol_id, new_symbol),
+            *map(_OFFSETS.__getitem__, direction),
+            state_id(next_state)
+        )
+
+    f.write(_HEADER.pack(MAGIC, VERSION))
+    meta = {"tape_count": tape_count, "notes": notes}
+    if execution is not None:
+        meta["execution"] = execution
+    _write_section(f, b"META", json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    _write_section(f, b"SYMB", _pack_strings(symbols))
+    _write_section(f, b"ALPH", _COUNT.pack(len(alphabet)) + array("I", map(symbol_id, alphabet)).tobytes())
+    _write_section(f, b"STAT", _pack_strings(states))
+    _write_section(f, b"RULE", _COUNT.pack(len(transitions)) + bytes(rules))
+
+    wide = len(symbols) > 256
+    encode = _encoder(symbol_ids, wide)
+    for segments, head in tapes:
+        # Отрезки пишутся сразу в поток; число отрезков и длина секции
+        # дописываются в заголовок после них
+        origin = segments[0][0] if segments else 0
+        section = _begin_section(f, b"TAPE")
+        header = f.tell()
+        f.write(_TAPE.pack(head, origin, 0, 4 if wide else 1))
+        count = 0
+        for start, segment in segments:
+            data = encode(segment)
+            flags = 0
+            if len(data) >= COMPRESS_MIN:
+                packed = zlib.compress(data, 1)
+                if len(packed) < len(data):
+                    data, flags = packed, 1
+            f.write(_SEGMENT.pack(start, len(segment), flags, len(data)))
+            f.write(data)
+            count += 1
+        end = f.tell()
+        f.seek(header)
+        f.write(_TAPE.pack(head, origin, count, 4 if wide else 1))
+        f.seek(end)
+        _end_section(f, section)
+
+
+def iter_sections(f: BinaryIO) -> Iterator[Tuple[bytes, int]]:
+    # Перебирает секции потока: (тег, длина). Если вызывающий код не прочитал
+    # данные секции, они пропускаются перед переходом к следующей.
+    header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise BinaryFormatError("Файл слишком короткий")
+    magic, version = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise BinaryFormatError("Неизвестный формат файла")
+    if version > VERSION:
+        raise BinaryFormatError(f"Версия формата {version} не поддерживается")
+    while True:
+        raw = f.read(_SECTION.size)
+        if not raw:
+            return
+        if len(raw) < _SECTION.size:
+            raise BinaryFormatError("Файл обрывается в заголовке секции")
+        tag, size = _SECTION.unpack(raw)
+        end = f.tell() + size
+        yield tag, size
+        if f.tell() != end:
+            f.seek(end)
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise BinaryFormatError("Файл обрывается внутри секции")
+    return data
+
+
+def read_tape_segments(f: BinaryIO, symbols: List[str]) -> Tuple[int, int, Iterator[Tuple[int, str]]]:
+    # Читает заголовок секции TAPE; отрезки (позиция, содержимое) отдаются по одному
+    head, origin, count, width = _TAPE.unpack(_read_exact(f, _TAPE.size))
+    if width not in (1, 4):
+        raise BinaryFormatError("Некорректная ширина id символов ленты")
+
+    decode = _decoder(symbols, width)
+
+    def segments():
+        for _ in range(count):
+            start, length, flags, size = _SEGMENT.unpack(_read_exact(f, _SEGMENT.size))
+            data = _read_exact(f, size)
+            if flags & 1:
+                data = zlib.decompress(data)
+            if len(data) != length * width:
+                raise BinaryFormatError("Длина отрезка ленты не совпадает с заголовком")
+            yield start, decode(data)
+
+    return head, origin, segments()
+
+
+def read_binary(f: BinaryIO, blank: str = "_") -> dict:
+    meta = {}
+    symbols = [blank]
+    alphabet = []
+    states = []
+    transitions = {}
+    tapes = []
+    try:
+        for tag, size in iter_sections(f):
+            if tag == b"META":
+                meta = json.loads(_read_exact(f, size).decode("utf-8"))
+            elif tag == b"SYMB":
+                symbols = _unpack_strings(_read_exact(f, size))
+            elif tag == b"ALPH":
+                data = _read_exact(f, size)
+                alphabet = [symbols[i] for i in array("I", data[_COUNT.size:])]
+            elif tag == b"STAT":
+                states = _unpack_strings(_read_exact(f, size))
+            elif tag == b"RULE":
+                transitions = _read_rules(_read_exact(f, size), meta.get("tape_count", 1), symbols, states)
+            elif tag == b"TAPE":
+                # Отрезки не склеиваются в одну строку: пропуски между ними
+                # могут быть сколь угодно длинными
+                head, _, segments = read_tape_segments(f, symbols)
+                tapes.append((list(segments), head))
+    except (struct.error, IndexError, KeyError, UnicodeDecodeError, ValueError, zlib.error) as e:
+        if isinstance(e, BinaryFormatError):
+            raise
+        raise BinaryFormatError(f"Повреждённый файл: {e}") from None
+    return {
+        "alphabet": alphabet,
+        "tapes": tapes,
+        "transitions": transitions,
+        "notes": meta.get("notes", {}),
+        "tape_count": meta.get("tape_count", 1),
+        "execution": meta.get("execution")
+    }
+
+
+def _read_rules(data: bytes, tape_count: int, symbols: List[str], states: List[str]) -> dict:
+    k = tape_count
+    rule_struct = _rule_struct(k)
+    (count,) = _COUNT.unpack_from(data)
+    body = data[_COUNT.size:]
+    if len(body) != count * rule_struct.size:
+        raise BinaryFormatError("Размер секции правил не совпадает с числом правил")
+    transitions = {}
+    for fields in rule_struct.iter_unpack(body):
+        state = states[fields[0]]
+        symbol = tuple(symbols[i] for i in fields[1:1 + k])
+        new_symbol = tuple(symbols[i] for i in fields[1 + k:1 + 2 * k])
+        direction = tuple(_DIRECTIONS[d] for d in fields[1 + 2 * k:1 + 3 * k])
+        next_state = states[fields[-1]]
+        if k == 1:
+            transitions[(state, symbol[0])] = (new_symbol[0], direction[0], next_state)
+        else:
+            transitions[(state, symbol)] = (new_symbol, direction, next_state)
+    return transitions
@@ -0,0 +1,99 @@
+from typing import Optional, Tuple
+
+# Виды точек останова и описание срабатывания: (вид, *параметры)
+BREAK_STATE = "state"
+BREAK_TRANSITION = "transition"
+BREAK_HEAD = "head"
+BREAK_STEP = "step"
+BREAK_CELL = "cell"
+
+Hit = Tuple
+
+
+# Точки останова машины. Останов происходит между шагами:
+#   state      — машина перешла в состояние из другого состояния;
+#   transition — следующим будет выполнено правило (состояние, символ);
+#   head       — головка вошла в диапазон [lo, hi];
+#   step       — выполнено ровно n шагов;
+#   cell       — в ячейку pos записан символ, которого там не было.
+# Интерпретатор проверяет условия после каждого шага; скомпилированный движок
+# превращает их в ловушки в таблице действий и ограничения длины порции (см. ChunkedRun).
+class Breakpoints:
+    def __init__(self):
+        self.states = set()
+        self.transitions = set()
+        self.head_ranges = []
+        self.steps = set()
+        self.cells = set()
+
+    def __bool__(self):
+        return bool(self.states or self.transitions or self.head_ranges or self.steps or self.cells)
+
+    def add_state(self, state: str):
+        self.states.add(state)
+
+    def add_transition(self, state: str, symbol: str):
+        self.transitions.add((state, symbol))
+
+    def add_head_range(self, lo: int, hi: int):
+        if lo > hi:
+            raise ValueError("Пустой диапазон положений головки")
+        self.head_ranges.append((lo, hi))
+
+    def add_step(self, step: int):
+        self.steps.add(step)
+
+    def add_cell(self, pos: int, symbol: str):
+        self.cells.add((pos, symbol))
+
+    def copy(self) -> "Breakpoints":
+        # Независимый снимок: исполнение в другом потоке не видит правок оригинала
+        result = Breakpoints()
+        result.states = set(self.states)
+        result.transitions = set(self.transitions)
+        result.head_ranges = list(self.head_ranges)
+        result.steps = set(self.steps)
+        result.cells = set(self.cells)
+        return result
+
+    def clear(self):
+        self.states.clear()
+        self.transitions.clear()
+        self.head_ranges.clear()
+        self.steps.clear()
+        self.cells.clear()
+
+    def check_next(self, state: str, symbol: str) -> Optional[Hit]:
+        if (state, symbol) in self.transitions:
+            return BREAK_TRANSITION, state, symbol
+        return None
+
+    def check_step(self, machine, old_state: str, old_head: int, old_symbol: str) -> Optional[Hit]:
+        # Условия на только что выполненный шаг и на следующее правило
+        state = machine.current_state
+        if state in self.states and state != old_state:
+            return BREAK_STATE, state
+        if machine.steps_done in self.steps:
+            return BREAK_STEP, machine.steps_done
+        head = machine.tape.head
+        for lo, hi in self.head_ranges:
+            if lo <= head <= hi and not lo <= old_head <= hi:
+                return BREAK_HEAD, lo, hi
+        if self.cells:
+            new_symbol = machine.tape.get_symbol(old_head)
+            if new_symbol != old_symbol and (old_head, new_symbol) in self.cells:
+                return BREAK_CELL, old_head, new_symbol
+        return self.check_next(state, machine.tape.read())
+
+
+def describe_hit(hit: Hit) -> str:
+    kind = hit[0]
+    if kind == BREAK_STATE:
+        return f"переход в состояние {hit[1]}"
+    if kind == BREAK_TRANSITION:
+        return f"правило ({hit[1]}, '{hit[2]}')"
+    if kind == BREAK_HEAD:
+        return f"головка в диапазоне [{hit[1]}, {hit[2]}]"
+    if kind == BREAK_STEP:
+        return f"шаг {hit[1]}"
+    return f"в ячейку {hit[1]} записан '{hit[2]}'"
@@ -0,0 +1,248 @@
+"""Контрольные точки исполнения машины.
+
+    python -m core.checkpoint project.json -i 1011 -c run.ckpt --every 5 --max-steps 1000000000
+
+выполняет машину до завершения, каждые 5 секунд сохраняя конфигурацию в run.ckpt;
+
+    python -m core.checkpoint --resume run.ckpt
+
+продолжает выполнение с сохранённой конфигурации. Итог выводится JSON-объектом
+в том же виде, что и у python -m core.run.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+
+from core.binproject import (
+    BinaryFormatError, content_segments, is_binary, read_binary, tape_segments, write_binary
+)
+from core.engine import ChunkedRun
+from core.machine import TuringMachine, step_limit_message
+from core.multitape import MultiTapeTuringMachine
+from core.project import BLANK, ProjectError, build_machine, load_project
+from core.run import ENGINES, machine_result
+from core.tape import make_tape
+
+# Контрольная точка — двоичный проект (см. core.binproject) с текущей лентой
+# и конфигурацией исполнения в секции META. Файл пишется во временный файл
+# рядом и подменяется os.replace, поэтому прерванная запись не портит
+# предыдущую контрольную точку.
+CHUNK_STEPS = 1 << 20
+INTERPRETER_CHUNK_STEPS = 1 << 14
+
+
+def _write_atomic(path: str, write) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".checkpoint-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def machine_execution(machine) -> dict:
+    return {
+        "state": machine.current_state,
+        "steps": machine.steps_done,
+        "final_states": sorted(machine.final_states),
+        "max_steps": machine.max_steps,
+        "engine": getattr(machine, "engine", "interpreter"),
+        "halted": machine.is_halted,
+        "error": machine.error_occurred,
+        "error_message": machine.error_message,
+        "cycle": list(machine.cycle) if machine.cycle else None
+    }
+
+
+def save_checkpoint(path: str, machine, run: ChunkedRun = None, notes: dict = None) -> None:
+    # При заданном run конфигурация берётся из незавершённого исполнения
+    # скомпилированным движком, а лента машины не затрагивается
+    execution = machine_execution(machine)
+    if run is not None and not run.done:
+        origin, content = run.image()
+        tapes = [(content_segments(content, origin, BLANK), run.head())]
+        execution.update(state=run.table.state_at(run.state), steps=run.steps)
+    else:
+        tapes = [(tape_segments(tape), tape.head) for tape in getattr(machine, "tapes", [machine.tape])]
+    tape_count = len(tapes)
+    _write_atomic(path, lambda f: write_binary(
+        f,
+        sorted(machine.alphabet - {BLANK}),
+        tapes,
+        machine.transition_table,
+        notes or {},
+        tape_count,
+        BLANK,
+        execution
+    ))
+
+
+def read_checkpoint(path: str) -> dict:
+    with open(path, "rb") as f:
+        if not is_binary(f):
+            raise ProjectError("Файл не является контрольной точкой")
+        try:
+            data = read_binary(f, BLANK)
+        except BinaryFormatError as e:
+            raise ProjectError(str(e)) from None
+    if not isinstance(data["execution"], dict):
+        raise ProjectError("В файле нет конфигурации исполнения")
+    return data
+
+
+def checkpoint_machine(data: dict, tapes=None, max_steps: int = None, engine: str = None):
+    # tapes — ленты, в которые загружается содержимое (например, ленты GUI);
+    # по умолчанию создаются новые
+    execution = data["execution"]
+    transitions = data["transitions"]
+    alphabet = set(data["alphabet"]) | {BLANK}
+    symbols = set(alphabet)
+    for segments, _ in data["tapes"]:
+        for _, content in segments:
+            symbols.update(content)
+    if tapes is None:
+        tapes = [make_tape("", BLANK, symbols) for _ in data["tapes"]]
+    if len(tapes) != len(data["tapes"]) or len(tapes) != data["tape_count"]:
+        raise ProjectError("Число лент не совпадает с контрольной точкой")
+    for tape, (segments, head) in zip(tapes, data["tapes"]):
+        tape.load_segments(segments, head)
+
+    if len(tapes) > 1 and engine not in (None, "interpreter"):
+        raise ProjectError(f"Движок '{engine}' не поддерживает машины с несколькими лентами")
+    try:
+        if len(tapes) > 1:
+            machine = MultiTapeTuringMachine(
+                initial_state=execution["state"],
+                final_states=set(execution["final_states"]),
+                transition_table=transitions,
+                tapes=tapes,
+                alphabet=alphabet,
+                max_steps=max_steps or execution["max_steps"]
+            )
+        else:
+            machine = TuringMachine(
+                initial_state=execution["state"],
+                final_states=set(execution["final_states"]),
+                transition_table=transitions,
+                tape=tapes[0],
+                alphabet=alphabet,
+                max_steps=max_steps or execution["max_steps"],
+                engine=engine or execution["engine"]
+            )
+        machine.steps_done = int(execution["steps"])
+        machine.is_halted = bool(execution["halted"])
+        machine.error_occurred = bool(execution["error"])
+        machine.error_message = str(execution["error_message"])
+        machine.cycle = tuple(execution["cycle"]) if execution["cycle"] else None
+    except (KeyError, TypeError, ValueError) as e:
+        raise ProjectError(f"Некорректная конфигурация исполнения: {e}") from None
+    if (
+            max_steps and machine.steps_done < max_steps
+            and machine.error_message == step_limit_message(execution["max_steps"])
+    ):
+        # Остановка по старому лимиту шагов снимается при его увеличении
+        machine.is_halted = machine.error_occurred = False
+        machine.error_message = ""
+    return machine
+
+
+def load_checkpoint(path: str, tapes=None, max_steps: int = None, engine: str = None):
+    return checkpoint_machine(read_checkpoint(path), tapes, max_steps, engine)
+
+
+def run_with_checkpoints(machine, path: str, every: float = 5.0) -> None:
+    # Выполняет машину до остановки, сохраняя контрольную точку каждые every
+    # секунд и после завершения
+    last = time.monotonic()
+    if isinstance(machine, TuringMachine) and machine.engine in ("compiled", "macro", "codegen"):
+        run = ChunkedRun(machine, macro=machine.engine == "macro", codegen=machine.engine == "codegen")
+        while not run.advance(CHUNK_STEPS) and run.hit is None:
+            if time.monotonic() - last >= every:
+                save_checkpoint(path, machine, run)
+                last = time.monotonic()
+        run.finish()
+    else:
+        tapes = getattr(machine, "tapes", [machine.tape])
+        while not machine.is_halted and machine.steps_done < machine.max_steps:
+            target = min(machine.steps_done + INTERPRETER_CHUNK_STEPS, machine.max_steps)
+            with ExitStack() as stack:
+                for tape in tapes:
+                    stack.enter_context(tape.batch())
+                while not machine.is_halted and machine.steps_done < target:
+                    machine.step()
+            if time.monotonic() - last >= every:
+                save_checkpoint(path, machine)
+                last = time.monotonic()
+        if not machine.is_halted:
+            machine.run()
+    save_checkpoint(path, machine)
+
+
+def _file_id(path: str):
+    # os.replace подменяет файл, поэтому новая контрольная точка меняет эту пару
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.checkpoint", description="Исполнение с контрольными точками")
+    parser.add_argument("project", nargs="?", help="файл проекта (JSON или двоичный)")
+    parser.add_argument("-i", "--input", default="", help="начальное содержимое ленты")
+    parser.add_argument("-c", "--checkpoint", help="файл контрольной точки")
+    parser.add_argument("--resume", metavar="CHECKPOINT", help="продолжить с контрольной точки")
+    parser.add_argument("--every", type=float, default=5.0, help="интервал между контрольными точками, с")
+    parser.add_argument("--max-steps", type=int, default=None, help="ограничение числа шагов")
+    parser.add_argument("--engine", choices=ENGINES[:4], default=None)
+    args = parser.parse_args(argv)
+
+    path = args.resume or args.checkpoint
+    if path is None or (args.resume is None and args.project is None):
+        parser.error("нужен проект и --checkpoint или --resume")
+
+    try:
+        if args.resume:
+            machine = load_checkpoint(args.resume, max_steps=args.max_steps, engine=args.engine)
+        else:
+            project = load_project(args.project)
+            machine = build_machine(
+                project, args.input, args.max_steps or 1000,
+                args.engine or ("macro" if project.get("tape_count", 1) == 1 else "interpreter")
+            )
+    except (OSError, ValueError) as e:
+        print(f"Ошибка чтения файла: {e}", file=sys.stderr)
+        return 2
+
+    before = _file_id(path)
+    try:
+        run_with_checkpoints(machine, path, args.every)
+    except KeyboardInterrupt:
+        # Конфигурация в момент прерывания может быть несогласованной (шаг
+        # или порция не завершены), поэтому продолжить можно только с файла,
+        # записанного этим запуском, или с того, откуда он начат
+        after = _file_id(path)
+        if after is not None and (args.resume or after != before):
+            print(f"Прервано; продолжить можно с {path}", file=sys.stderr)
+        else:
+            print("Прервано до первой контрольной точки", file=sys.stderr)
+        return 130
+    print(json.dumps(machine_result(machine), ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+from hashlib import blake2b
+from typing import Optional, Tuple
+
+MASK = (1 << 64) - 1
+_HEAD_SALT = 0x5851F42D4C957F2D
+_STATE_SALT = 0x14057B7EF767814F
+
+
+def _mix(x: int) -> int:
+    # Финализатор splitmix64: псевдослучайный 64-битный ключ Зобриста по числу
+    x = (x + 0x9E3779B97F4A7C15) & MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK
+    return x ^ (x >> 31)
+
+
+def _name_key(name: str) -> int:
+    return int.from_bytes(blake2b(name.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# Точное обнаружение зацикливания. Хеш конфигурации (состояние, головка, лента)
+# обновляется за O(1) на шаг: XOR ключей изменённой ячейки, головки и состояния.
+# Повтор ищется методом Брента: конфигурация запоминается на шагах 1, 2, 4, ...
+# и сравнивается с текущей; при совпадении хешей конфигурации сравниваются
+# целиком, поэтому коллизия хеша не даёт ложного срабатывания.
+class CycleDetector:
+    def __init__(self, machine):
+        self._state_keys = {}
+        self._symbol_keys = {}
+        self.blank = machine.tape.blank
+        self.hash = self._state_key(machine.current_state) ^ self._head_key(machine.tape.head)
+        for pos, symbol in machine.tape.items():
+            self.hash ^= self._cell_key(pos, symbol)
+        self._power = 1
+        self._lam = 0
+        self._save(machine)
+
+    def _state_key(self, state: str) -> int:
+        key = self._state_keys.get(state)
+        if key is None:
+            key = self._state_keys[state] = _mix(_name_key(state) ^ _STATE_SALT)
+        return key
+
+    def _head_key(self, head: int) -> int:
+        return _mix((head & MASK) ^ _HEAD_SALT)
+
+    def _cell_key(self, pos: int, symbol: str) -> int:
+        if symbol == self.blank:
+            return 0
+        key = self._symbol_keys.get(symbol)
+        if key is None:
+            key = self._symbol_keys[symbol] = _name_key(symbol)
+        return _mix(((pos & MASK) * 0x2545F4914F6CDD1D) & MASK ^ key)
+
+    def _configuration(self, machine):
+        return machine.current_state, machine.tape.head, machine.tape.items()
+
+    def _save(self, machine):
+        self._saved_hash = self.hash
+        self._saved_step = machine.steps_done
+        self._saved = self._configuration(machine)
+
+    def update(self, pos: int, old_symbol: str, new_symbol: str, old_state: str, new_state: str, new_head: int):
+        h = self.hash
+        if old_symbol != new_symbol:
+            h ^= self._cell_key(pos, old_symbol) ^ self._cell_key(pos, new_symbol)
+        if new_head != pos:
+            h ^= self._head_key(pos) ^ self._head_key(new_head)
+        if old_state != new_state:
+            h ^= self._state_key(old_state) ^ self._state_key(new_state)
+        self.hash = h
+
+    def check(self, machine) -> Optional[Tuple[int, int]]:
+        # Возвращает (шаг, период), если текущая конфигурация уже встречалась
+        self._lam += 1
+        if self.hash == self._saved_hash and self._configuration(machine) == self._saved:
+            return machine.steps_done, machine.steps_done - self._saved_step
+        if self._lam == self._power:
+            self._save(machine)
+            self._power *= 2
+            self._lam = 0
+        return None
@@ -0,0 +1,141 @@
+from core.engine import CompiledTable, CompiledTape
+from core.tape import TuringTape
+
+# Классы поведения машины, запущенной на пустой ленте
+HALT = "halt"
+CYCLER = "cycler"
+TRANSLATED_CYCLER = "translated_cycler"
+BOUNDED = "bounded"
+UNDECIDED = "undecided"
+
+# Сколько последних рекордов головки с каждой стороны и сколько ячеек за
+# головкой в каждом из них помнит решатель смещённых циклов
+RECORDS_KEPT = 256
+RECORD_WINDOW = 256
+
+
+def _image(tape: CompiledTape):
+    # Непустая часть ленты относительно начала координат
+    raw = bytes(tape.cells[1:-1])
+    body = raw.strip(b"\0")
+    if not body:
+        return 0, b""
+    return len(raw) - len(raw.lstrip(b"\0")) + 1 - tape.origin, body
+
+
+# Рекорды головки с одной стороны ленты. Если рекорды на шагах t1 < t2 сделаны
+# в одном состоянии, а участок ленты, который головка просматривала между
+# ними, совпадает со сдвигом на d = p2 - p1, то дальше машина повторяет
+# отрезок [t1, t2] со сдвигом бесконечно (за рекордом лента пуста).
+# Координаты хранятся умноженными на sign, поэтому обе стороны считаются
+# как правая: рекорд — максимум, отход назад — минимум.
+class _Records:
+    def __init__(self, sign: int):
+        self.sign = sign
+        # (шаг, состояние, позиция, окно ленты за головкой, минимум до следующего рекорда)
+        self.records = []
+        self.low = None
+
+    def moved(self, head: int):
+        if self.low is not None and self.sign * head < self.low:
+            self.low = self.sign * head
+
+    def add(self, step: int, state: int, head: int, tape: CompiledTape):
+        sign = self.sign
+        records = self.records
+        pos = tape.pos
+        found = None
+        low = self.low
+        for i in range(len(records) - 1, -1, -1):
+            old_step, old_state, old_head, window, old_low = records[i]
+            if i < len(records) - 1:
+                low = min(low, old_low)
+            width = old_head - low + 1
+            if old_state != state or width > len(window):
+                continue
+            if sign > 0:
+                current, previous = tape.cells[pos - width + 1:pos + 1], window[len(window) - width:]
+            else:
+                current, previous = tape.cells[pos:pos + width], window[:width]
+            if bytes(current) == previous:
+                found = (old_step, step - old_step, head - sign * old_head)
+                break
+
+        if records:
+            records[-1] = records[-1][:4] + (self.low,)
+        if sign > 0:
+            window = bytes(tape.cells[max(1, pos - RECORD_WINDOW + 1):pos + 1])
+        else:
+            window = bytes(tape.cells[pos:min(len(tape.cells) - 1, pos + RECORD_WINDOW)])
+        records.append((step, state, sign * head, window, None))
+        if len(records) > RECORDS_KEPT:
+            del records[0]
+        self.low = sign * head
+        return found
+
+
+def decide(table: CompiledTable, start: str, max_steps: int) -> dict:
+    # Запускает машину на пустой ленте не дольше max_steps шагов и пытается
+    # доказать, что она не остановится: точный повтор конфигурации (метод
+    # Брента), повтор со сдвигом на рекордах головки и ограниченный рост ленты
+    # (головка дольше числа возможных конфигураций не выходит за посещённый участок)
+    actions = table.actions
+    is_final = table.is_final
+    edge = table.edge
+    states = len(table.states)
+    symbols = len(table.symbols)
+    tape = CompiledTape(table, TuringTape("", table.blank))
+    state = table.row(start)
+    records = (_Records(1), _Records(-1))
+    lo = hi = 0
+    last_growth = 0
+    saved = (state, 0, _image(tape))
+    saved_step = 0
+    power = 1
+
+    for step in range(max_steps):
+        cells = tape.cells
+        pos = tape.pos
+        action = actions[state + cells[pos]]
+        if action is None:
+            if cells[pos] != edge:
+                return {"class": HALT, "steps": step}
+            tape.grow()
+            cells = tape.cells
+            pos = tape.pos
+            action = actions[state + cells[pos]]
+            if action is None:
+                return {"class": HALT, "steps": step}
+        cells[pos], move, state = action
+        tape.pos = pos + move
+        if is_final[state]:
+            return {"class": HALT, "steps": step + 1}
+        steps = step + 1
+        head = tape.pos - tape.origin
+
+        records[0].moved(head)
+        records[1].moved(head)
+        found = None
+        if head > hi:
+            hi = head
+            last_growth = steps
+            found = records[0].add(steps, state, head, tape)
+        elif head < lo:
+            lo = head
+            last_growth = steps
+            found = records[1].add(steps, state, head, tape)
+        if found is not None:
+            return {"class": TRANSLATED_CYCLER, "start": found[0], "period": found[1], "shift": found[2]}
+
+        if state == saved[0] and head == saved[1] and _image(tape) == saved[2]:
+            return {"class": CYCLER, "start": saved_step, "period": steps - saved_step}
+        if steps - saved_step == power:
+            saved = (state, head, _image(tape))
+            saved_step = steps
+            power *= 2
+
+        width = hi - lo + 1
+        if width < 32 and steps - last_growth > states * width * symbols ** width:
+            return {"class": BOUNDED, "width": width}
+
+    return {"class": UNDECIDED, "steps": max_steps}
@@ -0,0 +1,795 @@
+from array import array
+from hashlib import blake2b
+from typing import Dict, List, Optional, Set, Tuple
+from core.breakpoints import BREAK_CELL, BREAK_HEAD, BREAK_STATE, BREAK_STEP
+from core.tape import Direction, RleTape
+
+OFFSETS = {Direction.LEFT: -1, Direction.RIGHT: 1, Direction.STAY: 0}
+
+# Результаты исполнения скомпилированного цикла
+HALTED = 0
+NO_RULE = 1
+LIMIT = 2
+
+
+# Таблица переходов, интернированная в плотные целочисленные id.
+# Символ с id 0 всегда пустой, последний столбец строки (edge) зарезервирован
+# под маркер края рабочего массива ленты. Состояние хранится как смещение
+# его строки в плоском массиве actions, поэтому поиск правила — одно сложение.
+class CompiledTable:
+    def __init__(
+            self,
+            transition_table: Dict[Tuple[str, str], Tuple[str, Direction, str]],
+            final_states: Set[str],
+            blank: str,
+            extra_states=(),
+            extra_symbols=()
+    ):
+        self.blank = blank
+        self.symbols: List[str] = [blank]
+        self.symbol_ids: Dict[str, int] = {blank: 0}
+        self.states: List[str] = []
+        self.state_ids: Dict[str, int] = {}
+
+        # Дополнительные состояния и символы получают id первыми: так вызывающий
+        # код может зафиксировать раскладку таблицы для разных таблиц переходов
+        for state in extra_states:
+            self._intern_state(state)
+        for symbol in extra_symbols:
+            self._intern_symbol(symbol)
+        for (state, symbol), (new_symbol, _, new_state) in transition_table.items():
+            self._intern_state(state)
+            self._intern_state(new_state)
+            self._intern_symbol(symbol)
+            self._intern_symbol(new_symbol)
+        for state in final_states:
+            self._intern_state(state)
+
+        self.edge = len(self.symbols)
+        self.width = self.edge + 1
+        self.actions: List[Optional[Tuple[int, int, int]]] = [None] * (len(self.states) * self.width)
+        self.is_final = [False] * len(self.actions)
+        for state in final_states:
+            self.is_final[self.row(state)] = True
+        # Петли-проходы: (q, s) -> (w, d, q), d != STAY. Пока под головкой s,
+        # машина пишет w и сдвигается в ту же сторону, не меняя состояния.
+        self.sweeps: List[Optional[Tuple[int, int]]] = [None] * len(self.actions)
+        for (state, symbol), (new_symbol, direction, new_state) in transition_table.items():
+            idx = self.row(state) + self.symbol_ids[symbol]
+            self.actions[idx] = (
+                self.symbol_ids[new_symbol],
+                OFFSETS[direction],
+                self.row(new_state)
+            )
+            if new_state == state and direction != Direction.STAY and state not in final_states:
+                self.sweeps[idx] = (self.symbol_ids[new_symbol], OFFSETS[direction])
+
+    def _intern_state(self, state: str):
+        if state not in self.state_ids:
+            self.state_ids[state] = len(self.states)
+            self.states.append(state)
+
+    def _intern_symbol(self, symbol: str):
+        if symbol not in self.symbol_ids:
+            self.symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+    def row(self, state: str) -> int:
+        return self.state_ids[state] * self.width
+
+    def state_at(self, row: int) -> str:
+        return self.states[row // self.width]
+
+    def new_run(self, symbol: int, count: int):
+        return bytes((symbol,)) * count if self.width <= 256 else [symbol] * count
+
+    def new_cells(self, size: int):
+        cells = bytearray(size) if self.width <= 256 else [0] * size
+        cells[0] = cells[-1] = self.edge
+        return cells
+
+
+# Рабочая копия ленты в виде массива id символов с маркерами краёв
+class CompiledTape:
+    def __init__(self, table: CompiledTable, tape):
+        self.table = table
+        items = tape.items()
+        lo = min(items[0][0], tape.head) if items else tape.head
+        hi = max(items[-1][0], tape.head) if items else tape.head
+        size = max(64, 2 * (hi - lo + 1))
+        self.origin = (size - (hi - lo + 1)) // 2 - lo
+        self.cells = table.new_cells(size)
+        ids = table.symbol_ids
+        for pos, ch in items:
+            self.cells[self.origin + pos] = ids[ch]
+        self.pos = self.origin + tape.head
+
+    def grow(self):
+        old = self.cells
+        used = len(old) - 2
+        extra = max(64, used)
+        self.cells = self.table.new_cells(len(old) + 2 * extra)
+        self.cells[extra + 1:extra + 1 + used] = old[1:-1]
+        self.origin += extra
+        self.pos += extra
+
+    def copy(self) -> "CompiledTape":
+        clone = CompiledTape.__new__(CompiledTape)
+        clone.table = self.table
+        clone.cells = self.cells[:]
+        clone.origin = self.origin
+        clone.pos = self.pos
+        return clone
+
+    def store(self, tape):
+        symbols = self.table.symbols
+        cells = self.cells
+        edge = self.table.edge
+        origin = self.origin
+        tape.restore(
+            {i - origin: symbols[c] for i, c in enumerate(cells) if c and c != edge},
+            self.pos - origin
+        )
+
+
+def compile_machine(machine) -> Tuple[CompiledTable, CompiledTape]:
+    table = CompiledTable(
+        machine.transition_table,
+        machine.final_states,
+        machine.tape.blank,
+        extra_states=(machine.current_state,),
+        extra_symbols=[ch for _, ch in machine.tape.items()]
+    )
+    return table, CompiledTape(table, machine.tape)
+
+
+def execute(table: CompiledTable, tape: CompiledTape, state: int, steps: int, limit: int):
+    actions = table.actions
+    is_final = table.is_final
+    edge = table.edge
+    cells = tape.cells
+    pos = tape.pos
+    while True:
+        for steps in range(steps, limit):
+            action = actions[state + cells[pos]]
+            if action is None:
+                break
+            cells[pos], move, state = action
+            pos += move
+            if is_final[state]:
+                tape.pos = pos
+                return HALTED, state, steps + 1
+        else:
+            tape.pos = pos
+            return LIMIT, state, max(steps, limit)
+
+        if cells[pos] != edge:
+            tape.pos = pos
+            return NO_RULE, state, steps
+
+        tape.pos = pos
+        tape.grow()
+        cells = tape.cells
+        pos = tape.pos
+
+
+# Серии не длиннее SHORT_RUN ячеек execute_macro проходит по одной ячейке
+SHORT_RUN = 8
+
+
+def _run_right(cells, pos: int, symbol: int, limit: int) -> int:
+    # Длина серии символа symbol от pos вправо, но не больше limit
+    if isinstance(cells, list):
+        end = pos
+        while end - pos < limit and cells[end] == symbol:
+            end += 1
+        return end - pos
+    pattern = bytes((symbol,))
+    n, chunk = 0, 64
+    while n < limit:
+        part = cells[pos + n:pos + n + chunk]
+        rest = len(part.lstrip(pattern))
+        n += len(part) - rest
+        if rest or not part:
+            break
+        chunk *= 2
+    return min(n, limit)
+
+
+def _run_left(cells, pos: int, symbol: int, limit: int) -> int:
+    if isinstance(cells, list):
+        end = pos
+        while pos - end < limit and cells[end] == symbol:
+            end -= 1
+        return pos - end
+    pattern = bytes((symbol,))
+    n, chunk = 0, 64
+    while n < limit:
+        start = max(0, pos - n - chunk + 1)
+        part = cells[start:pos - n + 1]
+        rest = len(part.rstrip(pattern))
+        n += len(part) - rest
+        if rest or not start:
+            break
+        chunk *= 2
+    return min(n, limit)
+
+
+def execute_macro(table: CompiledTable, tape: CompiledTape, state: int, steps: int, limit: int):
+    # Как execute(), но серии одинаковых символов под петлёй-проходом
+    # обрабатываются одной операцией над срезом массива
+    actions = table.actions
+    sweeps = table.sweeps
+    is_final = table.is_final
+    edge = table.edge
+    cells = tape.cells
+    pos = tape.pos
+    while steps < limit:
+        # Обычные шаги и серии короче трёх ячеек идут тем же циклом, что в
+        # execute(). Если следующая ячейка — край массива, вторая проверка не
+        # выполняется, поэтому индекс pos + 2 * move всегда в пределах массива
+        for steps in range(steps, limit):
+            cell = cells[pos]
+            idx = state + cell
+            sweep = sweeps[idx]
+            if sweep is not None and cells[pos + sweep[1]] == cell and cells[pos + 2 * sweep[1]] == cell:
+                break
+            action = actions[idx]
+            if action is None:
+                break
+            cells[pos], move, state = action
+            pos += move
+            if is_final[state]:
+                tape.pos = pos
+                return HALTED, state, steps + 1
+        else:
+            tape.pos = pos
+            return LIMIT, state, limit
+
+        if actions[idx] is None:
+            if cell != edge:
+                tape.pos = pos
+                return NO_RULE, state, steps
+            tape.pos = pos
+            tape.grow()
+            cells = tape.cells
+            pos = tape.pos
+            continue
+
+        write, move = sweep
+        # Начало серии проходится по ячейкам: срез окупается только на длинных сериях
+        budget = limit - steps
+        n = 0
+        while cells[pos] == cell and n < SHORT_RUN and n < budget:
+            cells[pos] = write
+            pos += move
+            n += 1
+        if n == SHORT_RUN and cells[pos] == cell and n < budget:
+            if move > 0:
+                m = _run_right(cells, pos, cell, budget - n)
+                cells[pos:pos + m] = table.new_run(write, m)
+            else:
+                m = _run_left(cells, pos, cell, budget - n)
+                cells[pos - m + 1:pos + 1] = table.new_run(write, m)
+            pos += move * m
+            n += m
+        steps += n
+        if cells[pos] == edge and cell == write == 0 and steps < limit:
+            # Пустая лента за краем бесконечна: проход длится до лимита шагов
+            pos += move * (limit - steps)
+            steps = limit
+    tape.pos = pos
+    return LIMIT, state, steps
+
+
+# Варианты циклов для профилирования: дополнительно считают срабатывания
+# правил в counts (по индексам actions) и расширяют span — диапазон позиций
+# головки. Отдельные функции, чтобы без профиля основные циклы не платили
+# за подсчёт.
+def _widen(span: list, tape: CompiledTape, lo: int, hi: int) -> None:
+    origin = tape.origin
+    if lo - origin < span[0]:
+        span[0] = lo - origin
+    if hi - origin > span[1]:
+        span[1] = hi - origin
+
+
+def execute_counted(table: CompiledTable, tape: CompiledTape, state: int, steps: int, limit: int, counts, span):
+    actions = table.actions
+    is_final = table.is_final
+    edge = table.edge
+    cells = tape.cells
+    pos = lo = hi = tape.pos
+    while True:
+        for steps in range(steps, limit):
+            idx = state + cells[pos]
+            action = actions[idx]
+            if action is None:
+                break
+            counts[idx] += 1
+            cells[pos], move, state = action
+            pos += move
+            if pos < lo:
+                lo = pos
+            elif pos > hi:
+                hi = pos
+            if is_final[state]:
+                tape.pos = pos
+                _widen(span, tape, lo, hi)
+                return HALTED, state, steps + 1
+        else:
+            tape.pos = pos
+            _widen(span, tape, lo, hi)
+            return LIMIT, state, max(steps, limit)
+
+        tape.pos = pos
+        _widen(span, tape, lo, hi)
+        if cells[pos] != edge:
+            return NO_RULE, state, steps
+
+        tape.grow()
+        cells = tape.cells
+        pos = lo = hi = tape.pos
+
+
+def execute_macro_counted(table: CompiledTable, tape: CompiledTape, state: int, steps: int, limit: int, counts, span):
+    actions = table.actions
+    sweeps = table.sweeps
+    is_final = table.is_final
+    edge = table.edge
+    cells = tape.cells
+    pos = lo = hi = tape.pos
+    while steps < limit:
+        cell = cells[pos]
+        idx = state + cell
+        sweep = sweeps[idx]
+        if sweep is not None:
+            write, move = sweep
+            # Начало серии проходится по ячейкам: срез окупается только на длинных сериях
+            budget = limit - steps
+            n = 0
+            while cells[pos] == cell and n < SHORT_RUN and n < budget:
+                cells[pos] = write
+                pos += move
+                n += 1
+            if n == SHORT_RUN and cells[pos] == cell and n < budget:
+                if move > 0:
+                    m = _run_right(cells, pos, cell, budget - n)
+                    cells[pos:pos + m] = table.new_run(write, m)
+                else:
+                    m = _run_left(cells, pos, cell, budget - n)
+                    cells[pos - m + 1:pos + 1] = table.new_run(write, m)
+                pos += move * m
+                n += m
+            steps += n
+            counts[idx] += n
+            if cells[pos] == edge and cell == write == 0 and steps < limit:
+                counts[idx] += limit - steps
+                pos += move * (limit - steps)
+                steps = limit
+            if pos < lo:
+                lo = pos
+            elif pos > hi:
+                hi = pos
+            continue
+
+        action = actions[idx]
+        if action is None:
+            tape.pos = pos
+            _widen(span, tape, lo, hi)
+            if cell != edge:
+                return NO_RULE, state, steps
+            tape.grow()
+            cells = tape.cells
+            pos = lo = hi = tape.pos
+            continue
+
+        counts[idx] += 1
+        cells[pos], move, state = action
+        pos += move
+        steps += 1
+        if pos < lo:
+            lo = pos
+        elif pos > hi:
+            hi = pos
+        if is_final[state]:
+            tape.pos = pos
+            _widen(span, tape, lo, hi)
+            return HALTED, state, steps
+
+    tape.pos = pos
+    _widen(span, tape, lo, hi)
+    return LIMIT, state, steps
+
+# Движок codegen: по таблице генерируется исходный код функции с тем же
+# контрактом, что у execute(). У каждого состояния своя ветка, выбор правила
+# по символу — цепочка сравнений с константами, петли состояния крутятся во
+# внутреннем цикле без повторного выбора ветки. Ветка состояния выбирается
+# деревом сравнений, поэтому смена состояния стоит O(log числа состояний).
+# Функции кэшируются по хешу раскладки таблицы, включая правила, вынутые
+# ловушками точек останова.
+GENERATED_CACHE_SIZE = 64
+_DISPATCH_LEAF = 4
+_generated = {}
+
+
+def _state_block(table: CompiledTable, row: int, indent: str) -> List[str]:
+    actions = table.actions
+    edge = table.edge
+    rules = [(symbol, actions[row + symbol]) for symbol in range(edge) if actions[row + symbol] is not None]
+    # Петли первыми: в своём состоянии они срабатывают чаще остальных правил
+    rules.sort(key=lambda rule: rule[1][2] != row)
+    lines = ["for steps in range(steps, limit):", "    c = cells[pos]"]
+    test = "if"
+    for symbol, (write, move, next_row) in rules:
+        lines.append(f"    {test} c == {symbol}:")
+        test = "elif"
+        body = []
+        if write != symbol:
+            body.append(f"cells[pos] = {write}")
+        if move:
+            body.append(f"pos += {move}" if move > 0 else f"pos -= {-move}")
+        if table.is_final[next_row]:
+            body += ["tape.pos = pos", f"return {HALTED}, {next_row}, steps + 1"]
+        elif next_row != row:
+            body += ["steps += 1", f"state = {next_row}", "break"]
+        lines += ["        " + line for line in body or ["pass"]]
+    lines += [
+        f"    {test} c == {edge}:",
+        "        tape.pos = pos",
+        "        tape.grow()",
+        "        cells = tape.cells",
+        "        pos = tape.pos",
+        "        break",
+        "    else:",
+        "        tape.pos = pos",
+        f"        return {NO_RULE}, {row}, steps",
+        "else:",
+        "    tape.pos = pos",
+        f"    return {LIMIT}, {row}, max(steps, limit)",
+    ]
+    return [indent + line for line in lines]
+
+
+def _dispatch(table: CompiledTable, rows: List[int], indent: str) -> List[str]:
+    if len(rows) > _DISPATCH_LEAF:
+        mid = len(rows) // 2
+        return (
+            [f"{indent}if state < {rows[mid]}:"] + _dispatch(table, rows[:mid], indent + "    ")
+            + [f"{indent}else:"] + _dispatch(table, rows[mid:], indent + "    ")
+        )
+    lines = []
+    for i, row in enumerate(rows):
+        if i == len(rows) - 1:
+            lines.append(f"{indent}else:" if i else f"{indent}if True:")
+        else:
+            lines.append(f"{indent}{'elif' if i else 'if'} state == {row}:")
+        lines.append(f"{indent}    # {table.state_at(row)!r}")
+        lines += _state_block(table, row, indent + "    ")
+    return lines
+
+
+def generate_source(table: CompiledTable) -> str:
+    rows = list(range(0, len(table.actions), table.width))
+    lines = [
+        "def execute_generated(table, tape, state, steps, limit):",
+        "    cells = tape.cells",
+        "    pos = tape.pos",
+        "    while True:",
+    ]
+    lines += _dispatch(table, rows, "        ")
+    return "\n".join(lines) + "\n"
+
+
+def generated_executor(table: CompiledTable):
+    key = blake2b(repr((table.width, table.actions, table.is_final)).encode(), digest_size=16).digest()
+    execute_generated = _generated.get(key)
+    if execute_generated is None:
+        namespace = {}
+        exec(compile(generate_source(table), f"<codegen {key.hex()[:12]}>", "exec"), namespace)
+        execute_generated = namespace["execute_generated"]
+        if len(_generated) >= GENERATED_CACHE_SIZE:
+            del _generated[next(iter(_generated))]
+        _generated[key] = execute_generated
+    return execute_generated
+
+
+def run_blocks(machine) -> None:
+    # Макрошаги прямо на RleTape: проход по серии — одна блочная операция,
+    # поэтому лента вида 1^k 0 1^m обрабатывается за O(число блоков)
+    tape = machine.tape
+    table = machine.transition_table
+    final_states = machine.final_states
+    state = machine.current_state
+    steps = machine.steps_done
+    limit = machine.max_steps
+    status = LIMIT
+    with tape.batch():
+        while steps < limit:
+            symbol = tape.read()
+            action = table.get((state, symbol))
+            if action is None:
+                status = NO_RULE
+                break
+            new_symbol, direction, new_state = action
+            if new_state == state and direction != Direction.STAY and state not in final_states:
+                n = tape.run_length(direction)
+                n = limit - steps if n is None else min(n, limit - steps)
+                tape.fill_run(new_symbol, n, direction)
+                steps += n
+                continue
+            tape.write(new_symbol)
+            tape.move(direction)
+            state = new_state
+            steps += 1
+            if state in final_states:
+                status = HALTED
+                break
+
+    machine.current_state = state
+    machine.steps_done = steps
+    if status == HALTED:
+        machine.is_halted = True
+    elif status == NO_RULE:
+        machine.halt_no_rule(symbol)
+    else:
+        machine.halt_step_limit()
+
+
+# Исполнение скомпилированной машины порциями шагов на рабочей копии ленты.
+# Между порциями можно прерваться, узнать прогресс и продолжить; лента
+# машины не трогается до finish(), поэтому порции можно исполнять в другом потоке.
+class ChunkedRun:
+    # Точки останова машины превращаются в дешёвые проверки: правила, на которых
+    # нужен останов (переход (q, s) и вход в отмеченное состояние), вынимаются
+    # из таблицы и ловятся как NO_RULE, а условия на шаг, головку и ячейки
+    # ограничивают длину порции так, что срабатывание приходится на её конец.
+    def __init__(self, machine, macro: bool = False, codegen: bool = False):
+        self.machine = machine
+        self.table, self.tape = compile_machine(machine)
+        self.execute = execute_macro if macro else execute
+        # Профиль машины пополняется в finish(); до этого счётчики копятся
+        # в массиве по индексам таблицы
+        self.profile = getattr(machine, "profile", None)
+        if self.profile is not None:
+            self.execute = execute_macro_counted if macro else execute_counted
+            self.counts = array("q", bytes(8 * len(self.table.actions)))
+            self.span = [self.head(), self.head()]
+        self.state = self.table.row(machine.current_state)
+        self.steps = machine.steps_done
+        self.status = HALTED if machine.is_halted else None
+        self.hit = None
+        # Копия: точки останова машины могут меняться, пока порции идут в другом потоке
+        breakpoints = getattr(machine, "breakpoints", None)
+        self.breakpoints = breakpoints.copy() if breakpoints else None
+        # Продолжение после останова: правило под головкой выполняется без проверки
+        self._resume = getattr(machine, "break_hit", None) is not None
+        self._traps = {}
+        if self.breakpoints:
+            self._set_traps()
+        if codegen and self.profile is None:
+            # Генерируется после ловушек: вынутые правила ловятся как NO_RULE
+            self.execute = generated_executor(self.table)
+
+    def _set_traps(self):
+        table = self.table
+        breakpoints = self.breakpoints
+        for idx, action in enumerate(table.actions):
+            if action is None:
+                continue
+            state = table.states[idx // table.width]
+            symbol = table.symbols[idx % table.width]
+            new_state = table.state_at(action[2])
+            if ((state, symbol) in breakpoints.transitions
+                    or new_state in breakpoints.states and new_state != state):
+                self._traps[idx] = action
+                table.actions[idx] = None
+                table.sweeps[idx] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status is not None
+
+    def head(self) -> int:
+        return self.tape.pos - self.tape.origin
+
+    def symbol_at(self, pos: int) -> str:
+        idx = self.tape.origin + pos
+        if 0 < idx < len(self.tape.cells) - 1:
+            return self.table.symbols[self.tape.cells[idx]]
+        return self.table.blank
+
+    def advance(self, n: int) -> bool:
+        # Не более n шагов; возвращает True, если выполнение завершено.
+        # При срабатывании точки останова возвращает False и заполняет hit.
+        if self.done:
+            return True
+        self.hit = None
+        max_steps = self.machine.max_steps
+        end = min(self.steps + n, max_steps)
+        while self.steps < end:
+            before = self._snapshot() if self.breakpoints else None
+            started = self.steps
+            status = self._execute(self._limit(end))
+            if self.steps != started:
+                self._resume = False
+            if status == NO_RULE:
+                tape = self.tape
+                idx = self.state + tape.cells[tape.pos]
+                action = self._traps.get(idx)
+                if action is None:
+                    # Переход без правила тоже может быть точкой останова:
+                    # интерпретатор проверяет её до ошибки
+                    if self.breakpoints and not self._resume:
+                        self.hit = self.breakpoints.check_next(
+                            self.table.state_at(self.state), self.symbol_at(self.head())
+                        )
+                        if self.hit is not None:
+                            self._resume = True
+                            return False
+                    self.status = NO_RULE
+                    return True
+                if not self._resume:
+                    self.hit = self.breakpoints.check_next(
+                        self.table.state_at(self.state), self.symbol_at(self.head())
+                    )
+                    if self.hit is not None:
+                        self._resume = True
+                        return False
+                self._resume = False
+                before = self._snapshot()
+                write, move, self.state = action
+                tape.cells[tape.pos] = write
+                tape.pos += move
+                self.steps += 1
+                if self.profile is not None:
+                    self.counts[idx] += 1
+                    _widen(self.span, tape, tape.pos, tape.pos)
+                if self.table.is_final[self.state]:
+                    self.status = HALTED
+                    return True
+            elif status == HALTED:
+                self.status = HALTED
+                return True
+            if before is not None:
+                self.hit = self._check(before)
+                if self.hit is not None:
+                    self._resume = True
+                    return False
+        if self.steps >= max_steps:
+            self.status = LIMIT
+        return self.done
+
+    def _execute(self, limit: int) -> int:
+        tape = self.tape
+        if not 0 <= tape.pos < len(tape.cells):
+            # Головка ушла проходом в бесконечную пустую часть ленты и
+            # продолжает двигаться в ту же сторону
+            remaining = limit - self.steps
+            tape.pos += remaining if tape.pos > 0 else -remaining
+            self.steps = limit
+            if self.profile is not None:
+                self.counts[self.state] += remaining
+                _widen(self.span, tape, tape.pos, tape.pos)
+            return LIMIT
+        if self.profile is not None:
+            status, self.state, self.steps = self.execute(
+                self.table, tape, self.state, self.steps, limit, self.counts, self.span
+            )
+            return status
+        status, self.state, self.steps = self.execute(self.table, tape, self.state, self.steps, limit)
+        return status
+
+    def _limit(self, end: int) -> int:
+        # Порция не перешагивает ни одного события, которое могло бы сработать
+        breakpoints = self.breakpoints
+        if not breakpoints:
+            return end
+        steps = self.steps
+        limit = end
+        for step in breakpoints.steps:
+            if steps < step < limit:
+                limit = step
+        head = self.head()
+        for lo, hi in breakpoints.head_ranges:
+            if head < lo:
+                limit = min(limit, steps + lo - head)
+            elif head > hi:
+                limit = min(limit, steps + head - hi)
+            else:
+                limit = min(limit, steps + min(head - lo, hi - head) + 1)
+        for pos, _ in breakpoints.cells:
+            limit = min(limit, steps + max(abs(head - pos), 1))
+        return limit
+
+    def _snapshot(self):
+        return (
+            self.state,
+            self.head(),
+            {pos: self.symbol_at(pos) for pos, _ in self.breakpoints.cells}
+        )
+
+    def _check(self, before):
+        # Те же условия и тот же порядок, что в Breakpoints.check_step
+        old_row, old_head, old_cells = before
+        breakpoints = self.breakpoints
+        state = self.table.state_at(self.state)
+        if state in breakpoints.states and self.state != old_row:
+            return BREAK_STATE, state
+        if self.steps in breakpoints.steps:
+            return BREAK_STEP, self.steps
+        head = self.head()
+        for lo, hi in breakpoints.head_ranges:
+            if lo <= head <= hi and not lo <= old_head <= hi:
+                return BREAK_HEAD, lo, hi
+        for pos, symbol in breakpoints.cells:
+            if old_cells[pos] != symbol and self.symbol_at(pos) == symbol:
+                return BREAK_CELL, pos, symbol
+        if self._traps:
+            return breakpoints.check_next(state, self.symbol_at(head))
+        return None
+
+    def extent(self) -> Tuple[int, int]:
+        # Границы непустой части ленты (lo > hi, если лента пуста)
+        cells = self.tape.cells
+        last = len(cells) - 2
+        lo = 1 + _run_right(cells, 1, 0, last)
+        hi = last - _run_left(cells, last, 0, last)
+        return lo - self.tape.origin, hi - self.tape.origin
+
+    def image(self) -> Tuple[int, str]:
+        # Непустая часть рабочей ленты как в TuringTape.image(), без переноса в машину
+        lo, hi = self.extent()
+        if lo > hi:
+            return 0, ""
+        origin = self.tape.origin
+        cells = self.tape.cells[origin + lo:origin + hi + 1]
+        symbols = self.table.symbols
+        if isinstance(cells, bytearray):
+            table = str.maketrans({chr(sid): symbol for sid, symbol in enumerate(symbols)})
+            return lo, cells.decode("latin-1").translate(table)
+        return lo, "".join(map(symbols.__getitem__, cells))
+
+    def _flush_profile(self) -> None:
+        profile = self.profile
+        table = self.table
+        width = table.width
+        for idx, count in enumerate(self.counts):
+            if count:
+                key = (table.states[idx // width], table.symbols[idx % width])
+                profile.counts[profile.slot(key)] += count
+        self.counts = array("q", bytes(8 * len(table.actions)))
+        profile.add_head_range(*self.span)
+
+    def finish(self) -> None:
+        # Переносит конфигурацию в машину; до завершения — как после паузы
+        machine = self.machine
+        self.tape.store(machine.tape)
+        if self.profile is not None:
+            self._flush_profile()
+            self.profile.observe_tape(machine.tape)
+        machine.current_state = self.table.state_at(self.state)
+        machine.steps_done = self.steps
+        if hasattr(machine, "break_hit"):
+            machine.break_hit = self.hit
+        if self.status == HALTED:
+            machine.is_halted = True
+        elif self.status == NO_RULE:
+            machine.halt_no_rule(self.table.symbols[self.tape.cells[self.tape.pos]])
+        elif self.status == LIMIT:
+            machine.halt_step_limit()
+
+
+def run_compiled(machine, macro: bool = False, codegen: bool = False) -> None:
+    if machine.is_halted:
+        return
+    if (
+            macro and isinstance(machine.tape, RleTape)
+            and not getattr(machine, "breakpoints", None) and getattr(machine, "profile", None) is None
+    ):
+        run_blocks(machine)
+        return
+
+    run = ChunkedRun(machine, macro, codegen)
+    run.advance(machine.max_steps)
+    run.finish()
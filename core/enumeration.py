@@ -0,0 +1,306 @@
+"""Перебор и классификация малых машин.
+
+    python -m core.enumeration -n 3 -m 2 -o bb3.jsonl --max-steps 1000 -j 8
+
+перебирает машины с 3 состояниями и 2 символами в древовидной нормальной
+форме, запускает их на пустой ленте и пишет по объекту JSON на машину:
+код машины, класс (halt, cycler, translated_cycler, bounded, undecided) и
+подробности. Перебор делится на независимые поддеревья, которые
+исполняются пулом процессов; завершённые поддеревья отмечаются в файле
+bb3.jsonl.done, поэтому
+
+    python -m core.enumeration -n 3 -m 2 -o bb3.jsonl --max-steps 1000 --resume
+
+продолжает прерванный перебор с того же места. Итоги (число машин каждого
+класса и чемпион по числу шагов) выводятся JSON-объектом.
+"""
+import argparse
+import json
+import os
+import sys
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+
+from core.deciders import HALT, UNDECIDED, decide
+from core.engine import LIMIT, CompiledTable, CompiledTape, execute_macro
+from core.tape import Direction, TuringTape
+
+BLANK = "_"
+HALT_STATE = "Qa"
+# Число поддеревьев не зависит от числа процессов: отметки в .done
+# ссылаются на корни поддеревьев, и продолжение с другим -j должно
+# разбить дерево так же
+UNITS = 256
+
+# Правило машины: (записываемый символ, сдвиг +1/-1, следующее состояние)
+# или None, если правило не задано. Незаданное правило останавливает машину.
+Rule = Optional[Tuple[int, int, int]]
+
+
+def _state_name(q: int) -> str:
+    return f"Q{q}"
+
+
+def _symbol_name(s: int) -> str:
+    return BLANK if s == 0 else str(s)
+
+
+def transitions(rules, n: int, m: int) -> dict:
+    # Таблица переходов проекта; незаданные правила пишут 1 и переходят в Qa
+    table = {}
+    for q in range(n):
+        for s in range(m):
+            rule = rules[q * m + s]
+            if rule is None:
+                table[(_state_name(q), _symbol_name(s))] = (_symbol_name(1 % m), Direction.RIGHT, HALT_STATE)
+                continue
+            write, move, next_state = rule
+            table[(_state_name(q), _symbol_name(s))] = (
+                _symbol_name(write), Direction.RIGHT if move > 0 else Direction.LEFT, _state_name(next_state)
+            )
+    return table
+
+
+def machine_code(rules, n: int, m: int) -> str:
+    # Стандартная запись: «1RB1LB_1LA---», состояния — буквы, --- — останов
+    parts = []
+    for q in range(n):
+        row = []
+        for s in range(m):
+            rule = rules[q * m + s]
+            if rule is None:
+                row.append("---")
+            else:
+                write, move, next_state = rule
+                row.append(f"{write}{'R' if move > 0 else 'L'}{chr(ord('A') + next_state)}")
+        parts.append("".join(row))
+    return "_".join(parts)
+
+
+def parse_code(code: str) -> Tuple[List[Rule], int, int]:
+    rows = code.split("_")
+    n = len(rows)
+    m = len(rows[0]) // 3
+    rules = []
+    for row in rows:
+        if len(row) != 3 * m:
+            raise ValueError(f"Некорректная запись машины: {code}")
+        for i in range(0, len(row), 3):
+            part = row[i:i + 3]
+            if part == "---":
+                rules.append(None)
+                continue
+            if part[1] not in "LR" or not part[0].isdigit() or not "A" <= part[2] <= "Z":
+                raise ValueError(f"Некорректное правило {part} в записи {code}")
+            rules.append((int(part[0]), 1 if part[1] == "R" else -1, ord(part[2]) - ord("A")))
+    return rules, n, m
+
+
+def _compile(rules, n: int, m: int) -> CompiledTable:
+    # Незаданные правила не попадают в таблицу и ловятся движком как NO_RULE;
+    # раскладка таблицы одинакова для всех машин с данными n и m
+    table = {}
+    for q in range(n):
+        for s in range(m):
+            rule = rules[q * m + s]
+            if rule is not None:
+                write, move, next_state = rule
+                table[(_state_name(q), _symbol_name(s))] = (
+                    _symbol_name(write), Direction.RIGHT if move > 0 else Direction.LEFT, _state_name(next_state)
+                )
+    return CompiledTable(
+        table, set(), BLANK,
+        extra_states=[_state_name(q) for q in range(n)],
+        extra_symbols=[_symbol_name(s) for s in range(m)]
+    )
+
+
+def _choices(rules, n: int, m: int):
+    # Симметрии: зеркальная (первое правило сдвигает вправо) и переименование
+    # состояний и символов (новые вводятся по порядку номеров)
+    defined = [rule for rule in rules if rule is not None]
+    states = {0}
+    symbols = {0}
+    for q in range(n):
+        for s in range(m):
+            if rules[q * m + s] is not None:
+                states.add(q)
+    for write, _, next_state in defined:
+        states.add(next_state)
+        symbols.add(write)
+    new_state = next((q for q in range(n) if q not in states), None)
+    new_symbol = next((s for s in range(m) if s not in symbols), None)
+    targets = sorted(states) + ([new_state] if new_state is not None else [])
+    writes = sorted(symbols) + ([new_symbol] if new_symbol is not None else [])
+    moves = (1,) if not defined else (-1, 1)
+    for write in writes:
+        for move in moves:
+            for next_state in targets:
+                yield write, move, next_state
+
+
+def expand(rules, n: int, m: int, max_steps: int, tape: CompiledTape = None, state: int = 0, steps: int = 0):
+    # Исполняет узел дерева с конфигурации, на которой остановился родитель.
+    # Возвращает запись о машине и дочерние узлы: по одному на каждый вариант
+    # правила, на котором машина остановилась
+    table = _compile(rules, n, m)
+    if tape is None:
+        tape = CompiledTape(table, TuringTape("", BLANK))
+    tape.table = table
+    status, state, steps = execute_macro(table, tape, state, steps, max_steps)
+    code = machine_code(rules, n, m)
+    if status == LIMIT:
+        record = decide(table, _state_name(0), max_steps)
+        if record["class"] == HALT:
+            record["class"] = UNDECIDED
+        record["machine"] = code
+        return record, []
+
+    # Останов на незаданном правиле; правило останова пишет 1, как принято
+    # в задаче об усердном бобре
+    cells = tape.cells
+    symbol = cells[tape.pos]
+    sigma = sum(1 for c in cells if c and c != table.edge) + (symbol == 0)
+    record = {"class": HALT, "steps": steps + 1, "sigma": sigma, "machine": code}
+    children = []
+    slot = state // table.width * m + symbol
+    # Машина без единого незаданного правила остановиться не может
+    if sum(rule is None for rule in rules) > 1:
+        for rule in _choices(rules, n, m):
+            child = list(rules)
+            child[slot] = rule
+            children.append((tuple(child), tape.copy(), state, steps))
+    return record, children
+
+
+def explore(rules, n: int, m: int, max_steps: int) -> List[dict]:
+    # Обход поддерева в глубину; корень исполняется с пустой ленты
+    records = []
+    stack = [(tuple(rules), None, 0, 0)]
+    while stack:
+        node_rules, tape, state, steps = stack.pop()
+        record, children = expand(node_rules, n, m, max_steps, tape, state, steps)
+        records.append(record)
+        stack.extend(reversed(children))
+    return records
+
+
+def split(n: int, m: int, max_steps: int, units: int):
+    # Раскрывает верх дерева в ширину, пока не наберётся units поддеревьев.
+    # Возвращает записи о раскрытых узлах и корни поддеревьев
+    records = []
+    frontier = [((None,) * (n * m), None, 0, 0)]
+    while frontier and len(frontier) < units:
+        level = []
+        for node_rules, tape, state, steps in frontier:
+            record, children = expand(node_rules, n, m, max_steps, tape, state, steps)
+            records.append(record)
+            level.extend(children)
+        frontier = level
+    return records, [node[0] for node in frontier]
+
+
+def _explore_unit(args) -> Tuple[str, List[dict]]:
+    rules, n, m, max_steps = args
+    return machine_code(rules, n, m), explore(rules, n, m, max_steps)
+
+
+def _read_progress(path: str):
+    # Завершённые поддеревья, длина файла результатов после последнего из них
+    # и длина файла отметок до первой недописанной или испорченной строки
+    done = set()
+    offset = 0
+    valid = 0
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                    unit, end = entry["unit"], entry["offset"]
+                except (ValueError, KeyError, TypeError):
+                    break
+                done.add(unit)
+                offset = max(offset, end)
+                valid += len(line)
+    except FileNotFoundError:
+        pass
+    return done, offset, valid
+
+
+def run_enumeration(n: int, m: int, output: str, max_steps: int = 1000, jobs: int = 1, resume: bool = False) -> None:
+    progress = output + ".done"
+    done, offset, valid = _read_progress(progress) if resume else (set(), 0, 0)
+    if resume and os.path.exists(output):
+        # Записи незавершённых поддеревьев отбрасываются и пересчитываются
+        with open(output, "r+b") as f:
+            f.truncate(offset)
+    if resume and os.path.exists(progress):
+        # Новые отметки дописываются после последней целой строки
+        with open(progress, "r+b") as f:
+            f.truncate(valid)
+    mode = "a" if resume else "w"
+
+    records, roots = split(n, m, max_steps, UNITS)
+    units = [
+        (rules, n, m, max_steps) for rules in roots
+        if machine_code(rules, n, m) not in done
+    ]
+    with open(output, mode, encoding="utf-8") as out, open(progress, mode, encoding="utf-8") as marks:
+        def commit(unit: str, unit_records):
+            for record in unit_records:
+                out.write(json.dumps(record))
+                out.write("\n")
+            out.flush()
+            marks.write(json.dumps({"unit": unit, "offset": out.tell()}))
+            marks.write("\n")
+            marks.flush()
+
+        # Верх дерева раскрывается одинаково при каждом запуске; его записи — поддерево ""
+        if "" not in done:
+            commit("", records)
+        if jobs <= 1:
+            for unit in units:
+                commit(*_explore_unit(unit))
+            return
+        with Pool(jobs) as pool:
+            for unit, unit_records in pool.imap_unordered(_explore_unit, units):
+                commit(unit, unit_records)
+
+
+def summarize(path: str) -> dict:
+    counts = {}
+    champion = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            counts[record["class"]] = counts.get(record["class"], 0) + 1
+            if record["class"] == HALT and (champion is None or record["steps"] > champion["steps"]):
+                champion = record
+    return {"machines": sum(counts.values()), "classes": counts, "champion": champion}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.enumeration", description="Перебор малых машин Тьюринга")
+    parser.add_argument("-n", "--states", type=int, required=True, help="число состояний")
+    parser.add_argument("-m", "--symbols", type=int, default=2, help="число символов, включая пустой")
+    parser.add_argument("-o", "--output", required=True, help="файл результатов JSON Lines")
+    parser.add_argument("--max-steps", type=int, default=1000, help="ограничение числа шагов на машину")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="число процессов")
+    parser.add_argument("--resume", action="store_true", help="продолжить прерванный перебор")
+    args = parser.parse_args(argv)
+    if not 1 <= args.states <= 26 or not 2 <= args.symbols <= 10:
+        parser.error("допустимо от 1 до 26 состояний и от 2 до 10 символов")
+
+    try:
+        run_enumeration(args.states, args.symbols, args.output, args.max_steps, args.jobs, args.resume)
+    except KeyboardInterrupt:
+        print("Прервано; продолжить можно с --resume", file=sys.stderr)
+        return 130
+    print(json.dumps(summarize(args.output), ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
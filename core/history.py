@@ -0,0 +1,88 @@
+from array import array
+from typing import Dict, List, Tuple
+
+# Запись отката: предыдущее состояние, предыдущий символ под головкой, сдвиг головки
+UNDO_RECORD = 3
+
+Checkpoint = Tuple[str, int, Dict[int, str]]
+
+
+# История выполнения для обратного хода: компактная запись отката на каждый шаг
+# и периодические полные снимки конфигурации. Записи отката хранятся только для
+# последних undo_limit шагов; дальше назад seek() восстанавливает ближайший
+# снимок и доигрывает шаги вперёд. Снимков не больше max_checkpoints: при
+# переполнении каждый второй удаляется, а интервал между ними удваивается.
+class ExecutionHistory:
+    def __init__(self, checkpoint_interval: int = 1000, undo_limit: int = 100000, max_checkpoints: int = 64):
+        if checkpoint_interval <= 0:
+            raise ValueError("Интервал между снимками должен быть положительным")
+        self.checkpoint_interval = checkpoint_interval
+        self.undo_limit = undo_limit
+        self.max_checkpoints = max_checkpoints
+        self.checkpoints: Dict[int, Checkpoint] = {}
+        self._states: List[str] = []
+        self._state_ids = {}
+        self._symbols: List[str] = []
+        self._symbol_ids = {}
+        self._undo = array("i")
+        self._base = 0
+
+    def start(self, machine):
+        self.checkpoints.clear()
+        self._undo = array("i")
+        self._base = machine.steps_done
+        self.checkpoint(machine)
+
+    @property
+    def first_step(self) -> int:
+        return min(self.checkpoints)
+
+    def undo_available(self) -> int:
+        return len(self._undo) // UNDO_RECORD
+
+    def checkpoint(self, machine):
+        self.checkpoints[machine.steps_done] = (
+            machine.current_state, machine.tape.head, dict(machine.tape.items())
+        )
+        if len(self.checkpoints) > self.max_checkpoints:
+            first = min(self.checkpoints)
+            self.checkpoint_interval *= 2
+            for step in list(self.checkpoints):
+                if step != first and (step - first) % self.checkpoint_interval:
+                    del self.checkpoints[step]
+
+    def record(self, state: str, symbol: str, move: int):
+        sid = self._state_ids.get(state)
+        if sid is None:
+            sid = self._state_ids[state] = len(self._states)
+            self._states.append(state)
+        cid = self._symbol_ids.get(symbol)
+        if cid is None:
+            cid = self._symbol_ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        self._undo.extend((sid, cid, move))
+        if len(self._undo) > 2 * UNDO_RECORD * self.undo_limit:
+            drop = self.undo_available() - self.undo_limit
+            del self._undo[:drop * UNDO_RECORD]
+            self._base += drop
+
+    def after_step(self, machine):
+        if (machine.steps_done - self.first_step) % self.checkpoint_interval == 0:
+            self.checkpoint(machine)
+
+    def pop(self) -> Tuple[str, str, int]:
+        sid, cid, move = self._undo[-UNDO_RECORD:]
+        del self._undo[-UNDO_RECORD:]
+        return self._states[sid], self._symbols[cid], move
+
+    def discard_after(self, step: int):
+        # Снимки после step устарели: выполнение пошло по другому пути (откат или перезапуск)
+        for later in [s for s in self.checkpoints if s > step]:
+            del self.checkpoints[later]
+
+    def nearest_checkpoint(self, step: int) -> int:
+        return max(s for s in self.checkpoints if s <= step)
+
+    def reset_undo(self, step: int):
+        self._undo = array("i")
+        self._base = step
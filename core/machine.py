@@ -1,5 +1,25 @@
-from typing import Dict, Set, Tuple
-from core.tape import TuringTape, Direction
+from typing import Dict, Optional, Set, Tuple
+from core.breakpoints import Breakpoints
+from core.tape import TuringTape, Direction, make_tape
+from core.engine import OFFSETS, run_compiled
+from core.cycle import CycleDetector
+from core.history import ExecutionHistory
+from core.profile import ExecutionProfile
+from core.trace import ExecutionTrace, TRACE_FULL
+
+def no_rule_message(state: str, symbol) -> str:
+    # symbol — кортеж для машины с несколькими лентами
+    what = f"символов '{''.join(symbol)}'" if isinstance(symbol, tuple) else f"символа '{symbol}'"
+    return (
+        "Ошибка выполнения!\n"
+        f"Для состояния '{state}' и {what} "
+        "не найдено правило перехода в таблице."
+    )
+
+
+def step_limit_message(max_steps: int) -> str:
+    return f"Превышено максимальное число шагов ({max_steps})."
+
 
 class TuringMachine:
     def __init__(
@@ -9,7 +29,13 @@ class TuringMachine:
             transition_table: Dict[Tuple[str, str], Tuple[str, Direction, str]],
             tape: TuringTape,
             alphabet: Set[str],
-            max_steps: int = 1000
+            max_steps: int = 1000,
+            engine: str = "interpreter",
+            trace: str = TRACE_FULL,
+            trace_limit: int = 1000,
+            history: bool = False,
+            checkpoint_interval: int = 1000,
+            detect_cycles: bool = False
     ):
         self.tape = tape
         self.current_state = initial_state
@@ -17,13 +43,45 @@ class TuringMachine:
         self.transition_table = transition_table
         self.alphabet = alphabet
         self.max_steps = max_steps
+        self.engine = engine
         self.is_halted = False
         self.error_occurred = False
         self.error_message = ""
         self.steps_done = 0
-        self.trace = []
+        self.trace = ExecutionTrace(trace, trace_limit)
+        self.history = ExecutionHistory(checkpoint_interval) if history else None
+        if self.history is not None:
+            self.history.start(self)
+        self.detect_cycles = detect_cycles
+        self.cycle = None
+        self.cycles = CycleDetector(self) if detect_cycles else None
+        # Точки останова и последнее срабатывание (None, если run() не прерывался)
+        self.breakpoints = Breakpoints()
+        self.break_hit = None
+        # Профиль исполнения; None — профилирование выключено (см. start_profiling)
+        self.profile = None
+
+    @classmethod
+    def from_input(
+            cls,
+            initial_state: str,
+            final_states: Set[str],
+            transition_table: Dict[Tuple[str, str], Tuple[str, Direction, str]],
+            input_str: str,
+            alphabet: Set[str],
+            blank_symbol: str = "_",
+            tape_backend: str = None,
+            **kwargs
+    ) -> "TuringMachine":
+        # Без явного tape_backend бэкенд ленты выбирается по размеру алфавита (см. make_tape)
+        symbols = set(alphabet)
+        for (_, symbol), (new_symbol, _, _) in transition_table.items():
+            symbols.update((symbol, new_symbol))
+        tape = make_tape(input_str, blank_symbol, symbols, tape_backend)
+        return cls(initial_state, final_states, transition_table, tape, alphabet, **kwargs)
 
     def step(self) -> bool:
+        self.break_hit = None
         if self.is_halted:
             return False
 
@@ -31,36 +89,156 @@ class TuringMachine:
         transition_key = (self.current_state, current_symbol)
 
         if transition_key not in self.transition_table:
-            self.is_halted = True
-            self.error_occurred = True
-            self.error_message = (
-                "Ошибка выполнения!\n"
-                f"Для состояния '{self.current_state}' и символа '{current_symbol}' "
-                "не найдено правило перехода в таблице."
-            )
+            self.halt_no_rule(current_symbol)
             return False
 
         new_symbol, direction, new_state = self.transition_table[transition_key]
-        self.trace.append((self.current_state, current_symbol, new_symbol, direction, new_state))
+        if self.trace.enabled:
+            self.trace.append(self.current_state, current_symbol, new_symbol, direction, new_state)
+        if self.history is not None:
+            self.history.record(self.current_state, current_symbol, OFFSETS[direction])
 
+        head = self.tape.head
         self.tape.write(new_symbol)
         self.tape.move(direction)
+        if self.cycles is not None:
+            self.cycles.update(head, current_symbol, new_symbol, self.current_state, new_state, self.tape.head)
+        if self.profile is not None:
+            self.profile.record(transition_key, self.tape.head)
         self.current_state = new_state
 
         self.steps_done += 1
 
         if self.current_state in self.final_states:
             self.is_halted = True
+        elif self.cycles is not None:
+            cycle = self.cycles.check(self)
+            if cycle is not None:
+                self.halt_cycle(*cycle)
+        if self.history is not None:
+            self.history.after_step(self)
+        if self.breakpoints and not self.is_halted:
+            self.break_hit = self.breakpoints.check_step(self, transition_key[0], head, current_symbol)
         return True
 
+    def step_back(self, n: int = 1) -> int:
+        # Откат на n шагов; возвращает число реально отменённых шагов
+        before = self.steps_done
+        self.seek(max(before - n, 0))
+        return before - self.steps_done
+
+    def seek(self, step: int) -> None:
+        if self.history is None:
+            raise RuntimeError("История выполнения не ведётся (history=False)")
+
+        if step >= self.steps_done:
+            target = min(step, self.max_steps)
+            with self.tape.batch():
+                while not self.is_halted and self.steps_done < target:
+                    self.step()
+            return
+
+        history = self.history
+        step = max(step, history.first_step)
+        with self.tape.batch():
+            if self.steps_done - step > history.undo_available():
+                checkpoint = history.nearest_checkpoint(step)
+                state, head, cells = history.checkpoints[checkpoint]
+                self.tape.restore(cells, head)
+                self.current_state = state
+                self.steps_done = checkpoint
+                self.trace.truncate(checkpoint)
+                history.reset_undo(checkpoint)
+                history.discard_after(checkpoint)
+                self._clear_halt()
+                while self.steps_done < step:
+                    self.step()
+            else:
+                while self.steps_done > step:
+                    state, symbol, move = history.pop()
+                    if move:
+                        self.tape.move(Direction.LEFT if move > 0 else Direction.RIGHT)
+                    self.tape.write(symbol)
+                    self.current_state = state
+                    self.steps_done -= 1
+                self.trace.truncate(step)
+                history.discard_after(step)
+        self._clear_halt()
+        if self.detect_cycles:
+            self.cycles = CycleDetector(self)
+
+    def _clear_halt(self) -> None:
+        self.is_halted = False
+        self.error_occurred = False
+        self.error_message = ""
+        self.cycle = None
+        self.break_hit = None
+
     def run(self) -> None:
-        while not self.is_halted and self.steps_done < self.max_steps:
-            self.step()
+        # Останавливается на точке останова (break_hit); повторный вызов
+        # продолжает выполнение с правила, на котором произошёл останов.
+        # Поиск циклов встроен только в пошаговый интерпретатор
+        if self.engine in ("compiled", "macro", "codegen") and not self.detect_cycles:
+            self.run_fast(macro=self.engine == "macro", codegen=self.engine == "codegen")
+            return
+
+        with self.tape.batch():
+            if self.break_hit is None and self.breakpoints and not self.is_halted:
+                self.break_hit = self.breakpoints.check_next(self.current_state, self.tape.read())
+            else:
+                self.break_hit = None
+            while self.break_hit is None and not self.is_halted and self.steps_done < self.max_steps:
+                self.step()
+
+        if self.profile is not None:
+            self.profile.observe_tape(self.tape)
+        if self.break_hit is not None:
+            return
 
         if not self.is_halted and self.steps_done >= self.max_steps:
-            self.is_halted = True
-            self.error_occurred = True
-            self.error_message = f"Превышено максимальное число шагов ({self.max_steps})."
+            self.halt_step_limit()
+
+    def run_fast(self, macro: bool = False, codegen: bool = False) -> None:
+        # Скомпилированный движок: тот же результат, что и run(), но трасса не ведётся.
+        # macro=True дополнительно проходит серии под петлями-проходами за одну операцию,
+        # codegen=True исполняет сгенерированный для этой таблицы код на Python.
+        run_compiled(self, macro, codegen)
+        if self.history is not None:
+            self.history.start(self)
+        if self.detect_cycles:
+            self.cycles = CycleDetector(self)
+
+    def start_profiling(self) -> ExecutionProfile:
+        # Счётчики срабатываний правил, диапазон головки и границы ленты
+        # для всех движков; новый вызов начинает профиль заново
+        self.profile = ExecutionProfile(self.transition_table)
+        self.profile.add_head_range(self.tape.head, self.tape.head)
+        return self.profile
+
+    def stop_profiling(self) -> Optional[ExecutionProfile]:
+        profile, self.profile = self.profile, None
+        if profile is not None:
+            profile.observe_tape(self.tape)
+        return profile
+
+    def halt_no_rule(self, symbol: str) -> None:
+        self.is_halted = True
+        self.error_occurred = True
+        self.error_message = no_rule_message(self.current_state, symbol)
+
+    def halt_cycle(self, step: int, period: int) -> None:
+        self.is_halted = True
+        self.error_occurred = True
+        self.cycle = (step, period)
+        self.error_message = (
+            f"Обнаружен цикл на шаге {step}, период {period}.\n"
+            "Конфигурация машины повторилась, выполнение никогда не завершится."
+        )
+
+    def halt_step_limit(self) -> None:
+        self.is_halted = True
+        self.error_occurred = True
+        self.error_message = step_limit_message(self.max_steps)
 
     def get_tape_snapshot(self, window: int = 10) -> str:
         return self.tape.get_tape_snapshot(window)
@@ -0,0 +1,100 @@
+from contextlib import ExitStack
+from typing import Dict, List, Set, Tuple
+
+from core.machine import no_rule_message, step_limit_message
+from core.tape import Direction, TuringTape
+
+MultiKey = Tuple[str, Tuple[str, ...]]
+MultiAction = Tuple[Tuple[str, ...], Tuple[Direction, ...], str]
+
+
+# Машина с k лентами и k независимыми головками. Правило выбирается по
+# состоянию и кортежу символов под всеми головками и задаёт символ и сдвиг
+# для каждой ленты.
+class MultiTapeTuringMachine:
+    def __init__(
+            self,
+            initial_state: str,
+            final_states: Set[str],
+            transition_table: Dict[MultiKey, MultiAction],
+            tapes: List[TuringTape],
+            alphabet: Set[str],
+            max_steps: int = 1000
+    ):
+        if not tapes:
+            raise ValueError("Нужна хотя бы одна лента")
+        for (state, symbols), (new_symbols, directions, _) in transition_table.items():
+            if not len(symbols) == len(new_symbols) == len(directions) == len(tapes):
+                raise ValueError(f"Правило для состояния '{state}' не соответствует числу лент ({len(tapes)})")
+        self.tapes = tapes
+        self.current_state = initial_state
+        self.final_states = final_states
+        self.transition_table = transition_table
+        self.alphabet = alphabet
+        self.max_steps = max_steps
+        self.is_halted = False
+        self.error_occurred = False
+        self.error_message = ""
+        self.steps_done = 0
+        self.history = None
+        self.cycle = None
+
+    @property
+    def tape(self) -> TuringTape:
+        return self.tapes[0]
+
+    @property
+    def tape_count(self) -> int:
+        return len(self.tapes)
+
+    def read(self) -> Tuple[str, ...]:
+        return tuple(tape.read() for tape in self.tapes)
+
+    def step(self) -> bool:
+        if self.is_halted:
+            return False
+
+        current_symbols = self.read()
+        transition_key = (self.current_state, current_symbols)
+
+        if transition_key not in self.transition_table:
+            self.halt_no_rule(current_symbols)
+            return False
+
+        new_symbols, directions, new_state = self.transition_table[transition_key]
+        for tape, symbol, direction in zip(self.tapes, new_symbols, directions):
+            tape.write(symbol)
+            tape.move(direction)
+        self.current_state = new_state
+
+        self.steps_done += 1
+
+        if self.current_state in self.final_states:
+            self.is_halted = True
+        return True
+
+    def run(self) -> None:
+        with ExitStack() as stack:
+            for tape in self.tapes:
+                stack.enter_context(tape.batch())
+            while not self.is_halted and self.steps_done < self.max_steps:
+                self.step()
+
+        if not self.is_halted and self.steps_done >= self.max_steps:
+            self.is_halted = True
+            self.error_occurred = True
+            self.error_message = step_limit_message(self.max_steps)
+
+    def halt_no_rule(self, symbols: Tuple[str, ...]) -> None:
+        self.is_halted = True
+        self.error_occurred = True
+        self.error_message = no_rule_message(self.current_state, symbols)
+
+    def get_current_state(self) -> str:
+        return self.current_state
+
+    def get_tape_output(self) -> str:
+        return str(self.tapes[0])
+
+    def get_tape_outputs(self) -> List[str]:
+        return [str(tape) for tape in self.tapes]
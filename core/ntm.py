@@ -0,0 +1,210 @@
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+from core.engine import OFFSETS
+from core.tape import Direction
+
+Action = Tuple[str, Direction, str]
+PathEntry = Tuple[str, str, str, Direction, str]
+
+
+# Неизменяемая лента для перебора конфигураций. Ячейки хранятся кусками по
+# CHUNK символов; запись копирует только один кусок и словарь ссылок на куски,
+# остальные куски остаются общими у всех ветвей (копирование при записи).
+class PersistentTape:
+    CHUNK = 64
+
+    __slots__ = ("blank", "chunks", "_key")
+
+    def __init__(self, blank: str, chunks: Dict[int, tuple] = None):
+        self.blank = blank
+        self.chunks = chunks if chunks is not None else {}
+        self._key = None
+
+    @classmethod
+    def from_string(cls, input_str: str, blank: str = "_") -> "PersistentTape":
+        tape = cls(blank)
+        for i, ch in enumerate(input_str):
+            if ch != blank:
+                tape = tape.write(i, ch)
+        return tape
+
+    def read(self, pos: int) -> str:
+        chunk = self.chunks.get(pos // self.CHUNK)
+        return chunk[pos % self.CHUNK] if chunk is not None else self.blank
+
+    def write(self, pos: int, symbol: str) -> "PersistentTape":
+        if self.read(pos) == symbol:
+            return self
+        idx, off = divmod(pos, self.CHUNK)
+        chunk = self.chunks.get(idx) or (self.blank,) * self.CHUNK
+        chunk = chunk[:off] + (symbol,) + chunk[off + 1:]
+        chunks = dict(self.chunks)
+        if symbol == self.blank and all(ch == self.blank for ch in chunk):
+            del chunks[idx]
+        else:
+            chunks[idx] = chunk
+        return PersistentTape(self.blank, chunks)
+
+    def key(self) -> frozenset:
+        if self._key is None:
+            self._key = frozenset(self.chunks.items())
+        return self._key
+
+    def items(self):
+        result = []
+        for idx in sorted(self.chunks):
+            base = idx * self.CHUNK
+            result.extend((base + off, ch) for off, ch in enumerate(self.chunks[idx]) if ch != self.blank)
+        return result
+
+    def __str__(self):
+        items = self.items()
+        if not items:
+            return ""
+        lo, hi = items[0][0], items[-1][0]
+        return "".join(self.read(pos) for pos in range(lo, hi + 1))
+
+
+class _Node:
+    __slots__ = ("state", "head", "tape", "depth", "parent", "entry")
+
+    def __init__(self, state, head, tape, depth, parent=None, entry=None):
+        self.state = state
+        self.head = head
+        self.tape = tape
+        self.depth = depth
+        self.parent = parent
+        self.entry = entry
+
+    def key(self):
+        return self.state, self.head, self.tape.key()
+
+    def path(self) -> List[PathEntry]:
+        entries = []
+        node = self
+        while node.parent is not None:
+            entries.append(node.entry)
+            node = node.parent
+        entries.reverse()
+        return entries
+
+
+# Недетерминированная машина: паре (состояние, символ) соответствует список
+# действий. Машина принимает вход, если хотя бы одна ветвь вычисления
+# переходит в заключительное состояние не более чем за max_steps шагов.
+class NondeterministicTuringMachine:
+    def __init__(
+            self,
+            initial_state: str,
+            final_states: Set[str],
+            transition_table: Dict[Tuple[str, str], List[Action]],
+            input_str: str = "",
+            blank_symbol: str = "_",
+            max_steps: int = 1000,
+            max_configurations: int = 10 ** 6
+    ):
+        self.initial_state = initial_state
+        self.final_states = final_states
+        self.transition_table = {
+            key: [actions] if isinstance(actions, tuple) else list(actions)
+            for key, actions in transition_table.items()
+        }
+        self.tape = PersistentTape.from_string(input_str, blank_symbol)
+        self.max_steps = max_steps
+        self.max_configurations = max_configurations
+        self.accepted = False
+        self.accepting_path: List[PathEntry] = []
+        self.final_state: Optional[str] = None
+        self.final_head = 0
+        self.final_tape: Optional[PersistentTape] = None
+        self.explored = 0
+        self.error_occurred = False
+        self.error_message = ""
+
+    def _successors(self, node: _Node):
+        symbol = node.tape.read(node.head)
+        for new_symbol, direction, new_state in self.transition_table.get((node.state, symbol), ()):
+            yield _Node(
+                new_state,
+                node.head + OFFSETS[direction],
+                node.tape.write(node.head, new_symbol),
+                node.depth + 1,
+                node,
+                (node.state, symbol, new_symbol, direction, new_state)
+            )
+
+    def _accept(self, node: _Node) -> bool:
+        self.accepted = True
+        self.accepting_path = node.path()
+        self.final_state = node.state
+        self.final_head = node.head
+        self.final_tape = node.tape
+        return True
+
+    def _budget_exceeded(self) -> bool:
+        if self.explored < self.max_configurations:
+            return False
+        self.error_occurred = True
+        self.error_message = f"Превышено максимальное число конфигураций ({self.max_configurations})."
+        return True
+
+    def run(self, strategy: str = "bfs") -> bool:
+        if strategy == "bfs":
+            return self.run_bfs()
+        if strategy == "iddfs":
+            return self.run_iddfs()
+        raise ValueError(f"Неизвестная стратегия поиска: {strategy}")
+
+    def run_bfs(self) -> bool:
+        root = _Node(self.initial_state, 0, self.tape, 0)
+        if root.state in self.final_states:
+            return self._accept(root)
+        visited = {root.key()}
+        queue = deque([root])
+        while queue:
+            if self._budget_exceeded():
+                return False
+            node = queue.popleft()
+            self.explored += 1
+            if node.depth >= self.max_steps:
+                continue
+            for child in self._successors(node):
+                if child.state in self.final_states:
+                    return self._accept(child)
+                key = child.key()
+                if key not in visited:
+                    visited.add(key)
+                    queue.append(child)
+        return False
+
+    def run_iddfs(self) -> bool:
+        # Поиск в глубину с растущим ограничением глубины: находит кратчайший
+        # принимающий путь, как BFS, без очереди фронта, но каждый проход
+        # заново обходит верхние уровни. best_depth помнит все конфигурации
+        # текущего прохода, так что память растёт с их числом, как visited в BFS
+        root = _Node(self.initial_state, 0, self.tape, 0)
+        if root.state in self.final_states:
+            return self._accept(root)
+        for limit in range(1, self.max_steps + 1):
+            best_depth = {root.key(): 0}
+            stack = [root]
+            deeper = False
+            while stack:
+                if self._budget_exceeded():
+                    return False
+                node = stack.pop()
+                self.explored += 1
+                if node.depth >= limit:
+                    deeper = True
+                    continue
+                for child in self._successors(node):
+                    if child.state in self.final_states:
+                        return self._accept(child)
+                    key = child.key()
+                    if best_depth.get(key, limit + 1) > child.depth:
+                        best_depth[key] = child.depth
+                        stack.append(child)
+            if not deeper:
+                break
+        return False
@@ -0,0 +1,206 @@
+from typing import Dict, List, Set, Tuple
+
+from core.tape import Direction
+
+
+def _is_stay(direction) -> bool:
+    # Для нескольких лент правило стоит на месте, только если стоят все головки
+    if isinstance(direction, tuple):
+        return all(d == Direction.STAY for d in direction)
+    return direction == Direction.STAY
+
+
+def _states(transitions: dict, final_states: Set[str]) -> List[str]:
+    states = []
+    seen = set(final_states)
+    for (state, _), (_, _, next_state) in transitions.items():
+        for s in (state, next_state):
+            if s not in seen:
+                seen.add(s)
+                states.append(s)
+    return states
+
+
+# Что изменила оптимизация: удалённые недостижимые состояния и состояния,
+# через которые проходили только свёрнутые цепочки STAY, число правил
+# заключительных состояний, слитые эквивалентные состояния (состояние ->
+# оставшийся представитель), правила, в которые свернулись цепочки STAY
+# (правило -> сэкономлено шагов за срабатывание), и переименования.
+class OptimizationReport:
+    def __init__(self, transitions: dict, final_states: Set[str]):
+        self.rules_before = len(transitions)
+        self.states_before = len(_states(transitions, final_states))
+        self.rules_after = self.rules_before
+        self.states_after = self.states_before
+        self.unreachable: List[str] = []
+        self.bypassed: List[str] = []
+        self.dead_rules = 0
+        self.merged: Dict[str, str] = {}
+        self.collapsed: Dict[tuple, int] = {}
+        self.renamed: Dict[str, str] = {}
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.unreachable or self.bypassed or self.dead_rules or self.merged or self.collapsed)
+
+    def summary(self) -> str:
+        if not self.changed:
+            return "Таблица уже оптимальна."
+        lines = [
+            f"Состояний: {self.states_before} → {self.states_after}, "
+            f"правил: {self.rules_before} → {self.rules_after}."
+        ]
+        if self.unreachable:
+            lines.append("Удалены недостижимые состояния: " + ", ".join(self.unreachable))
+        if self.bypassed:
+            lines.append("Удалены состояния внутри свёрнутых цепочек STAY: " + ", ".join(self.bypassed))
+        if self.dead_rules:
+            lines.append(f"Удалено правил, которые никогда не срабатывают: {self.dead_rules}")
+        if self.merged:
+            lines.append("Слиты эквивалентные состояния: " + ", ".join(
+                f"{state} → {target}" for state, target in self.merged.items()
+            ))
+        if self.collapsed:
+            lines.append("Свёрнуты цепочки STAY: " + ", ".join(
+                f"({state}, {''.join(symbol)}) −{saved}" for (state, symbol), saved in self.collapsed.items()
+            ))
+        renamed = [f"{state} → {name}" for state, name in self.renamed.items() if state != name]
+        if renamed:
+            lines.append("Перенумерованы состояния: " + ", ".join(renamed))
+        return "\n".join(lines)
+
+
+def collapse_stays(transitions: dict, final_states: Set[str]) -> Tuple[dict, Dict[tuple, int]]:
+    # Правило с STAY в незаключительное состояние p: следующим шагом машина
+    # прочтёт только что записанный символ в состоянии p, поэтому оба шага
+    # заменяются одним правилом. Цепочка обрывается на сдвиге головки,
+    # заключительном состоянии или отсутствии правила (ошибка останется той же).
+    # Бесконечные циклы из STAY не трогаются.
+    result = {}
+    collapsed = {}
+    for key, rule in transitions.items():
+        symbol, direction, state = rule
+        seen = {key}
+        looped = False
+        while _is_stay(direction) and state not in final_states:
+            next_key = (state, symbol)
+            if next_key not in transitions:
+                break
+            if next_key in seen:
+                looped = True
+                break
+            seen.add(next_key)
+            symbol, direction, state = transitions[next_key]
+        if len(seen) > 1 and not looped:
+            collapsed[key] = len(seen) - 1
+            rule = (symbol, direction, state)
+        result[key] = rule
+    return result, collapsed
+
+
+def reachable_states(transitions: dict, start: str, final_states: Set[str]) -> List[str]:
+    # Состояния в порядке обхода в ширину от начального; из заключительных
+    # состояний переходов нет — машина в них останавливается
+    rules = {}
+    for (state, _), (_, _, next_state) in transitions.items():
+        rules.setdefault(state, []).append(next_state)
+    order = [start]
+    seen = {start}
+    for state in order:
+        if state in final_states:
+            continue
+        for next_state in rules.get(state, ()):
+            if next_state not in seen:
+                seen.add(next_state)
+                order.append(next_state)
+    return order
+
+
+def equivalent_states(transitions: dict, states: List[str], final_states: Set[str]) -> Dict[str, str]:
+    # Разбиение на классы эквивалентности уточнением (как минимизация автомата):
+    # сначала по набору (символ, запись, сдвиг) правил, затем по классам
+    # следующих состояний, пока число классов растёт. Заключительные
+    # состояния различимы по имени и не сливаются. Представитель класса —
+    # первое состояние в порядке states.
+    rows = {state: [] for state in states}
+    for (state, symbol), (new_symbol, direction, next_state) in transitions.items():
+        if state in rows:
+            rows[state].append((symbol, new_symbol, direction, next_state))
+
+    def class_of(state, classes):
+        return ("final", state) if state in final_states else classes[state]
+
+    classes = {state: frozenset(r[:3] for r in rows[state]) for state in states}
+    count = len(set(classes.values()))
+    while True:
+        signatures = {
+            state: (classes[state], frozenset((r[0], class_of(r[3], classes)) for r in rows[state]))
+            for state in states
+        }
+        ids = {}
+        classes = {state: ids.setdefault(signatures[state], len(ids)) for state in states}
+        if len(ids) == count:
+            break
+        count = len(ids)
+
+    representatives = {}
+    for state in states:
+        representatives.setdefault(classes[state], state)
+    return {state: representatives[classes[state]] for state in states}
+
+
+def optimize_table(
+        transitions: dict,
+        initial_state: str,
+        final_states: Set[str],
+        renumber: bool = False
+) -> Tuple[dict, OptimizationReport]:
+    # Возвращает новую таблицу, которая с начального состояния даёт ту же
+    # ленту, положение головки, заключительное состояние и ошибку, что и
+    # исходная, за меньшее или равное число шагов. Имена незаключительных
+    # состояний могут смениться на имена представителей. renumber=True
+    # перенумеровывает их в Q0, Q1, ... в порядке обхода (начальное — Q0).
+    report = OptimizationReport(transitions, final_states)
+    table, collapsed = collapse_stays(transitions, final_states)
+
+    order = reachable_states(table, initial_state, final_states)
+    live = set(order) - set(final_states)
+    reachable = set(reachable_states(transitions, initial_state, final_states))
+    for state in _states(transitions, final_states):
+        if state not in live:
+            (report.bypassed if state in reachable else report.unreachable).append(state)
+    pruned = {key: rule for key, rule in table.items() if key[0] in live}
+    report.dead_rules = sum(1 for key in transitions if key[0] in final_states)
+
+    states = [state for state in order if state in live]
+    representative = equivalent_states(pruned, states, final_states)
+    report.merged = {state: target for state, target in representative.items() if state != target}
+
+    def rename(state):
+        return representative.get(state, state)
+
+    table = {
+        key: (new_symbol, direction, rename(next_state))
+        for key, (new_symbol, direction, next_state) in pruned.items()
+        if key[0] not in report.merged
+    }
+    report.collapsed = {key: saved for key, saved in collapsed.items() if key in table}
+
+    if renumber:
+        names = [state for state in reachable_states(table, initial_state, final_states) if state not in final_states]
+        report.renamed = {state: f"Q{i}" for i, state in enumerate(names)}
+        table = {
+            (report.renamed[state], symbol): (new_symbol, direction, report.renamed.get(next_state, next_state))
+            for (state, symbol), (new_symbol, direction, next_state) in table.items()
+        }
+
+    report.rules_after = len(table)
+    report.states_after = len(_states(table, final_states))
+    return table, report
+
+
+def optimize_machine(machine) -> OptimizationReport:
+    # Оптимизирует таблицу машины от её текущего состояния
+    table, report = optimize_table(machine.transition_table, machine.current_state, machine.final_states)
+    machine.transition_table = table
+    return report
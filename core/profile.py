@@ -0,0 +1,72 @@
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+# Профиль исполнения: число срабатываний каждого правила в плоском массиве
+# целых (индекс — номер правила в таблице переходов), диапазон позиций
+# головки и границы непустой части ленты. Интерпретатор пополняет его на
+# каждом шаге, скомпилированные движки считают в собственном массиве по
+# индексам CompiledTable и переносят сюда в конце исполнения.
+class ExecutionProfile:
+    def __init__(self, transition_table: dict):
+        self.keys = list(transition_table)
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        self.counts = array("q", bytes(8 * len(self.keys)))
+        self.head_min: Optional[int] = None
+        self.head_max: Optional[int] = None
+        self.extent: Optional[Tuple[int, int]] = None
+
+    def reset(self) -> None:
+        self.counts = array("q", bytes(8 * len(self.keys)))
+        self.head_min = self.head_max = None
+        self.extent = None
+
+    def slot(self, key) -> int:
+        # Номер правила; правила, добавленные в таблицу после создания профиля,
+        # получают новые номера
+        i = self.index.get(key)
+        if i is None:
+            i = self.index[key] = len(self.keys)
+            self.keys.append(key)
+            self.counts.append(0)
+        return i
+
+    def record(self, key, head: int) -> None:
+        self.counts[self.slot(key)] += 1
+        if self.head_min is None:
+            self.head_min = self.head_max = head
+        elif head < self.head_min:
+            self.head_min = head
+        elif head > self.head_max:
+            self.head_max = head
+
+    def add_head_range(self, lo: int, hi: int) -> None:
+        if self.head_min is None:
+            self.head_min, self.head_max = lo, hi
+        else:
+            self.head_min = min(self.head_min, lo)
+            self.head_max = max(self.head_max, hi)
+
+    def observe_tape(self, tape) -> None:
+        # Границы берутся из ленты за O(1), без копирования её содержимого
+        self.extent = tape.extent()
+        self.add_head_range(tape.head, tape.head)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def hits(self) -> Dict[tuple, int]:
+        return {key: count for key, count in zip(self.keys, self.counts) if count}
+
+    def state_hits(self) -> Dict[str, int]:
+        # Число шагов, сделанных из каждого состояния
+        result = {}
+        for (state, _), count in zip(self.keys, self.counts):
+            if count:
+                result[state] = result.get(state, 0) + count
+        return result
+
+    def hot_rules(self, n: int = None) -> List[Tuple[tuple, int]]:
+        rules = sorted(self.hits().items(), key=lambda item: item[1], reverse=True)
+        return rules if n is None else rules[:n]
@@ -0,0 +1,276 @@
+import json
+from typing import Dict, List, Tuple
+
+from core.binproject import (
+    BinaryFormatError, content_segments, is_binary, read_binary, segments_content, write_binary
+)
+from core.machine import TuringMachine
+from core.multitape import MultiTapeTuringMachine
+from core.tape import Direction, make_tape
+from core.trace import TRACE_FULL, TRACE_OFF
+
+# Соглашения редактора: работа начинается в Q0 и завершается в Qa
+INITIAL_STATE = "Q0"
+FINAL_STATES = {"Qa"}
+BLANK = "_"
+
+REQUIRED_KEYS = {"alphabet", "tape", "transitions", "notes"}
+
+# Проекты с этим расширением сохраняются в двоичном формате (см. core.binproject)
+BINARY_SUFFIX = ".tmb"
+
+
+class ProjectError(ValueError):
+    pass
+
+
+_DIRECTIONS = dict(Direction.__members__)
+
+
+def _direction(name) -> Direction:
+    return _DIRECTIONS.get(name, Direction.STAY) if isinstance(name, str) else Direction.STAY
+
+
+def transitions_to_json(transitions: Dict[Tuple[str, str], Tuple[str, Direction, str]]) -> dict:
+    # У машины с k лентами ключ символов — строка из k символов, направления — список
+    result = {}
+    for (state, symbol), (new_symbol, direction, next_state) in transitions.items():
+        if isinstance(symbol, tuple):
+            rule = {
+                "new_symbol": "".join(new_symbol),
+                "direction": [d.name for d in direction],
+                "next_state": next_state
+            }
+            symbol = "".join(symbol)
+        else:
+            rule = {
+                "new_symbol": new_symbol,
+                "direction": direction.name,
+                "next_state": next_state
+            }
+        result.setdefault(state, {})[symbol] = rule
+    return result
+
+
+def transitions_from_json(data: dict, tape_count: int = 1) -> Dict[Tuple[str, str], Tuple[str, Direction, str]]:
+    # Некорректные правила пропускаются так же, как при открытии файла в редакторе
+    transitions = {}
+    for state, rules in data.items():
+        if not isinstance(rules, dict):
+            continue
+        for symbol, rule in rules.items():
+            if (
+                    not isinstance(symbol, str)
+                    or not isinstance(rule, dict)
+                    or "new_symbol" not in rule
+                    or "direction" not in rule
+                    or "next_state" not in rule
+            ):
+                continue
+            if tape_count == 1:
+                transitions[(state, symbol)] = (rule["new_symbol"], _direction(rule["direction"]), rule["next_state"])
+                continue
+            directions = rule["direction"]
+            if (
+                    len(symbol) != tape_count
+                    or not isinstance(rule["new_symbol"], str)
+                    or len(rule["new_symbol"]) != tape_count
+                    or not isinstance(directions, list)
+                    or len(directions) != tape_count
+            ):
+                continue
+            transitions[(state, tuple(symbol))] = (
+                tuple(rule["new_symbol"]),
+                tuple(_direction(d) for d in directions),
+                rule["next_state"]
+            )
+    return transitions
+
+
+def project_to_json(
+        alphabet,
+        tape,
+        transitions,
+        notes: dict,
+        tape_count: int = 1,
+        origins: List[int] = None,
+        heads: List[int] = None
+) -> dict:
+    # Начало содержимого и головка лент пишутся, только если отличны от нуля
+    data = {
+        "alphabet": list(alphabet),
+        "tape": tape if tape_count == 1 else list(tape),
+        "transitions": transitions_to_json(transitions),
+        "notes": notes
+    }
+    if tape_count > 1:
+        data["tape_count"] = tape_count
+    for key, values in (("tape_origin", origins), ("tape_head", heads)):
+        if values and any(values):
+            data[key] = values[0] if tape_count == 1 else list(values)
+    return data
+
+
+def _tape_positions(data: dict, key: str, tape_count: int) -> List[int]:
+    value = data.get(key, 0 if tape_count == 1 else [0] * tape_count)
+    values = [value] if tape_count == 1 else value
+    if (
+            not isinstance(values, list)
+            or len(values) != tape_count
+            or not all(isinstance(v, int) and not isinstance(v, bool) for v in values)
+    ):
+        raise ProjectError(f"Поле {key} должно содержать целое число для каждой ленты")
+    return values
+
+
+def project_from_json(data) -> dict:
+    if not isinstance(data, dict):
+        raise ProjectError("Некорректный формат: не объект JSON")
+    if not REQUIRED_KEYS.issubset(data.keys()):
+        raise ProjectError("В файле отсутствуют обязательные ключи")
+    alphabet = data["alphabet"]
+    if not isinstance(alphabet, list) or not all(isinstance(ch, str) for ch in alphabet):
+        raise ProjectError("Алфавит должен быть списком строк")
+    tape_count = data.get("tape_count", 1)
+    if not isinstance(tape_count, int) or tape_count < 1:
+        raise ProjectError("Число лент должно быть положительным целым")
+    tapes = data["tape"]
+    if tape_count == 1:
+        if not isinstance(tapes, str):
+            raise ProjectError("Лента должна быть строкой")
+        tapes = [tapes]
+    elif (
+            not isinstance(tapes, list)
+            or len(tapes) != tape_count
+            or not all(isinstance(tape, str) for tape in tapes)
+    ):
+        raise ProjectError(f"Ленты должны быть списком из {tape_count} строк")
+    if not isinstance(data["transitions"], dict):
+        raise ProjectError("Неправильный формат transitions")
+    notes = data["notes"] if isinstance(data["notes"], dict) else {}
+    origins = _tape_positions(data, "tape_origin", tape_count)
+    return {
+        "alphabet": alphabet,
+        "tape": tapes[0],
+        "segments": [content_segments(tape, origin, BLANK) for tape, origin in zip(tapes, origins)],
+        "heads": _tape_positions(data, "tape_head", tape_count),
+        "tape_count": tape_count,
+        "transitions": transitions_from_json(data["transitions"], tape_count),
+        "notes": notes
+    }
+
+
+def project_from_binary(f) -> dict:
+    # Тот же словарь проекта, что и project_from_json
+    try:
+        data = read_binary(f, BLANK)
+    except BinaryFormatError as e:
+        raise ProjectError(str(e)) from None
+    tape_count = data["tape_count"]
+    if not isinstance(tape_count, int) or tape_count < 1 or len(data["tapes"]) != tape_count:
+        raise ProjectError("Число лент в файле не совпадает с числом секций лент")
+    segments, heads = (list(values) for values in zip(*data["tapes"]))
+    notes = data["notes"] if isinstance(data["notes"], dict) else {}
+    # Строка ввода — содержимое первой ленты, если оно хранится одним отрезком
+    first = segments[0]
+    return {
+        "alphabet": data["alphabet"],
+        "tape": first[0][1] if len(first) == 1 else "",
+        "segments": segments,
+        "heads": heads,
+        "tape_count": tape_count,
+        "transitions": data["transitions"],
+        "notes": notes
+    }
+
+
+def load_project(path: str) -> dict:
+    # Формат определяется по сигнатуре файла, а не по расширению
+    with open(path, "rb") as f:
+        if is_binary(f):
+            return project_from_binary(f)
+        return project_from_json(json.loads(f.read().decode("utf-8")))
+
+
+def save_project(path: str, project: dict) -> None:
+    # Ленты проекта — списки отрезков (позиция начала, содержимое), см. core.binproject
+    tape_count = project.get("tape_count", 1)
+    segments = project["segments"]
+    heads = project.get("heads") or [0] * tape_count
+    if path.lower().endswith(BINARY_SUFFIX):
+        with open(path, "wb") as f:
+            write_binary(
+                f,
+                project["alphabet"],
+                list(zip(segments, heads)),
+                project["transitions"],
+                project["notes"],
+                tape_count,
+                BLANK
+            )
+        return
+    # JSON хранит ленту строкой, поэтому пропуски между отрезками заполняются
+    origins, tapes = (list(values) for values in zip(*(segments_content(tape, BLANK) for tape in segments)))
+    data = project_to_json(
+        project["alphabet"],
+        tapes[0] if tape_count == 1 else tapes,
+        project["transitions"],
+        project["notes"],
+        tape_count,
+        origins,
+        heads
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)  # type: ignore
+
+
+def build_machine(
+        project: dict,
+        input_str: str,
+        max_steps: int = 1000,
+        engine: str = None,
+        tape_backend: str = None,
+        trace: str = None,
+        detect_cycles: bool = False
+):
+    alphabet = set(project["alphabet"]) | {BLANK}
+    symbols = set(alphabet)
+    tape_count = project.get("tape_count", 1)
+    for (_, symbol), (new_symbol, _, _) in project["transitions"].items():
+        if tape_count == 1:
+            symbols.update((symbol, new_symbol))
+        else:
+            symbols.update(symbol + new_symbol)
+
+    if tape_count > 1:
+        # Многоленточная машина исполняется только интерпретатором, не ведёт
+        # трассу и не ищет циклы; явно заданные параметры не игнорируются молча
+        if engine not in (None, "interpreter"):
+            raise ProjectError(f"Движок '{engine}' не поддерживает машины с несколькими лентами")
+        if trace not in (None, TRACE_OFF):
+            raise ProjectError("Для машин с несколькими лентами трасса не ведётся")
+        if detect_cycles:
+            raise ProjectError("Для машин с несколькими лентами поиск циклов не поддерживается")
+        # Вход записывается на первую ленту, остальные — рабочие и изначально пусты
+        tapes = [make_tape(input_str, BLANK, symbols, tape_backend)]
+        tapes += [make_tape("", BLANK, symbols, tape_backend) for _ in range(tape_count - 1)]
+        return MultiTapeTuringMachine(
+            initial_state=INITIAL_STATE,
+            final_states=set(FINAL_STATES),
+            transition_table=project["transitions"],
+            tapes=tapes,
+            alphabet=alphabet,
+            max_steps=max_steps
+        )
+
+    return TuringMachine(
+        initial_state=INITIAL_STATE,
+        final_states=set(FINAL_STATES),
+        transition_table=project["transitions"],
+        tape=make_tape(input_str, BLANK, symbols, tape_backend),
+        alphabet=alphabet,
+        max_steps=max_steps,
+        engine=engine or "interpreter",
+        trace=trace or TRACE_FULL,
+        detect_cycles=detect_cycles
+    )
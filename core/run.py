@@ -0,0 +1,149 @@
+"""Пакетный запуск машины без GUI.
+
+    python -m core.run project.json -i inputs.txt -o results.jsonl -j 8
+
+Каждая строка входного файла (или stdin) — начальное содержимое ленты.
+Для каждой строки в том же порядке выводится JSON-объект с конечным
+состоянием, лентой, положением головки, числом шагов и ошибкой.
+
+    python -m core.run project.json -i inputs.txt --engine batch
+
+исполняет входы пачками в ногу на массивах NumPy в одном процессе.
+Проект может быть как в JSON, так и в двоичном формате (.tmb).
+"""
+import argparse
+import json
+import os
+import sys
+from itertools import islice
+from multiprocessing import Pool
+
+from core.batch import BatchSimulator
+from core.multitape import MultiTapeTuringMachine
+from core.project import BLANK, FINAL_STATES, INITIAL_STATE, build_machine, load_project
+from core.trace import TRACE_OFF
+
+ENGINES = ("interpreter", "compiled", "macro", "codegen", "batch")
+BATCH_SIZE = 4096
+TAPE_BACKENDS = ("dict", "array", "bits", "rle")
+
+_job = None
+
+
+def _init_worker(job):
+    global _job
+    _job = job
+
+
+def run_input(job: dict, input_str: str) -> dict:
+    result = {"input": input_str}
+    try:
+        tm = build_machine(
+            job["project"], input_str, job["max_steps"], job["engine"], job["tape_backend"],
+            trace=TRACE_OFF, detect_cycles=job.get("detect_cycles", False)
+        )
+        tm.run()
+    except Exception as e:
+        result.update(state=None, tape=None, head=None, steps=0, cycle=None, error=f"{type(e).__name__}: {e}")
+        return result
+    result.update(machine_result(tm))
+    return result
+
+
+def machine_result(tm) -> dict:
+    result = {}
+    if isinstance(tm, MultiTapeTuringMachine):
+        result["tapes"] = tm.get_tape_outputs()
+    result.update(
+        state=tm.current_state,
+        tape=tm.get_tape_output(),
+        head=tm.tape.head,
+        steps=tm.steps_done,
+        cycle=list(tm.cycle) if tm.cycle else None,
+        error=tm.error_message if tm.error_occurred else None
+    )
+    return result
+
+
+def _run_in_worker(input_str: str) -> dict:
+    return run_input(_job, input_str)
+
+
+def run_lockstep(job: dict, inputs, batch_size: int = BATCH_SIZE):
+    project = job["project"]
+    if project.get("tape_count", 1) != 1:
+        raise ValueError("Пакетный движок поддерживает только машины с одной лентой")
+    simulator = BatchSimulator(
+        INITIAL_STATE, set(FINAL_STATES), project["transitions"], BLANK, job["max_steps"]
+    )
+    inputs = iter(inputs)
+    while True:
+        chunk = list(islice(inputs, batch_size))
+        if not chunk:
+            return
+        for result in simulator.run(chunk):
+            result["cycle"] = None
+            yield result
+
+
+def run_batch(job: dict, inputs, jobs: int = 1, chunksize: int = 64):
+    if job["engine"] == "batch":
+        yield from run_lockstep(job, inputs)
+        return
+    if jobs <= 1:
+        for input_str in inputs:
+            yield run_input(job, input_str)
+        return
+    with Pool(jobs, initializer=_init_worker, initargs=(job,)) as pool:
+        yield from pool.imap(_run_in_worker, inputs, chunksize)
+
+
+def _read_inputs(stream):
+    for line in stream:
+        yield line.rstrip("\r\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.run", description="Пакетный запуск машины Тьюринга")
+    parser.add_argument("project", help="файл проекта в формате JSON")
+    parser.add_argument("-i", "--inputs", default="-", help="файл с входными строками, по одной в строке (- для stdin)")
+    parser.add_argument("-o", "--output", default="-", help="файл для результатов JSON Lines (- для stdout)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="число процессов")
+    parser.add_argument("--chunksize", type=int, default=64, help="число входов, передаваемых процессу за раз")
+    parser.add_argument("--max-steps", type=int, default=1000, help="ограничение числа шагов")
+    parser.add_argument("--engine", choices=ENGINES, default=None)
+    parser.add_argument("--tape-backend", choices=TAPE_BACKENDS, default=None)
+    parser.add_argument("--detect-cycles", action="store_true", help="останавливать зациклившиеся машины")
+    args = parser.parse_args(argv)
+
+    try:
+        project = load_project(args.project)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка чтения файла: {e}", file=sys.stderr)
+        return 2
+
+    job = {
+        "project": project,
+        "max_steps": args.max_steps,
+        # По умолчанию compiled; машины с несколькими лентами — только интерпретатором
+        "engine": args.engine or ("compiled" if project.get("tape_count", 1) == 1 else "interpreter"),
+        "tape_backend": args.tape_backend,
+        "detect_cycles": args.detect_cycles
+    }
+
+    src = sys.stdin if args.inputs == "-" else open(args.inputs, "r", encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for result in run_batch(job, _read_inputs(src), args.jobs, args.chunksize):
+            dst.write(json.dumps(result, ensure_ascii=False))
+            dst.write("\n")
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
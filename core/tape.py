@@ -1,4 +1,20 @@
+import re
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
 from enum import Enum, auto
+from itertools import chain, groupby, repeat
+from typing import Optional, Tuple
+
+# Сколько ячеек export() пишет в файл за один раз
+EXPORT_CHUNK = 1 << 20
+# Размер куска буфера (log2 ячеек), по которым ленты на массиве считают непустые ячейки
+EXTENT_SHIFT = 12
+# Запись дальше этого расстояния за краем буфера (и дальше его размера) не растит
+# массив, а переводит ленту на словарь (см. TuringTape._to_dict)
+SPARSE_GAP = 1 << 20
+_NONBLANK = re.compile(b"[^\\x00]")
+# Крайние позиции пустой ленты на массиве: любая запись сдвигает обе
+_NO_EXTENT = (float("inf"), float("-inf"))
 
 
 class Direction(Enum):
@@ -7,15 +23,135 @@ class Direction(Enum):
     STAY = auto()
 
 
+# Описание изменения ленты для наблюдателей: изменённые ячейки и сдвиг головки.
+# full=True — лента заменена целиком (или изменено слишком много ячеек).
+class TapeChange:
+    MAX_CELLS = 64
+
+    def __init__(self, cells=(), head_delta: int = 0, full: bool = False):
+        self.cells = set(cells)
+        self.head_delta = head_delta
+        self.full = full
+
+    def merge(self, other: "TapeChange"):
+        self.head_delta += other.head_delta
+        self.full = self.full or other.full
+        if not self.full:
+            self.cells |= other.cells
+            self.full = len(self.cells) > self.MAX_CELLS
+        if self.full:
+            self.cells.clear()
+
+
+# Упорядоченное множество позиций непустых ячеек: отсортированные корзины
+# ограниченного размера. Вставка и удаление стоят O(log n + LOAD), крайние
+# позиции читаются за O(1), соседняя позиция ищется двоичным поиском.
+class CellIndex:
+    LOAD = 512
+
+    def __init__(self, positions=()):
+        positions = sorted(positions)
+        load = self.LOAD
+        self._buckets = [positions[i:i + load] for i in range(0, len(positions), load)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(positions)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._buckets)
+
+    def first(self) -> Optional[int]:
+        return self._buckets[0][0] if self._buckets else None
+
+    def last(self) -> Optional[int]:
+        return self._maxes[-1] if self._maxes else None
+
+    def add(self, pos: int):
+        buckets = self._buckets
+        maxes = self._maxes
+        if not maxes:
+            buckets.append([pos])
+            maxes.append(pos)
+            self._len = 1
+            return
+        i = bisect_left(maxes, pos)
+        if i == len(maxes):
+            i -= 1
+            bucket = buckets[i]
+            bucket.append(pos)
+            maxes[i] = pos
+        else:
+            bucket = buckets[i]
+            j = bisect_left(bucket, pos)
+            if bucket[j] == pos:
+                return
+            bucket.insert(j, pos)
+        self._len += 1
+        if len(bucket) > 2 * self.LOAD:
+            half = bucket[self.LOAD:]
+            del bucket[self.LOAD:]
+            buckets.insert(i + 1, half)
+            maxes[i] = bucket[-1]
+            maxes.insert(i + 1, half[-1])
+
+    def discard(self, pos: int):
+        maxes = self._maxes
+        i = bisect_left(maxes, pos)
+        if i == len(maxes):
+            return
+        bucket = self._buckets[i]
+        j = bisect_left(bucket, pos)
+        if bucket[j] != pos:
+            return
+        del bucket[j]
+        self._len -= 1
+        if not bucket:
+            del self._buckets[i]
+            del maxes[i]
+        elif j == len(bucket):
+            maxes[i] = bucket[-1]
+
+    def next_after(self, pos: int) -> Optional[int]:
+        i = bisect_right(self._maxes, pos)
+        if i == len(self._maxes):
+            return None
+        bucket = self._buckets[i]
+        return bucket[bisect_right(bucket, pos)]
+
+    def prev_before(self, pos: int) -> Optional[int]:
+        maxes = self._maxes
+        i = bisect_left(maxes, pos)
+        if i < len(maxes):
+            bucket = self._buckets[i]
+            j = bisect_left(bucket, pos)
+            if j:
+                return bucket[j - 1]
+        return maxes[i - 1] if i else None
+
+
+def _last_nonzero(buffer, end: int) -> Optional[int]:
+    # Индекс последнего ненулевого байта до end: просмотр назад кусками
+    while end > 0:
+        start = max(0, end - 4096)
+        chunk = buffer[start:end].rstrip(b"\0")
+        if chunk:
+            return start + len(chunk) - 1
+        end = start
+    return None
+
+
 class TuringTape:
     def __init__(self, input_str: str = "", blank_symbol: str = "_"):
         self.blank = blank_symbol
         self.tape = {}
-        for i, ch in enumerate(input_str):
-            if ch != self.blank:
-                self.tape[i] = ch
+        self._index = CellIndex()
+        self._fill(input_str)
         self.head = 0
         self._observers = []
+        self._batch_depth = 0
+        self._pending = None
 
     def add_observer(self, observer):
         self._observers.append(observer)
@@ -23,56 +159,875 @@ class TuringTape:
     def remove_observer(self, observer):
         self._observers.remove(observer)
 
-    def _notify_observers(self):
+    def _notify_observers(self, change: TapeChange = None):
+        if not self._observers:
+            return
+        if change is None:
+            change = TapeChange(full=True)
+        if self._batch_depth:
+            if self._pending is None:
+                self._pending = change
+            else:
+                self._pending.merge(change)
+            return
         for observer in self._observers:
-            observer.on_tape_changed()
+            observer.on_tape_changed(change)
+
+    @contextmanager
+    def batch(self):
+        # Изменения внутри блока with копятся и доставляются наблюдателям одним событием
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._pending is not None:
+                change, self._pending = self._pending, None
+                self._notify_observers(change)
+
+    # Хранилище ячеек: бэкенды ленты переопределяют эти методы
+
+    def _clear(self):
+        self.tape.clear()
+        self._index = CellIndex()
+
+    def _put(self, pos: int, symbol: str):
+        tape = self.tape
+        if symbol == self.blank:
+            if tape.pop(pos, None) is not None:
+                self._index.discard(pos)
+        else:
+            if pos not in tape:
+                self._index.add(pos)
+            tape[pos] = symbol
+
+    def _load(self, cells: dict):
+        self.tape = {pos: ch for pos, ch in cells.items() if ch != self.blank}
+        self._index = CellIndex(self.tape)
+
+    def _fill(self, input_str: str, origin: int = 0):
+        for i, ch in enumerate(input_str):
+            if ch != self.blank:
+                self._put(origin + i, ch)
+
+    def get_symbol(self, pos: int) -> str:
+        return self.tape.get(pos, self.blank)
+
+    def items(self):
+        tape = self.tape
+        return [(pos, tape[pos]) for pos in self._index]
 
     def read(self) -> str:
         return self.tape.get(self.head, self.blank)
 
+    # Границы и навигация по непустым ячейкам; бэкенды переопределяют эти
+    # методы и span(), а __str__, image() и export() построены на них
+
+    def extent(self) -> Optional[Tuple[int, int]]:
+        # Позиции первой и последней непустых ячеек (None, если лента пуста)
+        first = self._index.first()
+        return None if first is None else (first, self._index.last())
+
+    def next_nonblank(self, pos: int) -> Optional[int]:
+        # Ближайшая непустая ячейка правее pos
+        return self._index.next_after(pos)
+
+    def prev_nonblank(self, pos: int) -> Optional[int]:
+        # Ближайшая непустая ячейка левее pos
+        return self._index.prev_before(pos)
+
+    def span(self, lo: int, hi: int) -> str:
+        # Содержимое ячеек lo..hi включительно
+        return "".join(map(self.tape.get, range(lo, hi + 1), repeat(self.blank)))
+
+    def export(self, f, chunk: int = EXPORT_CHUNK) -> Tuple[int, int]:
+        # Пишет непустую часть ленты в текстовый поток кусками по chunk ячеек,
+        # не собирая её в одну строку. Возвращает (позиция начала, число ячеек)
+        extent = self.extent()
+        if extent is None:
+            return 0, 0
+        lo, hi = extent
+        for start in range(lo, hi + 1, chunk):
+            f.write(self.span(start, min(start + chunk - 1, hi)))
+        return lo, hi - lo + 1
+
     def write(self, symbol: str):
-        if symbol == self.blank:
-            self.tape.pop(self.head, None)
-        else:
-            self.tape[self.head] = symbol
-        self._notify_observers()
+        self._put(self.head, symbol)
+        if self._observers:
+            self._notify_observers(TapeChange(cells=(self.head,)))
 
     def move(self, direction: Direction, steps: int = 1):
         if direction == Direction.LEFT:
             self.head -= steps
+            delta = -steps
         elif direction == Direction.RIGHT:
             self.head += steps
-        self._notify_observers()
+            delta = steps
+        else:
+            delta = 0
+        if self._observers:
+            self._notify_observers(TapeChange(head_delta=delta))
 
     def get_tape_snapshot(self, window: int = 10) -> str:
-        min_idx = self.head - window
-        max_idx = self.head + window
-        chars = []
-        for pos in range(min_idx, max_idx + 1):
-            c = self.tape.get(pos, self.blank)
-            if pos == self.head:
-                chars.append(f"[{c}]")
-            else:
-                chars.append(f"{c}")
-        return " ".join(chars)
+        get_symbol = self.get_symbol
+        cells = [get_symbol(pos) for pos in range(self.head - window, self.head + window + 1)]
+        cells[window] = f"[{cells[window]}]"
+        return " ".join(cells)
 
     def __str__(self):
-        if not self.tape:
-            return ""
-        lo, hi = min(self.tape), max(self.tape)
-        return "".join(self.tape.get(i, self.blank) for i in range(lo, hi + 1))
+        extent = self.extent()
+        return self.span(*extent) if extent else ""
 
     def reset(self, input_str: str = ""):
-        self.tape.clear()
-        for i, ch in enumerate(input_str):
-            if ch != self.blank:
-                self.tape[i] = ch
-        self.head = 0
+        self.load(input_str)
+
+    def load(self, content: str, origin: int = 0, head: int = 0):
+        # Как reset(), но содержимое начинается с ячейки origin, а головка стоит в head
+        self._clear()
+        self._fill(content, origin)
+        self.head = head
+        self._notify_observers()
+
+    def load_segments(self, segments, head: int = 0):
+        # Как load(), но содержимое задано отрезками (позиция начала, строка)
+        # по возрастанию позиций; промежутки между отрезками не заполняются
+        self._clear()
+        self._load_segments(segments)
+        self.head = head
+        self._notify_observers()
+
+    def _load_segments(self, segments):
+        # Первый отрезок загружается целиком, остальные — по ячейкам
+        segments = iter(segments)
+        first = next(segments, None)
+        if first is None:
+            return
+        self._fill(first[1], first[0])
+        blank = self.blank
+        for start, content in segments:
+            for i, ch in enumerate(content):
+                if ch != blank:
+                    self._put(start + i, ch)
+
+    def image(self):
+        # (позиция первой непустой ячейки, содержимое до последней непустой);
+        # load(*image(), head) восстанавливает ленту
+        extent = self.extent()
+        return (extent[0], self.span(*extent)) if extent else (0, "")
+
+    # Границы для бэкендов на буфере: в _counts лежит число непустых ячеек
+    # в каждом куске буфера по 1 << EXTENT_SHIFT ячеек, а крайние непустые
+    # позиции _lo и _hi (у пустой ленты _lo > _hi) сдвигаются при записи.
+    # При стирании крайней ячейки соседняя непустая ищется в её куске
+    # (_find_set), а пустые куски пропускаются по счётчикам. Бэкенд вызывает
+    # _count_cell, только когда ячейка стала пустой или перестала быть пустой
+
+    def _count_cell(self, idx: int, pos: int, filled: bool):
+        if filled:
+            self._counts[idx >> EXTENT_SHIFT] += 1
+            if pos < self._lo:
+                self._lo = pos
+            if pos > self._hi:
+                self._hi = pos
+            return
+        self._counts[idx >> EXTENT_SHIFT] -= 1
+        if self._lo == self._hi:
+            self._lo, self._hi = _NO_EXTENT
+        elif pos == self._lo:
+            self._lo = self._inward(idx, 1) - self._origin
+        elif pos == self._hi:
+            self._hi = self._inward(idx, -1) - self._origin
+
+    def _inward(self, idx: int, step: int) -> int:
+        # Индекс ближайшей непустой ячейки буфера за idx в направлении step;
+        # вызывается, когда такая ячейка заведомо есть
+        counts = self._counts
+        k = idx >> EXTENT_SHIFT
+        found = self._find_set(k, idx + step, step)
+        while found is None:
+            k += step
+            while not counts[k]:
+                k += step
+            found = self._find_set(k, None, step)
+        return found
+
+    def _reset_counts(self, size: int):
+        # Пересчёт счётчиков по всему буферу из size ячеек (после загрузки или роста)
+        n = 1 << EXTENT_SHIFT
+        counts = [self._chunk_count(start, min(start + n, size)) for start in range(0, size, n)]
+        self._counts = counts
+        lo = next((k for k, c in enumerate(counts) if c), None)
+        if lo is None:
+            self._lo, self._hi = _NO_EXTENT
+            return
+        hi = len(counts) - 1
+        while not counts[hi]:
+            hi -= 1
+        self._lo = self._find_set(lo, None, 1) - self._origin
+        self._hi = self._find_set(hi, None, -1) - self._origin
+
+    def _buffer_extent(self) -> Optional[Tuple[int, int]]:
+        return (self._lo, self._hi) if self._lo <= self._hi else None
+
+    @staticmethod
+    def _far(idx: int, size: int) -> bool:
+        gap = -idx if idx < 0 else idx - size + 1
+        return gap > max(SPARSE_GAP, size)
+
+    def _to_dict(self):
+        # Буфер до далёкой ячейки занял бы память по расстоянию, а не по числу
+        # непустых ячеек, поэтому разреженная лента дальше хранится словарём.
+        # Наблюдатели, головка и пустой символ остаются прежними
+        cells = dict(self.items())
+        self._clear()
+        self.__class__ = TuringTape
+        self._load(cells)
+
+    def restore(self, cells: dict, head: int):
+        self._clear()
+        self._load(cells)
+        self.head = head
         self._notify_observers()
 
     def set_symbol(self, pos: int, symbol: str):
+        self._put(pos, symbol)
+        if self._observers:
+            self._notify_observers(TapeChange(cells=(pos,)))
+
+
+# Лента на двусторонне растущем bytearray: в ячейке хранится id символа (0 — пустой)
+class ArrayTape(TuringTape):
+    def __init__(self, input_str: str = "", blank_symbol: str = "_", alphabet=()):
+        self.symbols = [blank_symbol]
+        self.symbol_ids = {blank_symbol: 0}
+        self._cells = bytearray()
+        self._origin = 0
+        self._counts = []
+        self._lo, self._hi = _NO_EXTENT
+        self._decode = None
+        for ch in alphabet:
+            self._symbol_id(ch)
+        super().__init__(input_str, blank_symbol)
+
+    def _symbol_id(self, symbol: str) -> int:
+        sid = self.symbol_ids.get(symbol)
+        if sid is None:
+            if len(self.symbols) >= 256:
+                raise ValueError("Лента на массиве поддерживает не более 256 символов")
+            sid = self.symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self._decode = None
+        return sid
+
+    def _grow(self, idx: int) -> int:
+        size = len(self._cells)
+        extra = max(64, size, abs(idx) if idx < 0 else idx - size + 1)
+        if idx < 0:
+            self._cells[0:0] = bytes(extra)
+            self._origin += extra
+            idx += extra
+        else:
+            self._cells.extend(bytes(extra))
+        # Рост копирует весь буфер, поэтому пересчёт кусков укладывается в ту же цену
+        self._reset_counts(len(self._cells))
+        return idx
+
+    def _clear(self):
+        self._cells = bytearray()
+        self._origin = 0
+        self._counts = []
+        self._lo, self._hi = _NO_EXTENT
+
+    def _load(self, cells: dict):
+        for pos, ch in cells.items():
+            self._put(pos, ch)
+
+    def _fill(self, input_str: str, origin: int = 0):
+        for ch in set(input_str):
+            self._symbol_id(ch)
+        # Перекодировка символов в id через str.translate выполняется целиком в C
+        ids = str.maketrans({ch: chr(sid) for ch, sid in self.symbol_ids.items() if len(ch) == 1})
+        self._cells = bytearray(input_str.translate(ids).encode("latin-1"))
+        self._origin = -origin
+        self._reset_counts(len(self._cells))
+
+    def _put(self, pos: int, symbol: str):
+        sid = self._symbol_id(symbol)
+        idx = pos + self._origin
+        if not 0 <= idx < len(self._cells):
+            if not sid:
+                return
+            if self._lo > self._hi:
+                # В пустом буфере нечего хранить: он переносится к записываемой ячейке
+                self._clear()
+                self._origin = -pos
+                idx = 0
+            elif self._far(idx, len(self._cells)):
+                self._to_dict()
+                self._put(pos, symbol)
+                return
+            idx = self._grow(idx)
+        cells = self._cells
+        if (not cells[idx]) != (not sid):
+            self._count_cell(idx, pos, bool(sid))
+        cells[idx] = sid
+
+    def get_symbol(self, pos: int) -> str:
+        idx = pos + self._origin
+        if 0 <= idx < len(self._cells):
+            return self.symbols[self._cells[idx]]
+        return self.blank
+
+    def read(self) -> str:
+        return self.get_symbol(self.head)
+
+    def items(self):
+        symbols = self.symbols
+        origin = self._origin
+        return [(i - origin, symbols[c]) for i, c in enumerate(self._cells) if c]
+
+    def _chunk_count(self, start: int, stop: int) -> int:
+        return stop - start - self._cells.count(0, start, stop)
+
+    def _find_set(self, k: int, idx: Optional[int], step: int) -> Optional[int]:
+        # Первая (step > 0) или последняя непустая ячейка куска k, начиная с idx
+        start, stop = k << EXTENT_SHIFT, (k + 1) << EXTENT_SHIFT
+        cells = self._cells
+        if idx is not None and start <= idx < min(stop, len(cells)) and cells[idx]:
+            # Чаще всего стёртая крайняя ячейка соседствует с непустой
+            return idx
+        if step > 0:
+            match = _NONBLANK.search(cells, start if idx is None else idx, stop)
+            return None if match is None else match.start()
+        chunk = cells[start:stop if idx is None else idx + 1].rstrip(b"\0")
+        return start + len(chunk) - 1 if chunk else None
+
+    def extent(self):
+        return self._buffer_extent()
+
+    def next_nonblank(self, pos: int):
+        match = _NONBLANK.search(self._cells, max(pos + self._origin + 1, 0))
+        return None if match is None else match.start() - self._origin
+
+    def prev_nonblank(self, pos: int):
+        idx = _last_nonzero(self._cells, min(pos + self._origin, len(self._cells)))
+        return None if idx is None else idx - self._origin
+
+    def span(self, lo: int, hi: int) -> str:
+        # Срез массива с пустыми ячейками по краям, перекодированный целиком в C
+        cells = self._cells
+        n = hi - lo + 1
+        idx = lo + self._origin
+        start, stop = max(idx, 0), min(idx + n, len(cells))
+        if start < stop:
+            raw = bytes(start - idx) + cells[start:stop] + bytes(idx + n - stop)
+        else:
+            raw = bytes(n)
+        if self._decode is None:
+            self._decode = str.maketrans({chr(sid): symbol for sid, symbol in enumerate(self.symbols)})
+        return raw.decode("latin-1").translate(self._decode)
+
+
+# Лента для двоичного алфавита: пустой символ и одна метка, 1 бит на ячейку
+class BitTape(TuringTape):
+    def __init__(self, input_str: str = "", blank_symbol: str = "_", alphabet=()):
+        marks = [ch for ch in dict.fromkeys(alphabet) if ch != blank_symbol]
+        if len(marks) > 1:
+            raise ValueError("Двоичная лента поддерживает только один непустой символ")
+        self.mark = marks[0] if marks else None
+        self._bits = bytearray()
+        self._origin = 0
+        self._counts = []
+        self._lo, self._hi = _NO_EXTENT
+        self._spans = None
+        super().__init__(input_str, blank_symbol)
+
+    def _grow(self, idx: int) -> int:
+        size = len(self._bits) * 8
+        extra = max(512, size, abs(idx) if idx < 0 else idx - size + 1)
+        extra = (extra + 7) // 8
+        if idx < 0:
+            self._bits[0:0] = bytes(extra)
+            self._origin += extra * 8
+            idx += extra * 8
+        else:
+            self._bits.extend(bytes(extra))
+        self._reset_counts(len(self._bits) * 8)
+        return idx
+
+    def _clear(self):
+        self._bits = bytearray()
+        self._origin = 0
+        self._counts = []
+        self._lo, self._hi = _NO_EXTENT
+
+    def _load(self, cells: dict):
+        for pos, ch in cells.items():
+            self._put(pos, ch)
+
+    def _put(self, pos: int, symbol: str):
+        if symbol != self.blank and symbol != self.mark:
+            if self.mark is not None:
+                raise ValueError(
+                    f"Двоичная лента уже содержит символ '{self.mark}', нельзя записать '{symbol}'"
+                )
+            self.mark = symbol
+        idx = pos + self._origin
+        if not 0 <= idx < len(self._bits) * 8:
+            if symbol == self.blank:
+                return
+            if self._lo > self._hi:
+                # В пустом буфере нечего хранить: он переносится к записываемой ячейке
+                self._clear()
+                self._origin = -pos
+                idx = 0
+            elif self._far(idx, len(self._bits) * 8):
+                self._to_dict()
+                self._put(pos, symbol)
+                return
+            idx = self._grow(idx)
+        bits = self._bits
+        byte_idx = idx >> 3
+        byte = bits[byte_idx]
+        mask = 1 << (idx & 7)
         if symbol == self.blank:
-            self.tape.pop(pos, None)
+            if byte & mask:
+                bits[byte_idx] = byte & ~mask
+                self._count_cell(idx, pos, False)
+        elif not byte & mask:
+            bits[byte_idx] = byte | mask
+            self._count_cell(idx, pos, True)
+
+    def get_symbol(self, pos: int) -> str:
+        idx = pos + self._origin
+        if 0 <= idx < len(self._bits) * 8 and self._bits[idx >> 3] >> (idx & 7) & 1:
+            return self.mark
+        return self.blank
+
+    def read(self) -> str:
+        return self.get_symbol(self.head)
+
+    def items(self):
+        origin = self._origin
+        mark = self.mark
+        result = []
+        for byte_idx, byte in enumerate(self._bits):
+            if byte:
+                base = byte_idx * 8 - origin
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        result.append((base + bit, mark))
+        return result
+
+    def _chunk_count(self, start: int, stop: int) -> int:
+        return bin(int.from_bytes(self._bits[start >> 3:stop >> 3], "little")).count("1")
+
+    def _find_set(self, k: int, idx: Optional[int], step: int) -> Optional[int]:
+        # Первая (step > 0) или последняя непустая ячейка куска k, начиная с idx;
+        # кусок выровнен по байтам, поэтому ищем по байтам, маскируя крайний
+        bits = self._bits
+        start = k << EXTENT_SHIFT >> 3
+        stop = min((k + 1) << EXTENT_SHIFT >> 3, len(bits))
+        if step > 0:
+            if idx is None:
+                idx = start * 8
+            byte_idx = idx >> 3
+            if byte_idx >= stop:
+                return None
+            byte = bits[byte_idx] >> (idx & 7) << (idx & 7)
+            if not byte:
+                match = _NONBLANK.search(bits, byte_idx + 1, stop)
+                if match is None:
+                    return None
+                byte_idx = match.start()
+                byte = bits[byte_idx]
+            return byte_idx * 8 + (byte & -byte).bit_length() - 1
+        if idx is None:
+            idx = stop * 8 - 1
+        if idx < start * 8:
+            return None
+        byte_idx = idx >> 3
+        byte = bits[byte_idx] & ((2 << (idx & 7)) - 1)
+        if not byte:
+            chunk = bits[start:byte_idx].rstrip(b"\0")
+            if not chunk:
+                return None
+            byte_idx = start + len(chunk) - 1
+            byte = bits[byte_idx]
+        return byte_idx * 8 + byte.bit_length() - 1
+
+    def extent(self):
+        return self._buffer_extent()
+
+    def next_nonblank(self, pos: int):
+        bits = self._bits
+        idx = max(pos + self._origin + 1, 0)
+        byte_idx = idx >> 3
+        if byte_idx >= len(bits):
+            return None
+        byte = bits[byte_idx] >> (idx & 7) << (idx & 7)
+        if not byte:
+            match = _NONBLANK.search(bits, byte_idx + 1)
+            if match is None:
+                return None
+            byte_idx = match.start()
+            byte = bits[byte_idx]
+        return byte_idx * 8 + (byte & -byte).bit_length() - 1 - self._origin
+
+    def prev_nonblank(self, pos: int):
+        bits = self._bits
+        idx = min(pos + self._origin - 1, len(bits) * 8 - 1)
+        if idx < 0:
+            return None
+        byte_idx = idx >> 3
+        byte = bits[byte_idx] & ((2 << (idx & 7)) - 1)
+        if not byte:
+            byte_idx = _last_nonzero(bits, byte_idx)
+            if byte_idx is None:
+                return None
+            byte = bits[byte_idx]
+        return byte_idx * 8 + byte.bit_length() - 1 - self._origin
+
+    def span(self, lo: int, hi: int) -> str:
+        mark = self.mark if self.mark is not None else self.blank
+        if len(mark) != 1 or len(self.blank) != 1:
+            return super().span(lo, hi)
+        # Строка собирается по байтам: для каждого значения байта заранее
+        # готовы его 8 ячеек
+        if self._spans is None or self._spans[0] != mark:
+            cells = [mark if byte >> bit & 1 else self.blank for byte in range(256) for bit in range(8)]
+            self._spans = mark, ["".join(cells[i:i + 8]) for i in range(0, 2048, 8)]
+        bits = self._bits
+        idx = lo + self._origin
+        first, stop = idx >> 3, ((hi + self._origin) >> 3) + 1
+        start, end = min(max(first, 0), stop), max(min(stop, len(bits)), first)
+        raw = bytes(start - first) + bits[start:end] + bytes(stop - max(end, start))
+        shift = idx - first * 8
+        return "".join(map(self._spans[1].__getitem__, raw))[shift:shift + hi - lo + 1]
+
+
+# Лента из блоков [символ, длина]. Головка хранится как номер блока и смещение
+# в нём, память пропорциональна числу блоков, а не длине ленты.
+class RleTape(TuringTape):
+    def __init__(self, input_str: str = "", blank_symbol: str = "_", alphabet=()):
+        self.blank = blank_symbol
+        self._clear()
+        super().__init__(input_str, blank_symbol)
+
+    @property
+    def head(self) -> int:
+        return self._head
+
+    @head.setter
+    def head(self, pos: int):
+        self._cover(pos)
+        self._bi, self._off = self._find(pos)
+        self._head = pos
+
+    def _clear(self):
+        self._blocks = [[self.blank, 1]]
+        self._start = 0
+        self._length = 1
+        self._bi = self._off = self._head = 0
+
+    def _set_blocks(self, blocks, start: int):
+        self._blocks = blocks or [[self.blank, 1]]
+        self._start = start if blocks else 0
+        self._length = sum(count for _, count in self._blocks)
+        self._bi = self._off = 0
+        self._head = self._start
+
+    def _fill(self, input_str: str, origin: int = 0):
+        self._set_blocks([[ch, len(list(run))] for ch, run in groupby(input_str)], origin)
+
+    def _load(self, cells: dict):
+        blocks = []
+        prev = None
+        for pos, ch in sorted(cells.items()):
+            if ch == self.blank:
+                continue
+            if prev is not None and pos > prev + 1:
+                blocks.append([self.blank, pos - prev - 1])
+            if blocks and blocks[-1][0] == ch and pos == prev + 1:
+                blocks[-1][1] += 1
+            else:
+                blocks.append([ch, 1])
+            prev = pos
+        first = min((pos for pos, ch in cells.items() if ch != self.blank), default=0)
+        self._set_blocks(blocks, first)
+
+    def _load_segments(self, segments):
+        # Блоки строятся сразу: промежуток между отрезками — один пустой блок
+        blocks = []
+        first = end = None
+        for start, content in segments:
+            if end is None:
+                first = start
+            elif start > end:
+                blocks.append([self.blank, start - end])
+            for ch, run in groupby(content):
+                n = len(list(run))
+                if blocks and blocks[-1][0] == ch:
+                    blocks[-1][1] += n
+                else:
+                    blocks.append([ch, n])
+            end = start + len(content)
+        self._set_blocks(blocks, first)
+
+    def _cover(self, pos: int):
+        # Дописывает пустые блоки, чтобы позиция pos оказалась внутри ленты
+        blocks = self._blocks
+        if pos < self._start:
+            extra = self._start - pos
+            if blocks[0][0] == self.blank:
+                blocks[0][1] += extra
+                if self._bi == 0:
+                    self._off += extra
+            else:
+                blocks.insert(0, [self.blank, extra])
+                self._bi += 1
+            self._start = pos
+            self._length += extra
+        elif pos >= self._start + self._length:
+            extra = pos - self._start - self._length + 1
+            if blocks[-1][0] == self.blank:
+                blocks[-1][1] += extra
+            else:
+                blocks.append([self.blank, extra])
+            self._length += extra
+
+    def _find(self, pos: int):
+        # Номер блока и смещение для позиции внутри ленты: идём от головки
+        blocks = self._blocks
+        bi, off = self._bi, self._off + pos - self._head
+        while off < 0:
+            bi -= 1
+            off += blocks[bi][1]
+        while off >= blocks[bi][1]:
+            off -= blocks[bi][1]
+            bi += 1
+        return bi, off
+
+    def _walk(self, delta: int):
+        target = self._head + delta
+        self._cover(target)
+        self._bi, self._off = self._find(target)
+        self._head = target
+
+    def _assign(self, bi: int, off: int, n: int, symbol: str):
+        # Заменяет n ячеек блока bi начиная со смещения off на symbol и склеивает
+        # соседние блоки. Возвращает положение первой заменённой ячейки.
+        blocks = self._blocks
+        old, count = blocks[bi]
+        if old == symbol:
+            return bi, off
+        parts = [[old, off]] if off else []
+        parts.append([symbol, n])
+        if count - off - n:
+            parts.append([old, count - off - n])
+        blocks[bi:bi + 1] = parts
+        k = bi + 1 if off else bi
+        new_off = 0
+        if k > 0 and blocks[k - 1][0] == symbol:
+            new_off = blocks[k - 1][1]
+            blocks[k - 1][1] += n
+            del blocks[k]
+            k -= 1
+        if k + 1 < len(blocks) and blocks[k + 1][0] == symbol:
+            blocks[k][1] += blocks[k + 1][1]
+            del blocks[k + 1]
+        return k, new_off
+
+    def _put(self, pos: int, symbol: str):
+        if pos == self._head:
+            self._bi, self._off = self._assign(self._bi, self._off, 1, symbol)
+            return
+        if symbol == self.blank and not self._start <= pos < self._start + self._length:
+            return
+        self._cover(pos)
+        bi, off = self._find(pos)
+        self._assign(bi, off, 1, symbol)
+        # Индексы блоков могли сдвинуться: ищем головку заново от начала ленты
+        head = self._head
+        self._bi, self._off, self._head = 0, 0, self._start
+        self.head = head
+
+    def get_symbol(self, pos: int) -> str:
+        if not self._start <= pos < self._start + self._length:
+            return self.blank
+        bi, _ = self._find(pos)
+        return self._blocks[bi][0]
+
+    def read(self) -> str:
+        return self._blocks[self._bi][0]
+
+    def move(self, direction: Direction, steps: int = 1):
+        if direction == Direction.LEFT:
+            self._walk(-steps)
+            delta = -steps
+        elif direction == Direction.RIGHT:
+            self._walk(steps)
+            delta = steps
         else:
-            self.tape[pos] = symbol
-        self._notify_observers()
+            delta = 0
+        if self._observers:
+            self._notify_observers(TapeChange(head_delta=delta))
+
+    # Блочные операции для ускоренных движков
+
+    def blocks(self):
+        # Непустые блоки как (позиция начала, символ, длина)
+        result = []
+        pos = self._start
+        for symbol, count in self._blocks:
+            if symbol != self.blank:
+                result.append((pos, symbol, count))
+            pos += count
+        return result
+
+    def run_length(self, direction: Direction):
+        # Сколько ячеек подряд, начиная с головки, содержат символ под головкой.
+        # None — серия пустых символов уходит в бесконечность.
+        symbol, count = self._blocks[self._bi]
+        if direction == Direction.RIGHT:
+            if symbol == self.blank and self._bi == len(self._blocks) - 1:
+                return None
+            return count - self._off
+        if symbol == self.blank and self._bi == 0:
+            return None
+        return self._off + 1
+
+    def fill_run(self, symbol: str, n: int, direction: Direction):
+        # Пишет symbol в n ячеек серии под головкой и сдвигает головку за неё
+        first = self._head
+        if direction == Direction.RIGHT:
+            self._cover(self._head + n - 1)
+            self._bi, self._off = self._assign(self._bi, self._off, n, symbol)
+            self._walk(n)
+        else:
+            self._cover(self._head - n + 1)
+            self._bi, self._off = self._assign(self._bi, self._off - n + 1, n, symbol)
+            self._head -= n - 1
+            self._walk(-1)
+        if self._observers:
+            lo = first if direction == Direction.RIGHT else first - n + 1
+            full = n > TapeChange.MAX_CELLS
+            self._notify_observers(TapeChange(() if full else range(lo, lo + n), self._head - first, full))
+
+    def items(self):
+        return [
+            (pos + i, symbol)
+            for pos, symbol, count in self.blocks()
+            for i in range(count)
+        ]
+
+    def _edges(self):
+        # Номера первого непустого блока и блока за последним непустым.
+        # Соседние блоки с одним символом всегда склеены, поэтому пустые поля
+        # по краям — не больше чем по одному блоку
+        blocks = self._blocks
+        lo = 1 if blocks[0][0] == self.blank else 0
+        hi = len(blocks) - 1 if blocks[-1][0] == self.blank else len(blocks)
+        return lo, max(lo, hi)
+
+    def extent(self):
+        # Из начала и длины ленты за вычетом крайних пустых блоков
+        lo, hi = self._edges()
+        if lo == hi:
+            return None
+        blocks = self._blocks
+        start = self._start + (blocks[0][1] if lo else 0)
+        end = self._start + self._length - (blocks[-1][1] if hi < len(blocks) else 0)
+        return start, end - 1
+
+    def next_nonblank(self, pos: int):
+        pos = max(pos + 1, self._start)
+        if pos >= self._start + self._length:
+            return None
+        blocks = self._blocks
+        bi, off = self._find(pos)
+        while bi < len(blocks):
+            if blocks[bi][0] != self.blank:
+                return pos
+            pos += blocks[bi][1] - off
+            bi += 1
+            off = 0
+        return None
+
+    def prev_nonblank(self, pos: int):
+        pos = min(pos - 1, self._start + self._length - 1)
+        if pos < self._start:
+            return None
+        blocks = self._blocks
+        bi, off = self._find(pos)
+        while bi >= 0:
+            if blocks[bi][0] != self.blank:
+                return pos
+            pos -= off + 1
+            bi -= 1
+            off = blocks[bi][1] - 1
+        return None
+
+    def span(self, lo: int, hi: int) -> str:
+        start, end = self._start, self._start + self._length
+        parts = [self.blank * max(0, min(start, hi + 1) - lo)]
+        pos, stop = max(lo, start), min(hi + 1, end)
+        if pos < stop:
+            blocks = self._blocks
+            bi, off = (0, 0) if pos == start else self._find(pos)
+            while pos < stop:
+                symbol, count = blocks[bi]
+                n = min(count - off, stop - pos)
+                parts.append(symbol * n)
+                pos += n
+                bi += 1
+                off = 0
+        parts.append(self.blank * max(0, hi + 1 - max(end, lo)))
+        return "".join(parts)
+
+    def __str__(self):
+        return self.image()[1]
+
+    def image(self):
+        lo, hi = self._edges()
+        if lo == hi:
+            return 0, ""
+        blocks = self._blocks
+        start = self._start + (blocks[0][1] if lo else 0)
+        return start, "".join(symbol * count for symbol, count in blocks[lo:hi])
+
+    def export(self, f, chunk: int = EXPORT_CHUNK):
+        # Один проход по блокам; длинные блоки пишутся кусками
+        extent = self.extent()
+        if extent is None:
+            return 0, 0
+        lo, hi = extent
+        pos = self._start
+        for symbol, count in self._blocks:
+            n = min(pos + count, hi + 1) - max(pos, lo)
+            pos += count
+            while n > 0:
+                f.write(symbol * min(n, chunk))
+                n -= chunk
+        return lo, hi - lo + 1
+
+
+TAPE_BACKENDS = {
+    "dict": TuringTape,
+    "array": ArrayTape,
+    "bits": BitTape,
+    "rle": RleTape,
+}
+
+
+def make_tape(input_str: str = "", blank_symbol: str = "_", alphabet=(), backend: str = None) -> TuringTape:
+    if backend == "dict":
+        return TuringTape(input_str, blank_symbol)
+    if backend is not None:
+        return TAPE_BACKENDS[backend](input_str, blank_symbol, sorted(set(alphabet)))
+    symbols = set(alphabet) | set(input_str) | {blank_symbol}
+    if len(symbols) <= 2:
+        return BitTape(input_str, blank_symbol, sorted(symbols))
+    if len(symbols) <= 256:
+        return ArrayTape(input_str, blank_symbol, sorted(symbols))
+    return TuringTape(input_str, blank_symbol)
@@ -0,0 +1,128 @@
+from array import array
+from typing import List, Tuple
+
+from core.tape import Direction
+
+TRACE_OFF = "off"
+TRACE_LAST = "last"
+TRACE_FULL = "full"
+TRACE_MODES = (TRACE_OFF, TRACE_LAST, TRACE_FULL)
+
+DIRECTIONS = list(Direction)
+_DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+# Запись трассы: состояние, прочитанный символ, записанный символ, направление, новое состояние
+RECORD = 5
+
+TraceEntry = Tuple[str, str, str, Direction, str]
+
+
+# Трасса выполнения в виде записей фиксированной ширины из целых чисел.
+# Режимы: "off" — не хранится, "last" — последние limit шагов в кольцевом
+# буфере, "full" — все шаги. Память ~ 4 * RECORD байт на хранимый шаг.
+class ExecutionTrace:
+    def __init__(self, mode: str = TRACE_FULL, limit: int = 1000):
+        if mode not in TRACE_MODES:
+            raise ValueError(f"Неизвестный режим трассы: {mode}")
+        if mode == TRACE_LAST and limit <= 0:
+            raise ValueError("Размер кольцевого буфера трассы должен быть положительным")
+        self.mode = mode
+        self.limit = limit
+        self.enabled = mode != TRACE_OFF
+        self.total = 0
+        self._states: List[str] = []
+        self._state_ids = {}
+        self._symbols: List[str] = []
+        self._symbol_ids = {}
+        self._start = 0
+        self._count = 0
+        if mode == TRACE_LAST:
+            self._data = array("i", bytes(4 * RECORD * limit))
+        else:
+            self._data = array("i")
+
+    def _state_id(self, state: str) -> int:
+        sid = self._state_ids.get(state)
+        if sid is None:
+            sid = self._state_ids[state] = len(self._states)
+            self._states.append(state)
+        return sid
+
+    def _symbol_id(self, symbol: str) -> int:
+        sid = self._symbol_ids.get(symbol)
+        if sid is None:
+            sid = self._symbol_ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        return sid
+
+    def append(self, state: str, symbol: str, new_symbol: str, direction: Direction, new_state: str):
+        if not self.enabled:
+            return
+        self.total += 1
+        record = (
+            self._state_id(state),
+            self._symbol_id(symbol),
+            self._symbol_id(new_symbol),
+            _DIRECTION_CODES[direction],
+            self._state_id(new_state)
+        )
+        if self.mode == TRACE_FULL:
+            self._data.extend(record)
+            self._count += 1
+            return
+        if self._count < self.limit:
+            slot = (self._start + self._count) % self.limit
+            self._count += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.limit
+        offset = slot * RECORD
+        self._data[offset:offset + RECORD] = array("i", record)
+
+    def _slot(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Индекс трассы вне диапазона")
+        if self.mode == TRACE_LAST:
+            return (self._start + index) % self.limit
+        return index
+
+    def _decode(self, slot: int) -> TraceEntry:
+        offset = slot * RECORD
+        state, symbol, new_symbol, direction, new_state = self._data[offset:offset + RECORD]
+        return (
+            self._states[state],
+            self._symbols[symbol],
+            self._symbols[new_symbol],
+            DIRECTIONS[direction],
+            self._states[new_state]
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> TraceEntry:
+        return self._decode(self._slot(index))
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def truncate(self, total: int):
+        # Отбрасывает записи шагов с номерами больше total (после отката назад)
+        drop = min(max(self.total - total, 0), self._count)
+        self.total = min(self.total, total)
+        self._count -= drop
+        if self.mode == TRACE_FULL and drop:
+            del self._data[self._count * RECORD:]
+
+    def clear(self):
+        self.total = 0
+        self._start = 0
+        self._count = 0
+        if self.mode == TRACE_FULL:
+            self._data = array("i")
+
+    def memory_usage(self) -> int:
+        return self._data.itemsize * len(self._data)
@@ -1,19 +1,28 @@
-import json
+from contextlib import ExitStack
 
-from PySide6.QtCore import Slot, Qt, QTimer
+from PySide6.QtCore import Slot, Qt, QThread, QTimer
 from PySide6.QtWidgets import (
     QApplication,
     QMainWindow,
     QVBoxLayout,
     QHBoxLayout,
     QWidget,
+    QLabel,
     QLineEdit,
     QPushButton,
+    QSpinBox,
     QMessageBox,
-    QFileDialog
+    QFileDialog,
+    QInputDialog
 )
 
+from core.binproject import tape_segments
+from core.breakpoints import Breakpoints, describe_hit
+from core.checkpoint import checkpoint_machine, read_checkpoint, save_checkpoint
+from core.engine import ChunkedRun
 from core.machine import TuringMachine
+from core.multitape import MultiTapeTuringMachine
+from core.project import BINARY_SUFFIX, ProjectError, load_project, save_project
 from core.tape import TuringTape
 
 from gui.dialogs.about_dialog import AboutDialog
@@ -25,15 +34,27 @@ from gui.widgets.alphabet_widget import AlphabetWidget
 from gui.widgets.notes_widget import NotesWidget
 from gui.widgets.tape_widget import TapeWidget
 from gui.widgets.transition_table_widget import TransitionsTableWidget
+from gui.worker import RunWorker
 
 
 class MainWindow(QMainWindow):
+    # Ограничение шагов для выполнения до конца в рабочем потоке
+    RUN_TO_END_MAX_STEPS = 10 ** 9
+    FILE_FILTER = f"Проекты (*.json *{BINARY_SUFFIX});;JSON (*.json);;Двоичный формат (*{BINARY_SUFFIX})"
+    CHECKPOINT_FILTER = "Контрольные точки (*.ckpt);;Все файлы (*)"
+    TAPE_FILTER = "Текст (*.txt);;Все файлы (*)"
+
     def __init__(self):
         super().__init__()
         self._machine = None
+        self._worker = None
+        self._run_thread = None
         self._timer = QTimer(self)
         self._speed_delay = 400
         self._current_file = None
+        self._checkpoint_file = None
+        self._resumed_machine = None
+        self.breakpoints = Breakpoints()
 
         self._setup_ui()
         self._connect_menu_signals()
@@ -54,6 +75,7 @@ class MainWindow(QMainWindow):
             window_size=10,
             cell_size=50
         )
+        self.tape_widgets = [self.tape_widget]
         self.transitions_table = TransitionsTableWidget(self.alphabet_widget)
         self.notes_widget = NotesWidget()
 
@@ -66,26 +88,39 @@ class MainWindow(QMainWindow):
         btn_load = QPushButton("Загрузить на ленту")
         btn_load.clicked.connect(self._load_tape)
 
+        self.tape_count_spin = QSpinBox()
+        self.tape_count_spin.setRange(1, 4)
+        self.tape_count_spin.valueChanged.connect(self._set_tape_count)
+
         tape_control_layout = QHBoxLayout()
         tape_control_layout.addWidget(self.tape_input)
         tape_control_layout.addWidget(btn_load)
+        tape_control_layout.addWidget(QLabel("Лент:"))
+        tape_control_layout.addWidget(self.tape_count_spin)
+
+        self.tapes_layout = QVBoxLayout()
+        self.tapes_layout.addWidget(self.tape_widget)
 
         layout_1 = QVBoxLayout()
         layout_1.addLayout(tape_control_layout)
-        layout_1.addWidget(self.tape_widget)
+        layout_1.addLayout(self.tapes_layout)
         layout_1.addWidget(self.alphabet_widget)
         layout_1.addWidget(self.transitions_table)
-        layout_1.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+        layout_1.setAlignment(Qt.AlignmentFlag.AlignTop)
 
+        # Лишняя ширина окна достаётся ленте
         layout_2 = QHBoxLayout()
-        layout_2.addLayout(layout_1)
+        layout_2.addLayout(layout_1, 1)
         layout_2.addWidget(self.notes_widget)
 
         central.setLayout(layout_2)
         self.setCentralWidget(central)
 
         self.tape_widget.error_message.connect(self.statusBar().showMessage)
+        self.tape_widget.set_breakpoints(self.breakpoints)
+        self.transitions_table.set_breakpoints(self.breakpoints)
         self.alphabet_widget.text_processed.connect(self.transitions_table.update_alphabet)
+        self.transitions_table.optimize_requested.connect(self.optimize_transitions)
         self.menu_bar.speed_changed.connect(self._update_speed)
 
     def _connect_menu_signals(self):
@@ -94,10 +129,27 @@ class MainWindow(QMainWindow):
         self.menu_bar.open_requested.connect(self.open_file)
         self.menu_bar.save_requested.connect(self.save_file)
         self.menu_bar.save_as_requested.connect(self.save_as_file)
+        self.menu_bar.tape_export_requested.connect(self.export_tape)
         self.menu_bar.exit_requested.connect(self.exit)
 
         # run_menu
         self.menu_bar.run_requested.connect(self.run_program)
+        self.menu_bar.run_to_end_requested.connect(self.run_to_end)
+        self.menu_bar.pause_requested.connect(self.toggle_pause)
+        self.menu_bar.stop_requested.connect(self.stop_run)
+        self.menu_bar.step_back_requested.connect(self.step_back)
+        self.menu_bar.checkpoint_save_requested.connect(self.save_checkpoint)
+        self.menu_bar.checkpoint_resume_requested.connect(self.resume_checkpoint)
+        self.menu_bar.checkpoint_autosave_toggled.connect(self._set_checkpoint_autosave)
+
+        # debug_menu
+        self.menu_bar.rule_breakpoint_requested.connect(self.toggle_rule_breakpoint)
+        self.menu_bar.state_breakpoint_requested.connect(self.toggle_state_breakpoint)
+        self.menu_bar.head_breakpoint_requested.connect(self.toggle_head_breakpoint)
+        self.menu_bar.cell_breakpoint_requested.connect(self.add_cell_breakpoint)
+        self.menu_bar.step_breakpoint_requested.connect(self.add_step_breakpoint)
+        self.menu_bar.clear_breakpoints_requested.connect(self.clear_breakpoints)
+        self.menu_bar.profiling_toggled.connect(self._set_profiling)
 
         # options_menu
         self.menu_bar.options_dialog_requested.connect(self.show_options_dialog)
@@ -115,6 +167,9 @@ class MainWindow(QMainWindow):
 
     @Slot()
     def new_file(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Дождитесь завершения выполнения или остановите его")
+            return
         if self._timer.isActive():
             self._timer.stop()
 
@@ -143,12 +198,11 @@ class MainWindow(QMainWindow):
         self.alphabet_widget.text_processed.emit("")
 
         self.tape_input.clear()
+        self.tape_count_spin.setValue(1)
         self.tape_widget.tape.reset("")
         self.tape_widget.update_view()
 
-        self.transitions_table.dynamic_states = []
-        self.transitions_table.base_states = ["Q0"]
-        self.transitions_table.update_alphabet()
+        self.transitions_table.clear()
 
         self.notes_widget.task_edit.clear()
         self.notes_widget.comments_edit.clear()
@@ -159,6 +213,9 @@ class MainWindow(QMainWindow):
 
     @Slot()
     def open_file(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Дождитесь завершения выполнения или остановите его")
+            return
         if self._timer.isActive():
             self._timer.stop()
 
@@ -186,110 +243,41 @@ class MainWindow(QMainWindow):
             None,
             "Открыть файл",
             "",
-            "JSON Files (*.json)"
+            self.FILE_FILTER
         )
         if not file_path:
             return
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            project = load_project(file_path)
+        except ProjectError as e:
+            ErrorDialog(str(e), self).show()
+            return
         except Exception as e:
             ErrorDialog(f"Ошибка чтения файла: {str(e)}", self).show()
             return
 
-        if not isinstance(data, dict):
-            ErrorDialog("Некорректный формат: не объект JSON", self).show()
-            return
-
-        required_keys = {"alphabet", "tape", "transitions", "notes"}
-        if not required_keys.issubset(data.keys()):
-            ErrorDialog("В файле отсутствуют обязательные ключи", self).show()
-            return
-
-        alphabet = data["alphabet"]
-        if not isinstance(alphabet, list) or not all(isinstance(ch, str) for ch in alphabet):
-            ErrorDialog("Алфавит должен быть списком строк", self).show()
-            return
+        alphabet = project["alphabet"]
         self.alphabet_widget.input_field.setText("".join(alphabet).replace(" ", ""))
         self.alphabet_widget.text_processed.emit("".join(alphabet))
 
-        tape_str = data["tape"]
-        if not isinstance(tape_str, str):
-            ErrorDialog("Лента должна быть строкой", self).show()
-            return
+        tape_str = project["tape"]
         self.tape_input.setText(tape_str)
-        self.tape_widget.tape.reset(tape_str)
-        self.tape_widget.update_view()
-
-        transitions = data["transitions"]
-        if not isinstance(transitions, dict):
-            ErrorDialog("Неправильный формат transitions", self).show()
-            return
-
-        self.transitions_table.dynamic_states = []
-        self.transitions_table.base_states = ["Q0"]
-        self.transitions_table.update_alphabet()
-
-        for state, rules in transitions.items():
-            if not isinstance(rules, dict):
-                continue
-            if state not in (self.transitions_table.base_states + self.transitions_table.dynamic_states):
-                self.transitions_table.dynamic_states.append(state)
-                self.transitions_table.update_alphabet()
-
-            for symbol, rule in rules.items():
-                if (
-                        not isinstance(symbol, str)
-                        or not isinstance(rule, dict)
-                        or "new_symbol" not in rule
-                        or "direction" not in rule
-                        or "next_state" not in rule
-                ):
-                    continue
-
-                new_symbol = rule["new_symbol"]
-                direction = rule["direction"]
-                next_state = rule["next_state"]
-
-                dir_char = "!"
-                if direction == "LEFT":
-                    dir_char = "<"
-                elif direction == "RIGHT":
-                    dir_char = ">"
-
-                suffix = next_state[1:] if next_state.startswith("Q") else next_state
-                if next_state == "Qa":
-                    suffix = "a"
-
-                cell_text = f"{new_symbol}{dir_char}{suffix}"
-
-                all_states = self.transitions_table.base_states + self.transitions_table.dynamic_states
-                try:
-                    col = all_states.index(state)
-                except ValueError:
-                    continue
-
-                row = None
-                for i in range(self.transitions_table.table.rowCount()):
-                    if self.transitions_table.table.verticalHeaderItem(i).text() == symbol:
-                        row = i
-                        break
-                if row is None:
-                    continue
-
-                editor = self.transitions_table.table.cellWidget(row, col)
-                if editor:
-                    editor.setText(cell_text)
-
-        notes = data["notes"]
-        if isinstance(notes, dict):
-            task = notes.get("task", "")
-            comments = notes.get("comments", "")
-            if isinstance(task, str):
-                self.notes_widget.task_edit.setPlainText(task)
-            if isinstance(comments, str):
-                self.notes_widget.comments_edit.setPlainText(comments)
+        self.tape_count_spin.setValue(project["tape_count"])
+        for tape_widget, segments, head in zip(self.tape_widgets, project["segments"], project["heads"]):
+            tape_widget.tape.load_segments(segments, head)
+            tape_widget.update_view()
+
+        self.transitions_table.clear()
+        self.transitions_table.load_transitions(project["transitions"])
+
+        notes = project["notes"]
+        task = notes.get("task", "")
+        comments = notes.get("comments", "")
+        if isinstance(task, str):
+            self.notes_widget.task_edit.setPlainText(task)
+        if isinstance(comments, str):
+            self.notes_widget.comments_edit.setPlainText(comments)
 
         self._current_file = file_path
         self.statusBar().showMessage(f"Файл загружен: {file_path}")
@@ -300,10 +288,9 @@ class MainWindow(QMainWindow):
         if not self._current_file:
             return self.save_as_file()
 
-        data = self._gather_project_data()
+        project = self._gather_project_data()
         try:
-            with open(self._current_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)  # type: ignore
+            save_project(self._current_file, project)
             self.statusBar().showMessage(f"Сохранено: {self._current_file}")
             self._update_window_title()
         except Exception as e:
@@ -317,51 +304,65 @@ class MainWindow(QMainWindow):
             None,
             "Сохранить как",
             "",
-            "JSON Files (*.json)"
+            self.FILE_FILTER
         )
         if not file_path:
             return False
-        if not file_path.lower().endswith(".json"):
+        if not file_path.lower().endswith((".json", BINARY_SUFFIX)):
             file_path += ".json"
         self._current_file = file_path
         return self.save_file()
 
-    def _gather_project_data(self):
-        alphabet = self.alphabet_widget.get_alphabet()
-        tape_str = str(self.tape_widget.tape)
-
-        transitions_raw = self.transitions_table.get_transitions()
-        transitions = {}
-        for (state, symbol), (new_symbol, direction_enum, next_state) in transitions_raw.items():
-            direction = (
-                "LEFT" if direction_enum.name == "LEFT"
-                else "RIGHT" if direction_enum.name == "RIGHT"
-                else "STAY"
-            )
-            transitions.setdefault(state, {})[symbol] = {
-                "new_symbol": new_symbol,
-                "direction": direction,
-                "next_state": next_state
-            }
+    @Slot()
+    def export_tape(self):
+        # Непустая часть каждой ленты — отдельной строкой; лента пишется
+        # в файл кусками, без построения всей строки в памяти
+        if self._worker is not None:
+            self.statusBar().showMessage("Дождитесь завершения выполнения или остановите его")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(None, "Экспорт ленты", "", self.TAPE_FILTER)
+        if not file_path:
+            return
+        try:
+            with open(file_path, "w", encoding="utf-8") as f:
+                extents = []
+                for tape_widget in self.tape_widgets:
+                    extents.append(tape_widget.tape.export(f))
+                    f.write("\n")
+        except OSError as e:
+            ErrorDialog(f"Ошибка экспорта ленты: {str(e)}", self).show()
+            return
+        origin, length = extents[0]
+        self.statusBar().showMessage(f"Лента экспортирована: {file_path} ({length} ячеек с позиции {origin})")
 
+    def _gather_project_data(self):
         notes = {
             "task": self.notes_widget.task_edit.toPlainText(),
             "comments": self.notes_widget.comments_edit.toPlainText()
         }
-
         return {
-            "alphabet": alphabet,
-            "tape": tape_str,
-            "transitions": transitions,
+            "alphabet": self.alphabet_widget.get_alphabet(),
+            "segments": [tape_segments(tape_widget.tape) for tape_widget in self.tape_widgets],
+            "heads": [tape_widget.tape.head for tape_widget in self.tape_widgets],
+            "tape_count": len(self.tape_widgets),
+            "transitions": self.transitions_table.get_transitions(),
             "notes": notes
         }
 
     @Slot()
     def exit(self):
+        self._stop_background_run()
         QApplication.quit()
 
+    def closeEvent(self, event):
+        self._stop_background_run()
+        super().closeEvent(event)
+
     @Slot()
     def run_program(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Дождитесь завершения выполнения или остановите его")
+            return
         try:
             if self._timer.isActive():
                 self._timer.stop()
@@ -371,11 +372,20 @@ class MainWindow(QMainWindow):
                 ErrorDialog("Нет переходов в таблице!", self).show()
                 return
 
+            # Таблица уже разобрана и проверена по алфавиту при редактировании ячеек
             alphabet = set(self.alphabet_widget.get_alphabet())
-            for (state, symbol), (new_symbol, direction, target_state) in transitions.items():
-                if symbol not in alphabet or new_symbol not in alphabet:
-                    ErrorDialog(f"Символ '{symbol}' или '{new_symbol}' не входит в алфавит!", self).show()
-                    return
+
+            if len(self.tape_widgets) > 1:
+                self._machine = MultiTapeTuringMachine(
+                    initial_state="Q0",
+                    final_states={"Qa"},
+                    transition_table=transitions,
+                    tapes=[tape_widget.tape for tape_widget in self.tape_widgets],
+                    alphabet=alphabet,
+                    max_steps=1000
+                )
+                self._timer.start(self._speed_delay)
+                return
 
             self._machine = TuringMachine(
                 initial_state="Q0",
@@ -383,10 +393,19 @@ class MainWindow(QMainWindow):
                 transition_table=transitions,
                 tape=self.tape_widget.tape,
                 alphabet=alphabet,
-                max_steps=1000
+                max_steps=1000,
+                history=True,
+                detect_cycles=True
             )
+            self._machine.breakpoints = self.breakpoints
+            self._start_profiling()
 
             self.tape_widget.update_view()
+            # Точка останова на самом первом правиле срабатывает до первого шага
+            self._machine.break_hit = self.breakpoints.check_next("Q0", self.tape_widget.tape.read())
+            if self._machine.break_hit is not None:
+                self._show_break()
+                return
             self._timer.start(self._speed_delay)
 
         except Exception as e:
@@ -403,18 +422,429 @@ class MainWindow(QMainWindow):
             return
 
         current_state = self._machine.get_current_state()
-        current_symbol = self.tape_widget.tape.read()
+        current_symbol = self._read_symbols()
         self.transitions_table.highlight(current_state, current_symbol)
 
-        ok = self._machine.step()
-        self.tape_widget.update_view()
-        if not ok or self._machine.is_halted:
+        with ExitStack() as stack:
+            for tape_widget in self.tape_widgets:
+                stack.enter_context(tape_widget.tape.batch())
+            ok = self._machine.step()
+        self._show_profile()
+        if getattr(self._machine, "break_hit", None) is not None:
+            self._timer.stop()
+            self._show_break()
+        elif not ok or self._machine.is_halted:
             self._timer.stop()
             if self._machine.error_occurred:
                 ErrorDialog(self._machine.error_message, self).show()
             else:
                 self.statusBar().showMessage("Выполнение завершено")
 
+    @Slot()
+    def run_to_end(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Выполнение уже идёт")
+            return
+        if self._timer.isActive():
+            self._timer.stop()
+        if len(self.tape_widgets) > 1:
+            ErrorDialog("Выполнение до конца доступно только для машины с одной лентой", self).show()
+            return
+
+        transitions = self.transitions_table.get_transitions()
+        if not transitions:
+            ErrorDialog("Нет переходов в таблице!", self).show()
+            return
+
+        if not self._can_continue() or self._machine.engine != "macro":
+            self._machine = TuringMachine(
+                initial_state="Q0",
+                final_states={"Qa"},
+                transition_table=transitions,
+                tape=self.tape_widget.tape,
+                alphabet=set(self.alphabet_widget.get_alphabet()),
+                max_steps=self.RUN_TO_END_MAX_STEPS,
+                engine="macro"
+            )
+            self._machine.breakpoints = self.breakpoints
+            self._start_profiling()
+        # Таблица и лента компилируются здесь, в GUI-потоке; рабочий поток
+        # работает только со своей копией ленты
+        autosave = self.menu_bar.autosave_action.isChecked()
+        self._worker = RunWorker(
+            ChunkedRun(self._machine, macro=True),
+            self._checkpoint_file if autosave else None
+        )
+        self._run_thread = QThread(self)
+        self._worker.moveToThread(self._run_thread)
+        self._run_thread.started.connect(self._worker.run)
+        self._worker.progress.connect(self._show_run_progress)
+        self._worker.checkpointed.connect(self._show_checkpoint_saved)
+        self._worker.checkpoint_failed.connect(self._show_checkpoint_error)
+        self._worker.finished.connect(self._finish_background_run)
+        self._run_thread.start()
+        self.statusBar().showMessage("Выполнение...")
+
+    @Slot(object, float, object, object)
+    def _show_run_progress(self, steps, rate, lo, hi):
+        extent = f"[{lo}, {hi}]" if lo <= hi else "пуста"
+        self.statusBar().showMessage(f"Шаг {steps}, {rate:.0f} шагов/с, лента {extent}")
+
+    @Slot()
+    def _finish_background_run(self):
+        worker, thread = self._worker, self._run_thread
+        self._worker = self._run_thread = None
+        thread.quit()
+        thread.wait()
+        worker.deleteLater()
+        thread.deleteLater()
+        machine = worker.run_state.machine
+        if machine is not self._machine:
+            # Машина заменена во время прогона: его лента и состояние не переносятся
+            return
+        if worker.error is not None:
+            # Конфигурация после сбоя в середине порции не переносится в машину
+            self._machine = None
+            ErrorDialog(f"Ошибка выполнения: {worker.error}", self).show()
+            return
+        worker.run_state.finish()
+
+        self.transitions_table.highlight(machine.get_current_state(), self.tape_widget.tape.read())
+        self._show_profile()
+        if machine.break_hit is not None:
+            self._show_break()
+        elif worker.cancelled:
+            self.statusBar().showMessage(f"Выполнение остановлено на шаге {machine.steps_done}")
+        elif machine.error_occurred:
+            ErrorDialog(machine.error_message, self).show()
+        else:
+            self.statusBar().showMessage(f"Выполнение завершено за {machine.steps_done} шагов")
+
+    def _stop_background_run(self):
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        self._run_thread.quit()
+        self._run_thread.wait()
+
+    def _can_continue(self) -> bool:
+        # Машина стоит на точке останова, восстановлена из контрольной точки
+        # или откачена по истории
+        machine = self._machine
+        return (
+            machine is not None and not machine.is_halted
+            and (machine is self._resumed_machine or getattr(machine, "break_hit", None) is not None)
+        )
+
+    def _start_profiling(self):
+        if self.menu_bar.profiling_action.isChecked() and isinstance(self._machine, TuringMachine):
+            self._machine.start_profiling()
+            self._show_profile()
+
+    @Slot()
+    def optimize_transitions(self):
+        if self._worker is not None or self._timer.isActive():
+            self.statusBar().showMessage("Дождитесь завершения выполнения или остановите его")
+            return
+        report = self.transitions_table.optimize()
+        QMessageBox.information(self, "Оптимизация таблицы", report.summary())
+        if report.changed:
+            self._machine = None
+            self.statusBar().showMessage(
+                f"Таблица оптимизирована: состояний {report.states_before} → {report.states_after}"
+            )
+
+    def _show_profile(self):
+        profile = getattr(self._machine, "profile", None)
+        if profile is not None and self._worker is None:
+            profile.observe_tape(self._machine.tape)
+            self.transitions_table.show_profile(profile)
+
+    @Slot(bool)
+    def _set_profiling(self, enabled):
+        # Во время фонового выполнения включение подействует со следующего запуска
+        if enabled:
+            if self._worker is None and self._machine is not None and not self._machine.is_halted:
+                self._start_profiling()
+            return
+        if isinstance(self._machine, TuringMachine):
+            self._machine.stop_profiling()
+        self.transitions_table.clear_profile()
+
+    def _show_break(self):
+        # Таблица и лента показывают правило и ячейку, на которых стоит машина
+        machine = self._machine
+        self._show_profile()
+        self.tape_widget.update_view()
+        self.tape_widget.view.center_on(self.tape_widget.tape.head)
+        self.transitions_table.highlight(machine.get_current_state(), self.tape_widget.tape.read(), scroll=True)
+        self.statusBar().showMessage(
+            f"Точка останова: {describe_hit(machine.break_hit)} (шаг {machine.steps_done}). "
+            "F6 — продолжить"
+        )
+
+    @Slot()
+    def toggle_pause(self):
+        if self._worker is None:
+            # Продолжение после точки останова тем же способом, каким шло выполнение
+            if self._can_continue() and not self._timer.isActive():
+                if getattr(self._machine, "engine", None) == "macro":
+                    self.run_to_end()
+                else:
+                    self._timer.start(self._speed_delay)
+                    self.statusBar().showMessage("Выполнение продолжено")
+            return
+        if self._worker.paused:
+            self._worker.resume()
+            self.statusBar().showMessage("Выполнение продолжено")
+        else:
+            self._worker.pause()
+            self.statusBar().showMessage(f"Пауза на шаге {self._worker.run_state.steps}")
+
+    @Slot()
+    def stop_run(self):
+        if self._worker is not None:
+            self._worker.cancel()
+        elif self._timer.isActive():
+            self._timer.stop()
+            self.statusBar().showMessage("Выполнение остановлено")
+
+    @Slot()
+    def step_back(self):
+        if self._worker is not None:
+            return
+        if not self._machine or self._machine.history is None:
+            self.statusBar().showMessage("Нет выполнения для отката")
+            return
+        if self._timer.isActive():
+            self._timer.stop()
+
+        if not self._machine.step_back():
+            self.statusBar().showMessage("Достигнуто начало выполнения")
+            return
+
+        # Откаченная машина не остановлена, а F6 продолжает её с этого шага
+        self._resumed_machine = self._machine
+        self.transitions_table.highlight(self._machine.get_current_state(), self.tape_widget.tape.read())
+        self.statusBar().showMessage(
+            f"Шаг {self._machine.steps_done}, состояние {self._machine.get_current_state()}. F6 — продолжить"
+        )
+
+    def _ask_checkpoint_file(self, title: str, save: bool):
+        dialog = QFileDialog.getSaveFileName if save else QFileDialog.getOpenFileName
+        file_path, _ = dialog(None, title, self._checkpoint_file or "", self.CHECKPOINT_FILTER)
+        if file_path and save and "." not in file_path.split("/")[-1]:
+            file_path += ".ckpt"
+        return file_path or None
+
+    @Slot()
+    def save_checkpoint(self):
+        if self._machine is None:
+            self.statusBar().showMessage("Нет выполнения для сохранения")
+            return
+        file_path = self._ask_checkpoint_file("Сохранить контрольную точку", save=True)
+        if file_path is None:
+            return
+        self._checkpoint_file = file_path
+        if self._worker is not None:
+            # Состояние выполнения принадлежит рабочему потоку, запись делает он
+            self._worker.request_checkpoint(file_path)
+            return
+        try:
+            save_checkpoint(file_path, self._machine)
+        except Exception as e:
+            self._show_checkpoint_error(str(e))
+            return
+        self._show_checkpoint_saved(file_path, self._machine.steps_done)
+
+    @Slot(bool)
+    def _set_checkpoint_autosave(self, enabled):
+        if enabled and self._checkpoint_file is None:
+            self._checkpoint_file = self._ask_checkpoint_file("Файл контрольных точек", save=True)
+            if self._checkpoint_file is None:
+                self.menu_bar.autosave_action.setChecked(False)
+                return
+        if self._worker is not None:
+            self._worker.checkpoint_path = self._checkpoint_file if enabled else None
+
+    @Slot(str, object)
+    def _show_checkpoint_saved(self, path, steps):
+        self.statusBar().showMessage(f"Контрольная точка сохранена: {path} (шаг {steps})")
+
+    @Slot(str)
+    def _show_checkpoint_error(self, message):
+        ErrorDialog(f"Ошибка сохранения контрольной точки: {message}", self).show()
+
+    @Slot()
+    def resume_checkpoint(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Дождитесь завершения выполнения или остановите его")
+            return
+        if self._timer.isActive():
+            self._timer.stop()
+        file_path = self._ask_checkpoint_file("Продолжить с контрольной точки", save=False)
+        if file_path is None:
+            return
+        try:
+            data = read_checkpoint(file_path)
+        except ProjectError as e:
+            ErrorDialog(str(e), self).show()
+            return
+        except Exception as e:
+            ErrorDialog(f"Ошибка чтения файла: {str(e)}", self).show()
+            return
+
+        alphabet = data["alphabet"]
+        self.alphabet_widget.input_field.setText("".join(alphabet).replace(" ", ""))
+        self.alphabet_widget.text_processed.emit("".join(alphabet))
+        self.tape_count_spin.setValue(data["tape_count"])
+        self.transitions_table.clear()
+        self.transitions_table.load_transitions(data["transitions"])
+        try:
+            machine = checkpoint_machine(
+                data,
+                [tape_widget.tape for tape_widget in self.tape_widgets],
+                max_steps=self.RUN_TO_END_MAX_STEPS,
+                engine="macro"
+            )
+        except ProjectError as e:
+            ErrorDialog(str(e), self).show()
+            return
+        if isinstance(machine, TuringMachine):
+            machine.breakpoints = self.breakpoints
+        self._machine = self._resumed_machine = machine
+        self._start_profiling()
+        self._checkpoint_file = file_path
+
+        for tape_widget in self.tape_widgets:
+            tape_widget.update_view()
+            tape_widget.view.center_on(tape_widget.tape.head)
+        self.transitions_table.highlight(machine.get_current_state(), self._read_symbols(), scroll=True)
+        if machine.is_halted:
+            self.statusBar().showMessage(f"Контрольная точка загружена: выполнение завершено на шаге {machine.steps_done}")
+        else:
+            self.statusBar().showMessage(f"Контрольная точка загружена: шаг {machine.steps_done}. F6 — продолжить")
+
+    @Slot()
+    def toggle_rule_breakpoint(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Точки останова нельзя менять во время выполнения")
+            return
+        key = self.transitions_table.toggle_transition_breakpoint()
+        if key is None:
+            self.statusBar().showMessage("Выберите ячейку таблицы переходов")
+        elif key in self.breakpoints.transitions:
+            self.statusBar().showMessage(f"Точка останова на правиле ({key[0]}, '{key[1]}')")
+        else:
+            self.statusBar().showMessage(f"Точка останова на правиле ({key[0]}, '{key[1]}') удалена")
+
+    @Slot()
+    def toggle_state_breakpoint(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Точки останова нельзя менять во время выполнения")
+            return
+        state = self.transitions_table.toggle_state_breakpoint()
+        if state is None:
+            self.statusBar().showMessage("Выберите ячейку в столбце состояния")
+        elif state in self.breakpoints.states:
+            self.statusBar().showMessage(f"Точка останова на входе в состояние {state}")
+        else:
+            self.statusBar().showMessage(f"Точка останова на состоянии {state} удалена")
+
+    @Slot()
+    def toggle_head_breakpoint(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Точки останова нельзя менять во время выполнения")
+            return
+        pos = self.tape_widget.selected_position()
+        if pos is None:
+            self.statusBar().showMessage("Выберите ячейку ленты")
+            return
+        if (pos, pos) in self.breakpoints.head_ranges:
+            self.breakpoints.head_ranges.remove((pos, pos))
+            self.statusBar().showMessage(f"Точка останова на ячейке {pos} удалена")
+        else:
+            self.breakpoints.add_head_range(pos, pos)
+            self.statusBar().showMessage(f"Точка останова: головка в ячейке {pos}")
+        self.tape_widget.view.update()
+
+    @Slot()
+    def add_cell_breakpoint(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Точки останова нельзя менять во время выполнения")
+            return
+        pos = self.tape_widget.selected_position()
+        if pos is None:
+            self.statusBar().showMessage("Выберите ячейку ленты")
+            return
+        alphabet = self.alphabet_widget.get_alphabet()
+        symbol, ok = QInputDialog.getItem(
+            self, "Условие на ячейку", f"Остановиться, когда в ячейку {pos} записан символ:", alphabet, 0, False
+        )
+        if not ok:
+            return
+        self.breakpoints.add_cell(pos, symbol)
+        self.tape_widget.view.update()
+        self.statusBar().showMessage(f"Точка останова: в ячейку {pos} записан '{symbol}'")
+
+    @Slot()
+    def add_step_breakpoint(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Точки останова нельзя менять во время выполнения")
+            return
+        step, ok = QInputDialog.getInt(
+            self, "Остановиться на шаге", "Номер шага:", 1, 1, self.RUN_TO_END_MAX_STEPS
+        )
+        if not ok:
+            return
+        self.breakpoints.add_step(step)
+        self.statusBar().showMessage(f"Точка останова на шаге {step}")
+
+    @Slot()
+    def clear_breakpoints(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Точки останова нельзя менять во время выполнения")
+            return
+        self.breakpoints.clear()
+        self.transitions_table.model.breakpoints_changed()
+        self.tape_widget.view.update()
+        self.statusBar().showMessage("Точки останова удалены")
+
+    def _read_symbols(self) -> str:
+        return "".join(tape_widget.tape.read() for tape_widget in self.tape_widgets)
+
+    @Slot(int)
+    def _set_tape_count(self, tape_count):
+        if self._worker is not None:
+            # Прогон идёт на текущих лентах: счётчик возвращается к их числу
+            self.tape_count_spin.blockSignals(True)
+            self.tape_count_spin.setValue(len(self.tape_widgets))
+            self.tape_count_spin.blockSignals(False)
+            self.statusBar().showMessage("Дождитесь завершения выполнения или остановите его")
+            return
+        if self._timer.isActive():
+            self._timer.stop()
+        self._machine = None
+
+        while len(self.tape_widgets) > tape_count:
+            tape_widget = self.tape_widgets.pop()
+            tape_widget.tape.remove_observer(tape_widget)
+            self.tapes_layout.removeWidget(tape_widget)
+            tape_widget.deleteLater()
+        while len(self.tape_widgets) < tape_count:
+            # Дополнительные ленты рабочие: вход загружается только на первую
+            tape_widget = TapeWidget(
+                tape=TuringTape(),
+                alphabet_widget=self.alphabet_widget,
+                window_size=10,
+                cell_size=50
+            )
+            tape_widget.error_message.connect(self.statusBar().showMessage)
+            self.tapes_layout.addWidget(tape_widget)
+            self.tape_widgets.append(tape_widget)
+
+        self.transitions_table.set_tape_count(tape_count)
+
     @Slot(int)
     def _update_speed(self, delay):
         self._speed_delay = delay
@@ -423,6 +853,9 @@ class MainWindow(QMainWindow):
 
     @Slot()
     def _load_tape(self):
+        if self._worker is not None:
+            self.statusBar().showMessage("Дождитесь завершения выполнения или остановите его")
+            return
         s = self.tape_input.text()
         if not s:
             self.statusBar().showMessage("Строка ленты пуста")
@@ -15,10 +15,27 @@ class MainAppMenuBar(QMenuBar):
     open_requested = Signal()
     save_requested = Signal()
     save_as_requested = Signal()
+    tape_export_requested = Signal()
     exit_requested = Signal()
 
     # run_menu
     run_requested = Signal()
+    run_to_end_requested = Signal()
+    pause_requested = Signal()
+    stop_requested = Signal()
+    step_back_requested = Signal()
+    checkpoint_save_requested = Signal()
+    checkpoint_resume_requested = Signal()
+    checkpoint_autosave_toggled = Signal(bool)
+
+    # debug_menu
+    rule_breakpoint_requested = Signal()
+    state_breakpoint_requested = Signal()
+    head_breakpoint_requested = Signal()
+    cell_breakpoint_requested = Signal()
+    step_breakpoint_requested = Signal()
+    clear_breakpoints_requested = Signal()
+    profiling_toggled = Signal(bool)
 
     # options_menu
     options_dialog_requested = Signal()
@@ -37,6 +54,7 @@ class MainAppMenuBar(QMenuBar):
     def _setup_ui(self):
         self._create_file_menu()
         self._create_run_menu()
+        self._create_debug_menu()
         self._create_options_menu()
         self._create_speed_menu()
         self._create_help_menu()
@@ -49,6 +67,7 @@ class MainAppMenuBar(QMenuBar):
             ('Открыть\tCtrl+O', QKeySequence('Ctrl+O'), self.open_requested),
             ('Сохранить\tCtrl+S', QKeySequence('Ctrl+S'), self.save_requested),
             ('Сохранить как\tCtrl+Shift+S', QKeySequence('Ctrl+Shift+S'), self.save_as_requested),
+            ('Экспорт ленты…', None, self.tape_export_requested),
             ('Выход\tCtrl+Q', QKeySequence('Ctrl+Q'), self.exit_requested)
         ]
 
@@ -65,7 +84,13 @@ class MainAppMenuBar(QMenuBar):
         run_menu = QMenu('Запуск', self)
 
         actions = [
-            ('Запустить\tF5', QKeySequence('F5'), self.run_requested)
+            ('Запустить\tF5', QKeySequence('F5'), self.run_requested),
+            ('Выполнить до конца\tCtrl+F5', QKeySequence('Ctrl+F5'), self.run_to_end_requested),
+            ('Пауза / продолжить\tF6', QKeySequence('F6'), self.pause_requested),
+            ('Остановить\tShift+F5', QKeySequence('Shift+F5'), self.stop_requested),
+            ('Шаг назад\tF7', QKeySequence('F7'), self.step_back_requested),
+            ('Сохранить контрольную точку\tCtrl+K', QKeySequence('Ctrl+K'), self.checkpoint_save_requested),
+            ('Продолжить с контрольной точки...', QKeySequence(), self.checkpoint_resume_requested)
         ]
 
         for text, shortcut, handler in actions:
@@ -75,8 +100,40 @@ class MainAppMenuBar(QMenuBar):
             action.triggered.connect(handler)
             run_menu.addAction(action)
 
+        self.autosave_action = QAction('Сохранять контрольные точки во время выполнения', self)
+        self.autosave_action.setCheckable(True)
+        self.autosave_action.toggled.connect(self.checkpoint_autosave_toggled)
+        run_menu.addAction(self.autosave_action)
+
         self.addMenu(run_menu)
 
+    def _create_debug_menu(self):
+        debug_menu = QMenu('Отладка', self)
+
+        actions = [
+            ('Точка останова на правиле\tF9', QKeySequence('F9'), self.rule_breakpoint_requested),
+            ('Точка останова на состоянии\tCtrl+F9', QKeySequence('Ctrl+F9'), self.state_breakpoint_requested),
+            ('Точка останова на ячейке ленты\tShift+F9', QKeySequence('Shift+F9'), self.head_breakpoint_requested),
+            ('Остановиться при записи в ячейку...', QKeySequence(), self.cell_breakpoint_requested),
+            ('Остановиться на шаге...', QKeySequence(), self.step_breakpoint_requested),
+            ('Удалить все точки останова', QKeySequence(), self.clear_breakpoints_requested)
+        ]
+
+        for text, shortcut, handler in actions:
+            action = QAction(text, self)
+            if shortcut:
+                action.setShortcut(shortcut)
+            action.triggered.connect(handler)
+            debug_menu.addAction(action)
+
+        debug_menu.addSeparator()
+        self.profiling_action = QAction('Профилирование правил', self)
+        self.profiling_action.setCheckable(True)
+        self.profiling_action.toggled.connect(self.profiling_toggled)
+        debug_menu.addAction(self.profiling_action)
+
+        self.addMenu(debug_menu)
+
     def _create_options_menu(self):
         options_menu = QMenu('Опции', self)
 
@@ -1,8 +1,7 @@
-from PySide6.QtCore import Qt, QSize, Signal
+from PySide6.QtCore import Qt, QRect, QTimer, Signal
+from PySide6.QtGui import QColor, QFont, QPainter, QPen, QPixmap
 from PySide6.QtWidgets import (
     QHBoxLayout,
-    QLabel,
-    QLineEdit,
     QPushButton,
     QVBoxLayout,
     QWidget,
@@ -10,39 +9,373 @@ from PySide6.QtWidgets import (
 )
 from core.tape import TuringTape, Direction
 
-class Cell(QLineEdit):
-    def __init__(self, idx, tape_widget):
-        super().__init__(tape_widget.tape.blank)
-        self.idx = idx
+HEAD_COLOR = QColor("#ff9999")
+HEAD_BORDER_COLOR = QColor("#ff6666")
+SELECTED_COLOR = QColor("#cfe2ff")
+CELL_COLOR = QColor("#ffffff")
+GRID_COLOR = QColor("#000000")
+MARK_COLOR = QColor("#343a40")
+VIEWPORT_COLOR = QColor(13, 110, 253, 60)
+BREAKPOINT_COLOR = QColor("#dc3545")
+
+
+# Лента, рисуемая одним виджетом: рисуются только видимые ячейки из
+# прямоугольника перерисовки, поэтому стоимость кадра зависит от числа видимых
+# ячеек, а не от размера ленты. Масштаб меняет ширину ячейки (Ctrl + колесо);
+# при мелких ячейках вместо символов рисуются цветные отметки непустых ячеек.
+# Мельче одного пикселя в столбец пикселей сводится stride ячеек, и столбец
+# отмечается, если среди них есть непустая: на кадр уходит не больше одного
+# поиска непустой ячейки на столбец.
+# Вид сдвигается только когда головка подходит к краю, поэтому шаг машины
+# перерисовывает две-три ячейки, а не весь вид.
+class TapeView(QWidget):
+    MIN_CELL = 1
+    MAX_CELL = 120
+    MAX_STRIDE = 4096
+    GLYPH_MIN_CELL = 10
+    GRID_MIN_CELL = 5
+    INDEX_SPACING = 40
+
+    def __init__(self, tape_widget, cell_size: int):
+        super().__init__()
         self.tape_widget = tape_widget
-        self.setMaxLength(1)
-        self.setFixedSize(tape_widget.cell_size, tape_widget.cell_size)
-        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.row_height = cell_size
+        self.index_height = cell_size // 2
+        self.cell_width = cell_size
+        self.stride = 1
+        self.start = 0
+        self.selected = None
+        self.breakpoints = None
+        self._head = tape_widget.tape.head
+        self._glyphs = {}
+        self._colors = {}
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setFixedHeight(self.index_height + self.row_height)
+
+    @property
+    def tape(self) -> TuringTape:
+        return self.tape_widget.tape
+
+    def visible_count(self) -> int:
+        return (self.width() // self.cell_width + 1) * self.stride
+
+    def x_of(self, pos: int) -> int:
+        return (pos - self.start) // self.stride * self.cell_width
+
+    def center_on(self, pos: int):
+        self.start = pos - self.visible_count() // 2
+        self.update()
+        self.tape_widget.minimap.update()
+
+    def follow_head(self) -> bool:
+        # Возвращает True, если вид пришлось сдвинуть
+        head = self.tape.head
+        visible = self.width() // self.cell_width * self.stride
+        margin = min(visible // 10, 8)
+        if self.start + margin <= head < self.start + visible - margin:
+            return False
+        self.center_on(head)
+        return True
+
+    def _cell_rect(self, pos: int) -> QRect:
+        return QRect(self.x_of(pos), self.index_height, self.cell_width, self.row_height)
+
+    def update_positions(self, positions):
+        for pos in positions:
+            if 0 <= pos - self.start <= self.visible_count():
+                self.update(self._cell_rect(pos))
+
+    def head_moved(self):
+        if not self.follow_head():
+            self.update_positions((self._head, self.tape.head))
+        self._head = self.tape.head
+
+    def set_scale(self, width: int, stride: int = 1, anchor: int = None):
+        width = max(self.MIN_CELL, min(self.MAX_CELL, width))
+        stride = max(1, min(self.MAX_STRIDE, stride)) if width == self.MIN_CELL else 1
+        if (width, stride) == (self.cell_width, self.stride):
+            return
+        anchor = self.tape.head if anchor is None else anchor
+        offset = self.x_of(anchor)
+        self.cell_width, self.stride = width, stride
+        self._glyphs.clear()
+        self.start = anchor - offset // width * stride
+        self.update()
+        self.tape_widget.minimap.update()
+
+    def zoom(self, factor: float, anchor: int = None):
+        # Крупнее пикселя меняется ширина ячейки, мельче — число ячеек в столбце
+        if self.stride > 1 or (factor < 1 and self.cell_width == self.MIN_CELL):
+            stride = self.stride / factor
+            stride = max(self.stride + 1, round(stride)) if factor < 1 else min(self.stride - 1, round(stride))
+            self.set_scale(self.MIN_CELL, stride, anchor)
+            return
+        width = round(self.cell_width * factor)
+        if width == self.cell_width:
+            width += 1 if factor > 1 else -1
+        self.set_scale(width, 1, anchor)
+
+    def _glyph(self, symbol: str) -> QPixmap:
+        # Кеш отрисованных символов для текущего размера ячейки
+        glyph = self._glyphs.get(symbol)
+        if glyph is None:
+            glyph = QPixmap(self.cell_width, self.row_height)
+            glyph.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(glyph)
+            font = QFont(self.font())
+            font.setPixelSize(max(6, min(self.cell_width, self.row_height) * 2 // 5))
+            painter.setFont(font)
+            painter.drawText(glyph.rect(), Qt.AlignmentFlag.AlignCenter, symbol)
+            painter.end()
+            self._glyphs[symbol] = glyph
+        return glyph
+
+    def symbol_color(self, symbol: str) -> QColor:
+        color = self._colors.get(symbol)
+        if color is None:
+            color = self._colors[symbol] = QColor.fromHsv((len(self._colors) * 67 + 20) % 360, 160, 170)
+        return color
+
+    def paintEvent(self, event):
+        tape = self.tape
+        blank = tape.blank
+        head = tape.head
+        w = self.cell_width
+        rect = event.rect()
+        first = self.position_at(max(rect.left(), 0))
+        last = self.position_at(rect.right()) + self.stride - 1
+
+        painter = QPainter(self)
+        painter.fillRect(rect, self.palette().window())
+        if rect.top() < self.index_height:
+            self._paint_indexes(painter, first, last)
+
+        glyphs = w >= self.GLYPH_MIN_CELL
+        grid = w >= self.GRID_MIN_CELL
+        top = self.index_height
+        h = self.row_height
+        painter.setPen(QPen(GRID_COLOR, 1))
+        if self.stride > 1:
+            self._paint_columns(painter, first, last)
+        else:
+            for pos in range(first, last + 1):
+                x = (pos - self.start) * w
+                symbol = tape.get_symbol(pos)
+                if pos == head:
+                    background = HEAD_COLOR
+                elif pos == self.selected:
+                    background = SELECTED_COLOR
+                elif symbol != blank and not glyphs:
+                    background = self.symbol_color(symbol)
+                else:
+                    background = CELL_COLOR
+                painter.fillRect(x, top, w, h, background)
+                if grid:
+                    painter.drawRect(x, top, w - 1, h - 1)
+                if glyphs and symbol != blank:
+                    painter.drawPixmap(x, top, self._glyph(symbol))
+
+        if first <= head <= last:
+            painter.setPen(QPen(HEAD_BORDER_COLOR, 2))
+            painter.drawRect(self.x_of(head) + 1, top + 1, max(w - 2, 1), h - 2)
+        if self.breakpoints is not None:
+            self._paint_breakpoints(painter, first, last)
+        painter.end()
+
+    def _paint_columns(self, painter, first: int, last: int):
+        tape = self.tape
+        top, w, h = self.index_height, self.cell_width, self.row_height
+        stride = self.stride
+        painter.fillRect(self.x_of(first), top, self.x_of(last) - self.x_of(first) + w, h, CELL_COLOR)
+        if self.selected is not None and first <= self.selected <= last:
+            painter.fillRect(self.x_of(self.selected), top, w, h, SELECTED_COLOR)
+        pos = tape.next_nonblank(first - 1)
+        while pos is not None and pos <= last:
+            column = (pos - self.start) // stride
+            painter.fillRect(column * w, top, w, h, self.symbol_color(tape.get_symbol(pos)))
+            pos = tape.next_nonblank(self.start + (column + 1) * stride - 1)
+        if first <= tape.head <= last:
+            painter.fillRect(self.x_of(tape.head), top, w, h, HEAD_COLOR)
+
+    def _paint_breakpoints(self, painter, first: int, last: int):
+        # Полоска над ячейками диапазонов головки и точка над ячейками с условием на запись
+        top = self.index_height
+        w = self.cell_width
+        for lo, hi in self.breakpoints.head_ranges:
+            lo, hi = max(lo, first), min(hi, last)
+            if lo <= hi:
+                painter.fillRect(self.x_of(lo), top, self.x_of(hi) - self.x_of(lo) + w, 3, BREAKPOINT_COLOR)
+        size = max(2, min(w, self.row_height) // 6)
+        for pos, _ in self.breakpoints.cells:
+            if first <= pos <= last:
+                painter.fillRect(self.x_of(pos) + w - size - 1, top + 1, size, size, BREAKPOINT_COLOR)
+
+    def _paint_indexes(self, painter, first: int, last: int):
+        # Номер подписывается у каждой k-й ячейки, чтобы подписи не слипались
+        w = self.cell_width
+        # Шаг считается по всему виду, а не по области перерисовки, чтобы
+        # подписи не сдвигались при частичной перерисовке
+        widest = max(len(str(self.start)), len(str(self.start + self.visible_count())))
+        spacing = max(self.INDEX_SPACING, self.fontMetrics().horizontalAdvance("0" * widest) + 8)
+        step, growth = 1, 0
+        while step * w < spacing * self.stride:
+            # Шаг подписей из ряда 1, 2, 5, 10, 20, 50, ...
+            step = step * 5 // 2 if growth % 3 == 1 else step * 2
+            growth += 1
+        painter.setPen(QPen(GRID_COLOR, 1))
+        pos = first - first % step
+        while pos <= last:
+            x = self.x_of(pos)
+            label_width = max(w, spacing)
+            painter.drawText(
+                QRect(x + w // 2 - label_width // 2, 0, label_width, self.index_height),
+                Qt.AlignmentFlag.AlignCenter,
+                str(pos)
+            )
+            pos += step
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.follow_head()
+
+    def position_at(self, x: int) -> int:
+        return self.start + x // self.cell_width * self.stride
+
+    def mousePressEvent(self, event):
+        previous = self.selected
+        self.selected = self.position_at(int(event.position().x()))
+        self.update_positions([p for p in (previous, self.selected) if p is not None])
+        self.setFocus()
+
+    def wheelEvent(self, event):
+        delta = event.angleDelta().y()
+        if not delta:
+            return
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            anchor = self.position_at(int(event.position().x()))
+            self.zoom(1.25 if delta > 0 else 0.8, anchor)
+        else:
+            self.start -= max(1, self.visible_count() // 10) * (1 if delta > 0 else -1)
+            self.update()
+            self.tape_widget.minimap.update()
 
     def keyPressEvent(self, event):
+        if self.selected is None:
+            super().keyPressEvent(event)
+            return
+        tape = self.tape
         key = event.text()
-        if key:
+        if event.key() in (Qt.Key.Key_Backspace, Qt.Key.Key_Delete):
+            tape.set_symbol(self.selected, tape.blank)
+        elif event.key() in (Qt.Key.Key_Left, Qt.Key.Key_Right):
+            previous = self.selected
+            left = event.key() == Qt.Key.Key_Left
+            if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+                # Ctrl + стрелка — к соседней непустой ячейке
+                target = tape.prev_nonblank(previous) if left else tape.next_nonblank(previous)
+                if target is None:
+                    return
+                self.selected = target
+                if not 0 <= target - self.start < self.visible_count() - self.stride:
+                    self.center_on(target)
+                    return
+            else:
+                self.selected += -1 if left else 1
+            self.update_positions((previous, self.selected))
+        elif key and key.isprintable():
             alphabet = self.tape_widget.alphabet_widget.get_alphabet()
             if key not in alphabet:
                 self.tape_widget.error_message.emit(f"Символ '{key}' не входит в алфавит")
                 event.ignore()
                 return
-
-            pos = self.tape_widget.tape.head - self.tape_widget.window + self.idx
-            if pos == self.tape_widget.tape.head:
-                self.tape_widget.tape.write(key)
-            else:
-                self.tape_widget.tape.set_symbol(pos, key)
+            tape.set_symbol(self.selected, key)
         else:
-            if event.key() in (Qt.Key.Key_Backspace, Qt.Key.Key_Delete):
-                pos = self.tape_widget.tape.head - self.tape_widget.window + self.idx
-                if pos == self.tape_widget.tape.head:
-                    self.tape_widget.tape.write(self.tape_widget.tape.blank)
-                else:
-                    self.tape_widget.tape.set_symbol(pos, self.tape_widget.tape.blank)
-                self.setText("")
-            else:
-                super().keyPressEvent(event)
+            super().keyPressEvent(event)
+
+
+# Миникарта всей использованной области ленты: отметки непустых ячеек,
+# рамка видимой части и положение головки. Отметки пересчитываются не чаще
+# одного раза за REFRESH_MS, поэтому быстрая анимация не обходит ленту на каждом шаге.
+class TapeMinimap(QWidget):
+    REFRESH_MS = 250
+
+    def __init__(self, tape_widget, height: int = 14):
+        super().__init__()
+        self.tape_widget = tape_widget
+        self.setFixedHeight(height)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self._lo = 0
+        self._hi = 0
+        self._marks = []
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.refresh)
+
+    def invalidate(self):
+        if not self._timer.isActive():
+            self._timer.start(self.REFRESH_MS)
+
+    def refresh(self):
+        # Не больше одного поиска непустой ячейки на столбец пикселей:
+        # после отметки поиск продолжается с начала следующего столбца
+        tape = self.tape_widget.tape
+        extent = tape.extent()
+        self._lo, self._hi = extent or (0, 0)
+        width = max(self.width(), 1)
+        span = self._hi - self._lo + 1
+        marks = bytearray(width)
+        pos = self._lo if extent else None
+        while pos is not None:
+            x = (pos - self._lo) * width // span
+            marks[x] = 1
+            pos = tape.next_nonblank(self._lo + -(-(x + 1) * span // width) - 1)
+        self._marks = marks
+        self.update()
+
+    def _range(self):
+        view = self.tape_widget.view
+        head = self.tape_widget.tape.head
+        lo = min(self._lo, view.start, head)
+        hi = max(self._hi, view.start + view.visible_count(), head)
+        return lo, hi - lo + 1
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        width, height = self.width(), self.height()
+        painter.fillRect(0, 0, width, height, CELL_COLOR)
+        lo, span = self._range()
+
+        # Отметки рассчитаны для области [_lo, _hi]; переводим их в текущий масштаб
+        if self._marks:
+            used = self._hi - self._lo + 1
+            for x, mark in enumerate(self._marks):
+                if mark:
+                    pos = self._lo + x * used // len(self._marks)
+                    painter.fillRect((pos - lo) * width // span, 2, 1, height - 4, MARK_COLOR)
+
+        view = self.tape_widget.view
+        left = (view.start - lo) * width // span
+        right = (view.start + view.visible_count() - lo) * width // span
+        painter.fillRect(left, 0, max(right - left, 2), height, VIEWPORT_COLOR)
+
+        head_x = (self.tape_widget.tape.head - lo) * width // span
+        painter.fillRect(head_x, 0, 2, height, HEAD_BORDER_COLOR)
+        painter.setPen(QPen(GRID_COLOR, 1))
+        painter.drawRect(0, 0, width - 1, height - 1)
+        painter.end()
+
+    def mousePressEvent(self, event):
+        self._jump(event)
+
+    def mouseMoveEvent(self, event):
+        self._jump(event)
+
+    def _jump(self, event):
+        lo, span = self._range()
+        x = int(event.position().x())
+        self.tape_widget.view.center_on(lo + x * span // max(self.width(), 1))
+
 
 class TapeWidget(QWidget):
     error_message = Signal(str)
@@ -54,77 +387,74 @@ class TapeWidget(QWidget):
         self.tape.add_observer(self)
         self.window = window_size
         self.cell_size = cell_size
-        self.index_labels = []
-        self.cells = []
         self._setup_ui()
         w, h = self.calculate_fixed_size()
-        self.setFixedSize(QSize(w, h))
+        # Ширина растёт вместе с окном: вид показывает столько ячеек, сколько помещается
+        self.setMinimumWidth(w)
+        self.setFixedHeight(h)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.view.start = self.tape.head - self.window
 
-    def on_tape_changed(self):
-        self.update_view()
+    def on_tape_changed(self, change):
+        if change.full:
+            self.update_view()
+            return
+        if change.cells:
+            self.view.update_positions(change.cells)
+        if change.head_delta:
+            self.view.head_moved()
+        self.minimap.invalidate()
 
     def _setup_ui(self):
         main_layout = QVBoxLayout(self)
 
-        index_layout = QHBoxLayout()
-        index_layout.setSpacing(0)
-        for _ in range(2 * self.window + 1):
-            lbl = QLabel("")
-            lbl.setFixedSize(self.cell_size, self.cell_size // 2)
-            lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            lbl.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-            index_layout.addWidget(lbl)
-            self.index_labels.append(lbl)
-        main_layout.addLayout(index_layout)
-
-        tape_layout = QHBoxLayout()
-        tape_layout.setSpacing(0)
-        for idx in range(2 * self.window + 1):
-            cell = Cell(idx, self)
-            tape_layout.addWidget(cell)
-            self.cells.append(cell)
-        main_layout.addLayout(tape_layout)
+        self.view = TapeView(self, self.cell_size)
+        main_layout.addWidget(self.view)
+
+        self.minimap = TapeMinimap(self)
+        main_layout.addWidget(self.minimap)
 
         btn_layout = QHBoxLayout()
         btn_left = QPushButton("⬅")
         btn_right = QPushButton("➡")
-        btn_left.setFixedSize(self.cell_size * self.window, self.cell_size)
-        btn_right.setFixedSize(self.cell_size * self.window, self.cell_size)
+        btn_left.setFixedHeight(self.cell_size)
+        btn_right.setFixedHeight(self.cell_size)
         btn_left.clicked.connect(self.move_left)
         btn_right.clicked.connect(self.move_right)
         btn_layout.addWidget(btn_left)
         btn_layout.addWidget(btn_right)
         main_layout.addLayout(btn_layout)
 
-        self.update_view()
-
     def calculate_fixed_size(self):
         width = (2 * self.window + 1) * self.cell_size
-        height = self.cell_size + self.cell_size // 2 + self.cell_size * 2
+        height = self.cell_size + self.cell_size // 2 + self.cell_size * 2 + self.minimap.height()
         return width, height
 
     def update_view(self):
-        start = self.tape.head - self.window
-
-        for idx, lbl in enumerate(self.index_labels):
-            lbl.setText(str(start + idx))
-
-        for idx, cell in enumerate(self.cells):
-            pos = start + idx
-            symbol = self.tape.tape.get(pos, self.tape.blank)
-            display = "" if symbol == "_" else symbol
-            cell.blockSignals(True)
-            cell.setText(display)
-            cell.blockSignals(False)
-            if pos == self.tape.head:
-                cell.setStyleSheet("border:2px solid #ff6666; background-color: #ff9999; font-size: 20px;")
-            else:
-                cell.setStyleSheet("border:1px solid black; font-size: 20px;")
+        self.view._head = self.tape.head
+        self.view.follow_head()
+        self.view.update()
+        self.minimap.refresh()
+
+    def set_breakpoints(self, breakpoints):
+        self.view.breakpoints = breakpoints
+        self.view.update()
+
+    def selected_position(self):
+        return self.view.selected
+
+    def update_cells(self, positions):
+        self.view.update_positions(positions)
+        self.minimap.invalidate()
+
+    def zoom_in(self):
+        self.view.zoom(1.25)
+
+    def zoom_out(self):
+        self.view.zoom(0.8)
 
     def move_left(self):
         self.tape.move(Direction.LEFT)
-        self.update_view()
 
     def move_right(self):
         self.tape.move(Direction.RIGHT)
-        self.update_view()
@@ -1,87 +1,408 @@
-from PySide6.QtCore import Signal
-from PySide6.QtWidgets import QWidget, QTableWidget, QHeaderView, QLineEdit, QPushButton, QHBoxLayout, QVBoxLayout
+import math
+from itertools import product
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Signal
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (
+    QWidget,
+    QTableView,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QHBoxLayout,
+    QVBoxLayout,
+    QSplitter,
+    QStyledItemDelegate
+)
+from core.optimize import optimize_table
 from core.tape import Direction
 
+DIRECTION_CHARS = {Direction.LEFT: '<', Direction.RIGHT: '>', Direction.STAY: '!'}
+CHAR_DIRECTIONS = {char: direction for direction, char in DIRECTION_CHARS.items()}
+
+INVALID_COLOR = QColor("#ffdddd")
+HIGHLIGHT_COLOR = QColor("#ff9999")
+BREAKPOINT_COLOR = QColor("#ffe08a")
+BREAKPOINT_MARK = "● "
+HEAT_COLOR = QColor("#ff8c42")
+
+
+def heat_color(fraction: float) -> QColor:
+    # От белого к HEAT_COLOR; fraction в [0, 1]
+    return QColor(
+        round(255 + (HEAT_COLOR.red() - 255) * fraction),
+        round(255 + (HEAT_COLOR.green() - 255) * fraction),
+        round(255 + (HEAT_COLOR.blue() - 255) * fraction)
+    )
+
+
+def _label(symbol) -> str:
+    return symbol if isinstance(symbol, str) else "".join(symbol)
+
+
+def _is_state_number(state: str) -> bool:
+    return state.startswith("Q") and state[1:].isdigit()
+
 
 class CellEditor(QLineEdit):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, parent=None):
+        super().__init__(parent)
         self.setPlaceholderText("")
 
 
+# Модель таблицы переходов: столбцы — состояния, строки — символы (или
+# сочетания символов для k лент). Хранятся только непустые ячейки в словаре
+# {(состояние, символ): текст}, поэтому смена алфавита или списка состояний
+# не пересоздаёт ячейки, а только сбрасывает заголовки. Рядом поддерживается
+# готовая разобранная таблица переходов: она обновляется по одной ячейке при
+# редактировании и целиком только при смене алфавита.
+class TransitionsModel(QAbstractTableModel):
+    cell_edited = Signal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.states = []
+        self.labels = []
+        self.texts = {}
+        self.transitions = {}
+        self.state_columns = {}
+        self.label_rows = {}
+        self.alphabet = set()
+        self.tape_count = 1
+        self.highlighted = None
+        self.breakpoints = None
+        # Тепловая карта профиля: {(состояние, символ): (срабатывания, цвет)}
+        self.heat = {}
+
+    def _rule_key(self, key):
+        state, label = key
+        return (state, label) if self.tape_count == 1 else (state, tuple(label))
+
+    def _update_rule(self, key, text: str):
+        text = text.strip()
+        if TransitionsTableWidget._validate_input(text, self.alphabet, self.tape_count):
+            self.transitions[self._rule_key(key)] = TransitionsTableWidget._parse_input(text, self.tape_count)
+        else:
+            self.transitions.pop(self._rule_key(key), None)
+
+    def _set_headers(self, states, labels, alphabet, tape_count: int):
+        self.states = list(states)
+        self.labels = list(labels)
+        self.state_columns = {state: col for col, state in enumerate(self.states)}
+        self.label_rows = {label: row for row, label in enumerate(self.labels)}
+        self.alphabet = set(alphabet)
+        self.tape_count = tape_count
+        self.highlighted = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.labels)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.states)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            if section >= len(self.states):
+                return None
+            state = self.states[section]
+            if self.breakpoints is not None and state in self.breakpoints.states:
+                return BREAKPOINT_MARK + state
+            return state
+        return self.labels[section] if section < len(self.labels) else None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+
+    def text(self, row: int, col: int) -> str:
+        return self.texts.get((self.states[col], self.labels[row]), "")
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self.text(index.row(), index.column())
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if self.highlighted == (index.row(), index.column()):
+                return HIGHLIGHT_COLOR
+            key = (self.states[index.column()], self.labels[index.row()])
+            if key in self.texts and self._rule_key(key) not in self.transitions:
+                return INVALID_COLOR
+            if self.breakpoints is not None and key in self.breakpoints.transitions:
+                return BREAKPOINT_COLOR
+            if key in self.heat:
+                return self.heat[key][1]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            key = (self.states[index.column()], self.labels[index.row()])
+            if key in self.heat:
+                return f"Срабатываний: {self.heat[key][0]}"
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        key = (self.states[index.column()], self.labels[index.row()])
+        if value:
+            self.texts[key] = value
+        else:
+            self.texts.pop(key, None)
+        self._update_rule(key, value)
+        self.dataChanged.emit(index, index)
+        self.cell_edited.emit(index.row(), index.column())
+        return True
+
+    def set_headers(self, states, labels, alphabet, tape_count: int = 1):
+        self.beginResetModel()
+        reparse = set(alphabet) != self.alphabet or tape_count != self.tape_count
+        self._set_headers(states, labels, alphabet, tape_count)
+        # Тексты ячеек, выпавших из таблицы, не возвращаются при повторном добавлении
+        self.texts = {
+            key: text for key, text in self.texts.items()
+            if key[0] in self.state_columns and key[1] in self.label_rows
+        }
+        if reparse:
+            # Корректность правил зависит от алфавита: разбираем все ячейки заново
+            self.transitions = {}
+            for key, text in self.texts.items():
+                self._update_rule(key, text)
+        else:
+            self.transitions = {
+                key: rule for key, rule in self.transitions.items()
+                if key[0] in self.state_columns
+            }
+        self.endResetModel()
+
+    def load(self, states, labels, alphabet, texts: dict, transitions: dict, tape_count: int = 1):
+        # Массовая загрузка за один проход: один сброс модели вместо пересчёта на
+        # каждое правило. transitions — уже проверенные правила для ячеек texts
+        self.beginResetModel()
+        self._set_headers(states, labels, alphabet, tape_count)
+        self.texts = texts
+        self.transitions = transitions
+        self.endResetModel()
+
+    def clear(self):
+        self.texts = {}
+        self.transitions = {}
+
+    def breakpoints_changed(self):
+        if self.states:
+            self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, len(self.states) - 1)
+        if self.states and self.labels:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(len(self.labels) - 1, len(self.states) - 1),
+                [Qt.ItemDataRole.BackgroundRole]
+            )
+
+    def set_heat(self, hits: dict):
+        # Яркость — по логарифму числа срабатываний, чтобы были видны и редкие правила
+        top = max(hits.values(), default=0)
+        scale = math.log1p(top) or 1
+        self.heat = {
+            (state, _label(symbol)): (count, heat_color(math.log1p(count) / scale))
+            for (state, symbol), count in hits.items()
+        }
+        self.breakpoints_changed()
+
+    def set_highlighted(self, cell):
+        previous, self.highlighted = self.highlighted, cell
+        for changed in (previous, cell):
+            if changed is not None:
+                index = self.index(*changed)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.BackgroundRole])
+
+
+# Список самых частых правил профиля; сортировка по столбцу через прокси-модель
+class HotRulesModel(QAbstractTableModel):
+    HEADERS = ("Состояние", "Символ", "Срабатывания", "Доля, %")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rules = []
+        self.total = 0
+
+    def set_rules(self, rules, total: int):
+        self.beginResetModel()
+        self.rules = [(state, _label(symbol), count) for (state, symbol), count in rules]
+        self.total = total
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rules)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        state, label, count = self.rules[index.row()]
+        share = 100 * count / self.total if self.total else 0
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return (state, label, str(count), f"{share:.1f}")[column]
+        if role == Qt.ItemDataRole.UserRole:
+            return (state, label, count, share)[column]
+        return None
+
+
+class CellDelegate(QStyledItemDelegate):
+    def createEditor(self, parent, option, index):
+        return CellEditor(parent)
+
+    def setEditorData(self, editor, index):
+        editor.setText(index.data(Qt.ItemDataRole.EditRole) or "")
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.text(), Qt.ItemDataRole.EditRole)
+
+
 class TransitionsTableWidget(QWidget):
     transition_changed = Signal(str, str, str, Direction, str)
     state_added = Signal(str)
     state_removed = Signal(str)
+    optimize_requested = Signal()
 
     def __init__(self, alphabet_widget):
         super().__init__()
         self.alphabet_widget = alphabet_widget
         self.base_states = ["Q0"]
         self.dynamic_states = []
-        self._highlighted = None
+        self.tape_count = 1
         self._setup_ui()
         self._connect_signals()
 
     def _setup_ui(self):
-        self.table = QTableWidget()
+        self.model = TransitionsModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegate(CellDelegate(self.table))
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.AllEditTriggers)
+        self.table.setEditTriggers(QTableView.EditTrigger.AllEditTriggers)
+
+        self.hot_model = HotRulesModel(self)
+        self.hot_proxy = QSortFilterProxyModel(self)
+        self.hot_proxy.setSourceModel(self.hot_model)
+        self.hot_proxy.setSortRole(Qt.ItemDataRole.UserRole)
+        self.hot_rules = QTableView()
+        self.hot_rules.setModel(self.hot_proxy)
+        self.hot_rules.setSortingEnabled(True)
+        self.hot_rules.sortByColumn(2, Qt.SortOrder.DescendingOrder)
+        self.hot_rules.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.hot_rules.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.hot_rules.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.hot_rules.verticalHeader().hide()
+        self.profile_label = QLabel()
+
+        profile_panel = QWidget()
+        profile_layout = QVBoxLayout(profile_panel)
+        profile_layout.setContentsMargins(0, 0, 0, 0)
+        profile_layout.addWidget(self.profile_label)
+        profile_layout.addWidget(self.hot_rules)
+        self.profile_panel = profile_panel
+        self.profile_panel.hide()
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        splitter.addWidget(self.table)
+        splitter.addWidget(self.profile_panel)
+        splitter.setStretchFactor(0, 3)
+        splitter.setStretchFactor(1, 1)
 
         self.add_btn = QPushButton("Добавить состояние")
         self.remove_btn = QPushButton("Удалить состояние")
+        self.optimize_btn = QPushButton("Оптимизировать")
 
         btn_layout = QHBoxLayout()
         btn_layout.addWidget(self.add_btn)
         btn_layout.addWidget(self.remove_btn)
+        btn_layout.addWidget(self.optimize_btn)
         btn_layout.addStretch()
 
         main_layout = QVBoxLayout(self)
         main_layout.addLayout(btn_layout)
-        main_layout.addWidget(self.table)
+        main_layout.addWidget(splitter)
 
-        self._update_columns()
         self.update_alphabet()
 
     def _connect_signals(self):
-        self.table.cellChanged.connect(self._process_cell_input)
+        self.model.cell_edited.connect(self._process_cell_input)
         self.add_btn.clicked.connect(self.add_state)
         self.remove_btn.clicked.connect(self.remove_state)
+        self.optimize_btn.clicked.connect(self.optimize_requested)
         self.alphabet_widget.text_processed.connect(self.update_alphabet)
-
-    def _update_columns(self):
-        all_states = self.base_states + self.dynamic_states
-        self.table.setColumnCount(len(all_states))
-        self.table.setHorizontalHeaderLabels(all_states)
+        self.hot_rules.doubleClicked.connect(self._select_hot_rule)
 
     def update_alphabet(self):
-        old_alphabet = [self.table.verticalHeaderItem(r).text() for r in range(self.table.rowCount())]
-        old_states = self.base_states + self.dynamic_states
-        old_data = {}
-        for r, symbol in enumerate(old_alphabet):
-            for c, state in enumerate(old_states):
-                editor = self.table.cellWidget(r, c)
-                if isinstance(editor, QLineEdit):
-                    old_data[(state, symbol)] = editor.text()
-
-        new_alphabet = self.alphabet_widget.get_alphabet()
-        self._update_columns()
-        self.table.clearContents()
-        self.table.setRowCount(len(new_alphabet))
-        self.table.setVerticalHeaderLabels(new_alphabet)
-
-        for r, symbol in enumerate(new_alphabet):
-            for c, state in enumerate(self.base_states + self.dynamic_states):
-                editor = CellEditor()
-                txt = old_data.get((state, symbol), '')
-                editor.setText(txt)
-                self.table.setCellWidget(r, c, editor)
+        self.model.set_headers(
+            self.base_states + self.dynamic_states,
+            self._row_labels(),
+            self.alphabet_widget.get_alphabet(),
+            self.tape_count
+        )
+
+    def _row_labels(self):
+        # Для k лент строка таблицы — сочетание символов под всеми головками
+        alphabet = self.alphabet_widget.get_alphabet()
+        if self.tape_count == 1:
+            return alphabet
+        return ["".join(symbols) for symbols in product(alphabet, repeat=self.tape_count)]
+
+    def set_tape_count(self, tape_count: int):
+        if tape_count == self.tape_count:
+            return
+        # Правила с другим числом лент не имеют смысла: таблица очищается
+        self.tape_count = tape_count
+        self.model.clear()
+        self.update_alphabet()
+
+    def clear(self):
+        self.base_states = ["Q0"]
+        self.dynamic_states = []
+        self.model.clear()
+        self.update_alphabet()
+
+    def load_transitions(self, transitions):
+        # Заполняет таблицу готовыми правилами за один проход по ним. Правило
+        # попадает в разобранную таблицу, если его текст прошёл бы проверку ячейки
+        alphabet = self.alphabet_widget.get_alphabet()
+        alphabet_set = set(alphabet)
+        labels = self._row_labels()
+        label_set = set(labels)
+        all_states = list(self.base_states)
+        known = set(all_states)
+        texts = {}
+        parsed = {}
+        for key, rule in transitions.items():
+            state, symbol = key
+            label = "".join(symbol)
+            if label not in label_set:
+                continue
+            if state not in known:
+                known.add(state)
+                all_states.append(state)
+            new_symbol, direction, next_state = rule
+            texts[(state, label)] = self.format_input(new_symbol, direction, next_state)
+            if set(new_symbol) <= alphabet_set and (next_state == "Qa" or _is_state_number(next_state)):
+                parsed[key] = rule
+        self.dynamic_states = all_states[len(self.base_states):]
+        self.model.load(all_states, labels, alphabet, texts, parsed, self.tape_count)
+
+    def set_cell_text(self, state: str, symbol: str, text: str):
+        index = self.model.index(self.model.label_rows[symbol], self.model.state_columns[state])
+        self.model.setData(index, text)
 
     def add_state(self):
         idx = len(self.dynamic_states) + 1
         new_state = f"Q{idx}"
         self.dynamic_states.append(new_state)
-        self._update_columns()
         self.update_alphabet()
         self.state_added.emit(new_state)
 
@@ -89,86 +410,138 @@ class TransitionsTableWidget(QWidget):
         if not self.dynamic_states:
             return
         last = self.dynamic_states.pop()
-        self._update_columns()
         self.update_alphabet()
         self.state_removed.emit(last)
 
     def _process_cell_input(self, row, col):
-        editor = self.table.cellWidget(row, col)
-        if not isinstance(editor, QLineEdit):
-            return
-        text = editor.text().strip()
-        symbol = self.table.verticalHeaderItem(row).text()
-        current_state = self.table.horizontalHeaderItem(col).text()
-        alphabet = self.alphabet_widget.get_alphabet()
+        symbol = self.model.labels[row]
+        current_state = self.model.states[col]
+        rule = self.model.transitions.get(self.model._rule_key((current_state, symbol)))
 
-        if self._validate_input(text, alphabet):
-            new_symbol, direction, target_state = self._parse_input(text)
-            if target_state not in self.base_states + self.dynamic_states:
+        if rule is not None:
+            new_symbol, direction, target_state = rule
+            if target_state not in self.model.state_columns and target_state != "Qa":
                 self.dynamic_states.append(target_state)
-                self._update_columns()
                 self.update_alphabet()
                 self.state_added.emit(target_state)
-            self.transition_changed.emit(current_state, symbol, new_symbol, direction, target_state)
-            editor.setStyleSheet("")
-        else:
-            editor.setStyleSheet("background-color: #ffdddd;")
+            if self.tape_count == 1:
+                self.transition_changed.emit(current_state, symbol, new_symbol, direction, target_state)
 
+    # Формат ячейки для k лент: k новых символов, k направлений, номер состояния
     @staticmethod
-    def _validate_input(text: str, alphabet: list) -> bool:
-        if len(text) < 3:
+    def _validate_input(text: str, alphabet: list, tape_count: int = 1) -> bool:
+        k = tape_count
+        if len(text) < 2 * k + 1:
             return False
-        if text[1] not in {'>', '<', '!'}:
+        if any(ch not in {'>', '<', '!'} for ch in text[k:2 * k]):
             return False
-        if text[0] not in alphabet:
+        if any(ch not in alphabet for ch in text[:k]):
             return False
-        if not text[2:].isdigit() and text[2:] != "a":
+        if not text[2 * k:].isdigit() and text[2 * k:] != "a":
             return False
         return True
 
     @staticmethod
-    def _parse_input(text: str):
-        new_symbol = text[0]
-        direction = {'>': Direction.RIGHT, '<': Direction.LEFT, '!': Direction.STAY}[text[1]]
-        suffix = text[2:]
+    def _parse_input(text: str, tape_count: int = 1):
+        k = tape_count
+        directions = CHAR_DIRECTIONS
+        suffix = text[2 * k:]
         target_state = f"Q{suffix}" if suffix != 'a' else 'Qa'
-        return new_symbol, direction, target_state
+        if k == 1:
+            return text[0], directions[text[1]], target_state
+        return tuple(text[:k]), tuple(directions[ch] for ch in text[k:2 * k]), target_state
+
+    @staticmethod
+    def format_input(new_symbol, direction, next_state: str) -> str:
+        chars = DIRECTION_CHARS
+        if isinstance(direction, tuple):
+            dir_chars = "".join(chars[d] for d in direction)
+            new_symbol = "".join(new_symbol)
+        else:
+            dir_chars = chars[direction]
+        suffix = next_state[1:] if next_state.startswith("Q") else next_state
+        if next_state == "Qa":
+            suffix = "a"
+        return f"{new_symbol}{dir_chars}{suffix}"
+
+    def optimize(self):
+        # Перестраивает таблицу из разобранных правил: некорректные ячейки и
+        # состояния без правил пропадают, состояния нумеруются заново от Q0
+        table, report = optimize_table(self.model.transitions, "Q0", {"Qa"}, renumber=True)
+        if report.changed:
+            self.base_states = ["Q0"]
+            self.dynamic_states = []
+            self.clear_profile()
+            self.load_transitions(table)
+        return report
 
     def get_transitions(self):
-        transitions = {}
-        for r in range(self.table.rowCount()):
-            symbol = self.table.verticalHeaderItem(r).text()
-            for c, state in enumerate(self.base_states + self.dynamic_states):
-                editor = self.table.cellWidget(r, c)
-                if isinstance(editor, QLineEdit) and \
-                   self._validate_input(editor.text().strip(), self.alphabet_widget.get_alphabet()):
-                    new_symbol, direction, target_state = self._parse_input(editor.text().strip())
-                    current_state = state
-                    transitions[(current_state, symbol)] = (new_symbol, direction, target_state)
-        return transitions
-
-    def highlight(self, state: str, symbol: str):
-        if self._highlighted:
-            prev_r, prev_c = self._highlighted
-            prev_widget = self.table.cellWidget(prev_r, prev_c)
-            if prev_widget:
-                prev_widget.setStyleSheet("")
-
-        all_states = self.base_states + self.dynamic_states
-        try:
-            c = all_states.index(state)
-        except ValueError:
-            return
+        # Копия разобранной таблицы: машина, запущенная с ней, не видит
+        # правок ячеек во время выполнения, и повтор шагов из истории
+        # (step_back) идёт по той же таблице
+        return dict(self.model.transitions)
 
-        try:
-            r = [
-                self.table.verticalHeaderItem(i).text()
-                for i in range(self.table.rowCount())
-            ].index(symbol)
-        except ValueError:
-            return
+    def highlight(self, state: str, symbol: str, scroll: bool = False):
+        c = self.model.state_columns.get(state)
+        r = self.model.label_rows.get(symbol)
+        self.model.set_highlighted(None if r is None or c is None else (r, c))
+        if scroll and r is not None and c is not None:
+            self.table.scrollTo(self.model.index(r, c))
+
+    def show_profile(self, profile):
+        hits = profile.hits()
+        total = sum(hits.values())
+        self.model.set_heat(hits)
+        self.hot_model.set_rules(profile.hot_rules(), total)
+        parts = [f"Шагов: {total}"]
+        if profile.head_min is not None:
+            parts.append(f"головка [{profile.head_min}, {profile.head_max}]")
+        if profile.extent is not None:
+            parts.append(f"лента [{profile.extent[0]}, {profile.extent[1]}]")
+        self.profile_label.setText(", ".join(parts))
+        self.profile_panel.show()
+
+    def clear_profile(self):
+        self.model.set_heat({})
+        self.hot_model.set_rules([], 0)
+        self.profile_panel.hide()
+
+    def _select_hot_rule(self, index):
+        state, label, _ = self.hot_model.rules[self.hot_proxy.mapToSource(index).row()]
+        r = self.model.label_rows.get(label)
+        c = self.model.state_columns.get(state)
+        if r is not None and c is not None:
+            cell = self.model.index(r, c)
+            self.table.setCurrentIndex(cell)
+            self.table.scrollTo(cell)
 
-        widget = self.table.cellWidget(r, c)
-        if widget:
-            widget.setStyleSheet("background-color: #ff9999;")
-            self._highlighted = (r, c)
+    def set_breakpoints(self, breakpoints):
+        self.model.breakpoints = breakpoints
+        self.model.breakpoints_changed()
+
+    def toggle_transition_breakpoint(self):
+        # Точка останова на правиле в текущей ячейке; возвращает (состояние, символ)
+        index = self.table.currentIndex()
+        breakpoints = self.model.breakpoints
+        if breakpoints is None or not index.isValid():
+            return None
+        key = (self.model.states[index.column()], self.model.labels[index.row()])
+        if key in breakpoints.transitions:
+            breakpoints.transitions.discard(key)
+        else:
+            breakpoints.add_transition(*key)
+        self.model.breakpoints_changed()
+        return key
+
+    def toggle_state_breakpoint(self):
+        index = self.table.currentIndex()
+        breakpoints = self.model.breakpoints
+        if breakpoints is None or not index.isValid():
+            return None
+        state = self.model.states[index.column()]
+        if state in breakpoints.states:
+            breakpoints.states.discard(state)
+        else:
+            breakpoints.add_state(state)
+        self.model.breakpoints_changed()
+        return state
@@ -0,0 +1,114 @@
+import threading
+import time
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from core.checkpoint import save_checkpoint
+from core.engine import ChunkedRun
+
+
+# Исполнение машины до завершения в рабочем потоке. Шаги выполняются
+# порциями скомпилированного движка; размер порции подбирается так, чтобы
+# порция занимала около CHUNK_SECONDS, и между порциями проверяются пауза и отмена.
+# Лента машины не изменяется до ChunkedRun.finish(), который вызывает GUI-поток.
+# Срабатывание точки останова завершает работу так же, как остановка машины.
+# Исключение внутри порции тоже завершает работу: текст ошибки остаётся в
+# error, finished отправляется в любом случае.
+# Контрольные точки тоже пишет рабочий поток: периодически, если задан
+# checkpoint_path, и по request_checkpoint(), в том числе во время паузы.
+class RunWorker(QObject):
+    progress = Signal(object, float, object, object)
+    checkpointed = Signal(str, object)
+    checkpoint_failed = Signal(str)
+    finished = Signal()
+
+    CHUNK_SECONDS = 0.05
+    REPORT_SECONDS = 0.25
+    CHECKPOINT_SECONDS = 5.0
+    POLL_SECONDS = 0.1
+    MIN_CHUNK = 1000
+
+    def __init__(self, run: ChunkedRun, checkpoint_path: str = None):
+        super().__init__()
+        self.run_state = run
+        self.checkpoint_path = checkpoint_path
+        self.cancelled = False
+        self.error = None
+        self._cancel = threading.Event()
+        self._resume = threading.Event()
+        self._resume.set()
+        self._checkpoint = threading.Event()
+        self._requested_path = None
+        self._last_checkpoint = time.perf_counter()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resume.is_set()
+
+    def pause(self):
+        self._resume.clear()
+
+    def resume(self):
+        self._resume.set()
+
+    def cancel(self):
+        self._cancel.set()
+        self._resume.set()
+
+    def request_checkpoint(self, path: str):
+        self._requested_path = path
+        self._checkpoint.set()
+
+    def _save_checkpoint(self, periodic: bool):
+        if self._checkpoint.is_set():
+            self._checkpoint.clear()
+            path = self._requested_path
+        elif periodic and self.checkpoint_path is not None:
+            if time.perf_counter() - self._last_checkpoint < self.CHECKPOINT_SECONDS:
+                return
+            path = self.checkpoint_path
+        else:
+            return
+        run = self.run_state
+        try:
+            save_checkpoint(path, run.machine, run)
+        except Exception as e:
+            # Не только ввод-вывод: ошибка сериализации не должна обрывать выполнение
+            self.checkpoint_failed.emit(str(e))
+        else:
+            self.checkpointed.emit(path, run.steps)
+        self._last_checkpoint = time.perf_counter()
+
+    @Slot()
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self.error = str(e) or type(e).__name__
+        finally:
+            self.finished.emit()
+
+    def _run(self):
+        run = self.run_state
+        chunk = self.MIN_CHUNK
+        last_time = time.perf_counter()
+        last_steps = run.steps
+        while True:
+            while not self._resume.wait(self.POLL_SECONDS):
+                self._save_checkpoint(periodic=False)
+            if self._cancel.is_set():
+                self.cancelled = True
+                break
+            started = time.perf_counter()
+            if run.advance(chunk) or run.hit is not None:
+                break
+            self._save_checkpoint(periodic=True)
+            now = time.perf_counter()
+            if now - started < self.CHUNK_SECONDS / 2:
+                chunk *= 2
+            elif now - started > self.CHUNK_SECONDS * 2:
+                chunk = max(chunk // 2, self.MIN_CHUNK)
+            if now - last_time >= self.REPORT_SECONDS:
+                lo, hi = run.extent()
+                self.progress.emit(run.steps, (run.steps - last_steps) / (now - last_time), lo, hi)
+                last_time, last_steps = now, run.steps
@@ -0,0 +1,51 @@
+import unittest
+from itertools import product
+
+from core.batch import BatchSimulator, np
+from tests.test_engine import INCREMENT, RUNAWAY, BOUNCE, UNARY_ADD, make_machine
+
+
+def reference(table, input_str, max_steps):
+    tm = make_machine(table, input_str, max_steps)
+    tm.run()
+    return {
+        "input": input_str,
+        "state": tm.current_state,
+        "tape": tm.get_tape_output(),
+        "head": tm.tape.head,
+        "steps": tm.steps_done,
+        "error": tm.error_message if tm.error_occurred else None
+    }
+
+
+@unittest.skipUnless(np is not None, "NumPy не установлен")
+class TestBatchSimulator(unittest.TestCase):
+    def assertSameAsInterpreter(self, table, inputs, max_steps=1000):
+        results = BatchSimulator('Q0', {'Qa'}, table, '_', max_steps).run(inputs)
+        self.assertEqual(results, [reference(table, s, max_steps) for s in inputs])
+        return results
+
+    def test_all_short_binary_inputs(self):
+        inputs = ["".join(p) for n in range(7) for p in product("01", repeat=n)]
+        results = self.assertSameAsInterpreter(INCREMENT, inputs)
+        self.assertTrue(all(r["error"] is None for r in results))
+
+    def test_mixed_halting_times(self):
+        inputs = ["1" * a + "0" + "1" * b for a in range(6) for b in range(6)]
+        self.assertSameAsInterpreter(UNARY_ADD, inputs + ["", "0", "x"])
+
+    def test_missing_rules_and_unknown_symbols(self):
+        self.assertSameAsInterpreter(BOUNCE, ["a", "b", "ab", "c", ""])
+        self.assertSameAsInterpreter(INCREMENT, ["10x1", "x", "1"])
+
+    def test_step_limit_with_tape_growth(self):
+        results = self.assertSameAsInterpreter(RUNAWAY, ["", "1", "_"], max_steps=500)
+        self.assertEqual(results[0]["tape"], "1" * 500)
+
+    def test_zero_step_limit_and_empty_batch(self):
+        self.assertSameAsInterpreter(INCREMENT, ["1"], max_steps=0)
+        self.assertEqual(BatchSimulator('Q0', {'Qa'}, INCREMENT).run([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+from core.bench import BENCHMARKS, compare, main, run_suite
+
+
+def quick_suite(**kwargs):
+    return run_suite(scale=0.01, min_time=0, tape_ops=300, **kwargs)
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_engines_agree(self):
+        results = quick_suite(memory=False)
+        self.assertEqual(results["mismatches"], [])
+        names = {case["machine"] for case in results["cases"]}
+        self.assertEqual(names, {benchmark.name for benchmark in BENCHMARKS})
+        for case in results["cases"]:
+            self.assertGreater(case["steps_per_sec"], 0)
+        bits = [case["machine"] for case in results["cases"] if case["backend"] == "bits"]
+        self.assertNotIn("increment", bits)
+
+    def test_busy_beaver_4(self):
+        results = quick_suite(machines=["busy_beaver_4"], engines=["interpreter"], backends=["dict"])
+        case, = results["cases"]
+        self.assertEqual((case["steps"], case["halted"]), (107, True))
+        self.assertGreater(case["peak_bytes"], 0)
+        self.assertEqual(set(results["tape_ops"]["dict"]), {"read", "write", "move", "load", "image"})
+
+    def test_compare(self):
+        baseline = {
+            "cases": [{
+                "machine": "sweep", "engine": "macro", "backend": "dict",
+                "steps_per_sec": 1000.0, "peak_bytes": 100
+            }],
+            "tape_ops": {"dict": {"read": 100.0, "write": 100.0}}
+        }
+        results = json.loads(json.dumps(baseline))
+        results["cases"][0].update(steps_per_sec=950.0, peak_bytes=200)
+        results["tape_ops"]["dict"].update(read=50.0, write=125.0)
+        regressions = compare(results, baseline, threshold=10)
+        self.assertEqual(
+            [r["metric"] for r in regressions],
+            ["sweep/macro/dict:peak_bytes", "tape/dict/write:ns"]
+        )
+        self.assertEqual(regressions[1]["change"], 25.0)
+        self.assertEqual(len(compare(results, baseline, threshold=3)), 3)
+
+    def test_command_line_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "results.json")
+            args = [
+                "-o", output, "--machines", "busy_beaver_4", "--engines", "compiled",
+                "--backends", "array", "--min-time", "0", "--no-memory"
+            ]
+            with redirect_stderr(io.StringIO()):
+                self.assertEqual(main(args), 0)
+            with open(output, encoding="utf-8") as f:
+                results = json.load(f)
+            results["cases"][0]["steps_per_sec"] *= 1000
+            baseline = os.path.join(tmp, "baseline.json")
+            with open(baseline, "w", encoding="utf-8") as f:
+                json.dump(results, f)
+
+            log = io.StringIO()
+            with redirect_stderr(log):
+                self.assertEqual(main(args + ["--baseline", baseline]), 1)
+            self.assertIn("busy_beaver_4/compiled/array:steps_per_sec", log.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
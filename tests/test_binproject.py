@@ -0,0 +1,159 @@
+import io
+import os
+import tempfile
+import unittest
+
+from core.binproject import (
+    GAP, MAGIC, BinaryFormatError, content_segments, iter_sections, read_binary, segments_content,
+    tape_segments, write_binary
+)
+from core.project import ProjectError, load_project, save_project
+from core.tape import TuringTape, ArrayTape, BitTape, RleTape, Direction
+from tests.test_engine import INCREMENT
+from tests.test_multitape import PALINDROME
+
+R, L, S = Direction.RIGHT, Direction.LEFT, Direction.STAY
+
+
+def make_project(tapes, transitions=INCREMENT, tape_count=1):
+    return {
+        "alphabet": ["0", "1"],
+        "segments": [content_segments(content, origin) for origin, content, _ in tapes],
+        "heads": [head for _, _, head in tapes],
+        "tape_count": tape_count,
+        "transitions": transitions,
+        "notes": {"task": "Инкремент", "comments": ""}
+    }
+
+
+class TestBinaryFormat(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def round_trip(self, project, suffix):
+        path = os.path.join(self.tmp.name, "project" + suffix)
+        save_project(path, project)
+        return load_project(path)
+
+    def assertSameProject(self, loaded, project):
+        for key in ("alphabet", "segments", "heads", "tape_count", "transitions", "notes"):
+            self.assertEqual(loaded[key], project[key], key)
+
+    def test_round_trip_keeps_head_and_origin(self):
+        content = "1" + "_" * (GAP + 5) + "01" + "_" * 3 + "1"
+        project = make_project([(-7, content, -20)])
+        for suffix in (".tmb", ".json"):
+            with self.subTest(suffix=suffix):
+                self.assertSameProject(self.round_trip(project, suffix), project)
+
+    def test_json_and_binary_are_interchangeable(self):
+        project = make_project([(3, "1101", 5)])
+        from_json = self.round_trip(project, ".json")
+        from_binary = self.round_trip(from_json, ".tmb")
+        self.assertSameProject(from_binary, project)
+        self.assertEqual(from_binary["tape"], "1101")
+
+    def test_multitape(self):
+        project = make_project([(0, "abba", 0), (0, "", 0)], PALINDROME, tape_count=2)
+        project["alphabet"] = ["a", "b"]
+        self.assertSameProject(self.round_trip(project, ".tmb"), project)
+
+    def test_large_tape_is_compressed(self):
+        content = "1" * 10 ** 6 + "_" * 10 ** 6 + "01" * 1000
+        project = make_project([(-10 ** 6, content, 5)])
+        path = os.path.join(self.tmp.name, "big.tmb")
+        save_project(path, project)
+        self.assertLess(os.path.getsize(path), 20000)
+        self.assertSameProject(load_project(path), project)
+
+    def test_many_symbols(self):
+        symbols = [chr(0x400 + i) for i in range(300)]
+        f = io.BytesIO()
+        write_binary(f, symbols, [([(0, "".join(symbols))], 2)], {}, {})
+        f.seek(0)
+        data = read_binary(f)
+        self.assertEqual(data["alphabet"], symbols)
+        self.assertEqual(data["tapes"], [([(0, "".join(symbols))], 2)])
+
+    def test_sections_are_streamed(self):
+        f = io.BytesIO()
+        write_binary(f, ["0", "1"], [([(0, "1")], 0)], INCREMENT, {})
+        f.seek(0)
+        tags = [tag for tag, _ in iter_sections(f)]
+        self.assertEqual(tags, [b"META", b"SYMB", b"ALPH", b"STAT", b"RULE", b"TAPE"])
+
+    def test_unknown_section_is_skipped(self):
+        f = io.BytesIO()
+        write_binary(f, ["0", "1"], [([(0, "1")], 0)], INCREMENT, {})
+        f.write(b"XTRA" + (3).to_bytes(8, "little") + b"abc")
+        f.seek(0)
+        self.assertEqual(read_binary(f)["transitions"], INCREMENT)
+
+    def test_corrupt_files(self):
+        f = io.BytesIO()
+        write_binary(f, ["0", "1"], [([(0, "1011")], 0)], INCREMENT, {})
+        data = f.getvalue()
+        with self.assertRaises(BinaryFormatError):
+            read_binary(io.BytesIO(data[:-2]))
+        with self.assertRaises(BinaryFormatError):
+            read_binary(io.BytesIO(b"XXXXXX" + data[len(MAGIC):]))
+        path = os.path.join(self.tmp.name, "broken.tmb")
+        with open(path, "wb") as out:
+            out.write(data[:40])
+        with self.assertRaises(ProjectError):
+            load_project(path)
+
+    def test_sparse_tape_is_not_expanded(self):
+        for tape_class in (TuringTape, ArrayTape, BitTape, RleTape):
+            with self.subTest(tape=tape_class.__name__):
+                tape = tape_class("1", "_")
+                tape.set_symbol(10 ** 9, "1")
+                tape.set_symbol(-10 ** 9, "0")
+                segments = tape_segments(tape)
+                self.assertEqual(segments, [(-10 ** 9, "0"), (0, "1"), (10 ** 9, "1")])
+                f = io.BytesIO()
+                write_binary(f, ["0", "1"], [(segments, 7)], {}, {})
+                self.assertLess(len(f.getvalue()), 1000)
+                f.seek(0)
+                (loaded, head), = read_binary(f)["tapes"]
+                self.assertEqual((loaded, head), (segments, 7))
+                tape.load_segments(loaded, head)
+                self.assertEqual(tape.items(), [(-10 ** 9, "0"), (0, "1"), (10 ** 9, "1")])
+                self.assertEqual(tape.head, 7)
+
+
+class TestTapeImage(unittest.TestCase):
+    def test_load_and_image(self):
+        for tape_class in (TuringTape, ArrayTape, BitTape, RleTape):
+            with self.subTest(tape=tape_class.__name__):
+                tape = tape_class("", "_")
+                tape.load("1__1", -5, 3)
+                self.assertEqual(tape.image(), (-5, "1__1"))
+                self.assertEqual(tape.items(), [(-5, "1"), (-2, "1")])
+                self.assertEqual(tape.head, 3)
+                tape.load("__1_", 2)
+                self.assertEqual(tape.image(), (4, "1"))
+                tape.reset("")
+                self.assertEqual(tape.image(), (0, ""))
+
+    def test_segments(self):
+        content = "11" + "_" * (GAP - 1) + "0" + "_" * GAP + "1_1" + "_" * 3
+        segments = content_segments(content, -4)
+        self.assertEqual(segments, [(-4, "11" + "_" * (GAP - 1) + "0"), (-4 + GAP + 2 + GAP, "1_1")])
+        self.assertEqual(segments_content(segments), (-4, content.rstrip("_")))
+        for tape_class in (TuringTape, ArrayTape, RleTape):
+            with self.subTest(tape=tape_class.__name__):
+                tape = tape_class("", "_")
+                tape.load_segments(segments, 3)
+                self.assertEqual(tape.image(), (-4, content.rstrip("_")))
+                self.assertEqual(tape.head, 3)
+                # Куски чтения режут отрезки, но склеиваются обратно
+                for chunk in (1, 5, 64):
+                    self.assertEqual(tape_segments(tape, chunk), segments)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+from core.breakpoints import Breakpoints, BREAK_STATE, BREAK_TRANSITION, BREAK_HEAD, BREAK_STEP, BREAK_CELL
+from tests.test_engine import INCREMENT, UNARY_ADD, ERASE_AND_ESCAPE, BOUNCE, make_machine
+
+ENGINES = ("interpreter", "compiled", "macro", "codegen")
+
+
+def collect_hits(tm, limit=100):
+    # Последовательность остановов при повторных вызовах run()
+    hits = []
+    for _ in range(limit):
+        tm.run()
+        if tm.break_hit is None:
+            break
+        hits.append((tm.break_hit, tm.steps_done, tm.current_state, tm.tape.head, str(tm.tape)))
+    return hits
+
+
+class TestBreakpoints(unittest.TestCase):
+    def run_all(self, table, input_str, setup, max_steps=10 ** 4):
+        results = []
+        for engine in ENGINES:
+            tm = make_machine(table, input_str, max_steps, engine=engine)
+            setup(tm.breakpoints)
+            hits = collect_hits(tm)
+            results.append((hits, tm.steps_done, tm.current_state, str(tm.tape), tm.error_message))
+        for engine, result in zip(ENGINES[1:], results[1:]):
+            with self.subTest(engine=engine):
+                self.assertEqual(result, results[0])
+        return results[0]
+
+    def test_state_entry(self):
+        hits, steps, state, tape, _ = self.run_all(INCREMENT, '1011', lambda bp: bp.add_state('Q1'))
+        self.assertEqual([(h[0], h[1]) for h in hits], [((BREAK_STATE, 'Q1'), 5)])
+        self.assertEqual((state, tape), ('Qa', '1100'))
+
+    def test_transition(self):
+        hits, *_ = self.run_all(INCREMENT, '0111', lambda bp: bp.add_transition('Q1', '1'))
+        self.assertEqual([h[1] for h in hits], [5, 6, 7])
+        self.assertTrue(all(h[0] == (BREAK_TRANSITION, 'Q1', '1') for h in hits))
+
+    def test_transition_at_start(self):
+        hits, *_ = self.run_all(INCREMENT, '1', lambda bp: bp.add_transition('Q0', '1'))
+        self.assertEqual([h[1] for h in hits], [0])
+
+    def test_transition_without_rule(self):
+        # Останов на переходе без правила, затем ошибка при продолжении
+        table = {key: rule for key, rule in INCREMENT.items() if key != ('Q1', '_')}
+        hits, steps, state, tape, error = self.run_all(table, '11', lambda bp: bp.add_transition('Q1', '_'))
+        self.assertEqual([(h[0], h[1]) for h in hits], [((BREAK_TRANSITION, 'Q1', '_'), 5)])
+        self.assertEqual((steps, state, tape), (5, 'Q1', '00'))
+        self.assertTrue(error)
+
+    def test_step(self):
+        hits, *_ = self.run_all(UNARY_ADD, '1' * 50 + '0' + '1' * 50, lambda bp: (bp.add_step(7), bp.add_step(60)))
+        self.assertEqual([h[0] for h in hits], [(BREAK_STEP, 7), (BREAK_STEP, 60)])
+
+    def test_head_range(self):
+        hits, *_ = self.run_all(UNARY_ADD, '1' * 30 + '0' + '1' * 30, lambda bp: bp.add_head_range(10, 12))
+        self.assertEqual([(h[1], h[3]) for h in hits], [(10, 10), (110, 12)])
+
+    def test_cell(self):
+        hits, *_ = self.run_all(BOUNCE, 'a', lambda bp: bp.add_cell(-1, 'a'))
+        self.assertEqual([h[0] for h in hits], [(BREAK_CELL, -1, 'a')])
+
+    def test_escape_into_blank(self):
+        def setup(bp):
+            bp.add_head_range(-1000, -1000)
+            bp.add_step(5000)
+        hits, steps, *_ = self.run_all(ERASE_AND_ESCAPE, 'aaa', setup, max_steps=10 ** 6)
+        self.assertEqual([(h[0], h[3]) for h in hits], [((BREAK_HEAD, -1000, -1000), -1000), ((BREAK_STEP, 5000), -4994)])
+        self.assertEqual(steps, 10 ** 6)
+
+    def test_mixed(self):
+        def setup(bp):
+            bp.add_state('Q3')
+            bp.add_transition('Q1', '1')
+            bp.add_head_range(-3, 2)
+            bp.add_step(3)
+            bp.add_cell(5, '_')
+        self.run_all(UNARY_ADD, '11101', setup)
+
+    def test_add_head_range_validates(self):
+        with self.assertRaises(ValueError):
+            Breakpoints().add_head_range(3, 2)
+
+    def test_no_breakpoints(self):
+        tm = make_machine(INCREMENT, '11', engine="macro")
+        self.assertFalse(tm.breakpoints)
+        tm.run()
+        self.assertIsNone(tm.break_hit)
+        self.assertEqual(str(tm.tape), '100')
+
+
+    def test_chunked_run_ignores_later_edits(self):
+        from core.engine import ChunkedRun
+        tm = make_machine(UNARY_ADD, '1' * 30 + '0' + '1' * 30, 10 ** 4, engine="macro")
+        tm.breakpoints.add_step(5)
+        run = ChunkedRun(tm, macro=True)
+        tm.breakpoints.add_cell(40, '_')
+        tm.breakpoints.add_state('Q3')
+        tm.breakpoints.steps.clear()
+        self.assertFalse(run.advance(10 ** 4))
+        self.assertEqual((run.hit, run.steps), ((BREAK_STEP, 5), 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+from core.checkpoint import load_checkpoint, main, run_with_checkpoints, save_checkpoint
+from core.engine import ChunkedRun
+from core.project import save_project
+from core.tape import Direction
+from tests.test_engine import make_machine, configuration
+from tests.test_multitape import make_machine as make_multitape
+
+R, L, S = Direction.RIGHT, Direction.LEFT, Direction.STAY
+
+# Двоичный счётчик, растущий влево: число шагов до переполнения растёт быстрее длины ленты
+COUNTER = {
+    ('Q0', '1'): ('0', R, 'Q0'),
+    ('Q0', '0'): ('1', L, 'Q1'),
+    ('Q0', '_'): ('1', L, 'Q1'),
+    ('Q1', '0'): ('0', L, 'Q1'),
+    ('Q1', '1'): ('1', L, 'Q1'),
+    ('Q1', '_'): ('_', R, 'Q0'),
+}
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.ckpt")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resume_from_chunked_run(self):
+        for engine in ("compiled", "macro"):
+            with self.subTest(engine=engine):
+                reference = make_machine(COUNTER, "", 50000, engine=engine)
+                reference.run()
+
+                tm = make_machine(COUNTER, "", 50000, engine=engine)
+                run = ChunkedRun(tm, macro=engine == "macro")
+                run.advance(12345)
+                save_checkpoint(self.path, tm, run)
+                self.assertEqual(tm.steps_done, 0)
+
+                resumed = load_checkpoint(self.path)
+                self.assertEqual((resumed.steps_done, resumed.engine), (12345, engine))
+                resumed.run()
+                self.assertEqual(configuration(resumed), configuration(reference))
+
+    def test_resume_interpreter(self):
+        reference = make_machine(COUNTER, "1", 3000)
+        reference.run()
+        tm = make_machine(COUNTER, "1", 3000)
+        for _ in range(777):
+            tm.step()
+        save_checkpoint(self.path, tm)
+        resumed = load_checkpoint(self.path)
+        resumed.run()
+        self.assertEqual(configuration(resumed), configuration(reference))
+
+    def test_halted_machine_round_trip(self):
+        tm = make_machine(COUNTER, "", 100)
+        tm.run()
+        save_checkpoint(self.path, tm)
+        resumed = load_checkpoint(self.path)
+        self.assertEqual(configuration(resumed), configuration(tm))
+        extended = load_checkpoint(self.path, max_steps=200)
+        self.assertFalse(extended.is_halted)
+        extended.run()
+        self.assertEqual(extended.steps_done, 200)
+
+    def test_multitape(self):
+        reference = make_multitape("0110")
+        reference.run()
+        tm = make_multitape("0110")
+        for _ in range(6):
+            tm.step()
+        save_checkpoint(self.path, tm)
+        resumed = load_checkpoint(self.path)
+        resumed.run()
+        self.assertEqual(resumed.get_tape_outputs(), reference.get_tape_outputs())
+        self.assertEqual((resumed.current_state, resumed.steps_done), (reference.current_state, reference.steps_done))
+
+    def test_multitape_step_limit_lifted(self):
+        reference = make_multitape("0110")
+        reference.run()
+        tm = make_multitape("0110", max_steps=6)
+        tm.run()
+        self.assertTrue(tm.error_occurred)
+        save_checkpoint(self.path, tm)
+        resumed = load_checkpoint(self.path, max_steps=1000)
+        self.assertFalse(resumed.is_halted)
+        resumed.run()
+        self.assertEqual(resumed.get_tape_outputs(), reference.get_tape_outputs())
+        self.assertEqual(resumed.steps_done, reference.steps_done)
+
+    def test_periodic_checkpoints(self):
+        tm = make_machine(COUNTER, "", 10 ** 5, engine="macro")
+        run_with_checkpoints(tm, self.path, every=0)
+        final = load_checkpoint(self.path)
+        self.assertEqual(configuration(final), configuration(tm))
+
+    def test_failed_write_keeps_previous_checkpoint(self):
+        tm = make_machine(COUNTER, "", 100)
+        save_checkpoint(self.path, tm)
+        with open(self.path, "rb") as f:
+            before = f.read()
+        tm.transition_table = {('Q0', '_'): ('1', "вправо", 'Q0')}
+        with self.assertRaises(KeyError):
+            save_checkpoint(self.path, tm)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(os.listdir(self.tmp.name), ["run.ckpt"])
+
+    def test_command_line_resume(self):
+        project = os.path.join(self.tmp.name, "counter.json")
+        save_project(project, {
+            "alphabet": ["0", "1"], "segments": [[]], "tape_count": 1,
+            "transitions": COUNTER, "notes": {}
+        })
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(main([project, "-c", self.path, "--max-steps", "1000", "--every", "0"]), 0)
+            self.assertEqual(main(["--resume", self.path, "--max-steps", "5000"]), 0)
+        first, second = (json.loads(line) for line in out.getvalue().splitlines())
+        self.assertEqual((first["steps"], second["steps"]), (1000, 5000))
+
+        reference = make_machine(COUNTER, "", 5000, engine="macro")
+        reference.run()
+        self.assertEqual(second["tape"], str(reference.tape))
+
+    def test_interrupt_before_first_checkpoint(self):
+        project = os.path.join(self.tmp.name, "counter.json")
+        save_project(project, {
+            "alphabet": ["0", "1"], "segments": [[]], "tape_count": 1,
+            "transitions": COUNTER, "notes": {}
+        })
+        err = io.StringIO()
+        with mock.patch("core.checkpoint.run_with_checkpoints", side_effect=KeyboardInterrupt), redirect_stderr(err):
+            self.assertEqual(main([project, "-c", self.path]), 130)
+        self.assertNotIn(self.path, err.getvalue())
+
+        tm = make_machine(COUNTER, "", 100)
+        save_checkpoint(self.path, tm)
+        err = io.StringIO()
+        with mock.patch("core.checkpoint.run_with_checkpoints", side_effect=KeyboardInterrupt), redirect_stderr(err):
+            self.assertEqual(main([project, "-c", self.path]), 130)
+            self.assertEqual(main(["--resume", self.path]), 130)
+        first, second = err.getvalue().splitlines()
+        self.assertNotIn(self.path, first)
+        self.assertIn(self.path, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
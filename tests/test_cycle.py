@@ -0,0 +1,59 @@
+import unittest
+from core.tape import TuringTape, Direction
+from core.machine import TuringMachine
+from tests.test_engine import INCREMENT, RUNAWAY
+
+R, L, S = Direction.RIGHT, Direction.LEFT, Direction.STAY
+
+# Ходит между двумя ячейками, перекрашивая их: период 4
+PING_PONG = {
+    ('Q0', 'a'): ('b', R, 'Q1'),
+    ('Q0', 'b'): ('a', R, 'Q1'),
+    ('Q1', 'a'): ('b', L, 'Q0'),
+    ('Q1', 'b'): ('a', L, 'Q0'),
+}
+
+
+def make_machine(table, input_str, max_steps=10 ** 6, **kwargs):
+    return TuringMachine('Q0', {'Qa'}, table, TuringTape(input_str, '_'), {'a', 'b', '0', '1', '_'},
+                         max_steps=max_steps, detect_cycles=True, **kwargs)
+
+
+class TestCycleDetection(unittest.TestCase):
+    def test_cycle_is_detected_early(self):
+        tm = make_machine(PING_PONG, 'ab')
+        tm.run()
+        self.assertTrue(tm.error_occurred)
+        self.assertIsNotNone(tm.cycle)
+        step, period = tm.cycle
+        self.assertEqual(period % 4, 0)
+        self.assertLess(step, 100)
+        self.assertIn(f"шаге {step}", tm.error_message)
+
+    def test_stay_loop(self):
+        tm = make_machine({('Q0', '_'): ('_', S, 'Q0')}, '', engine="compiled")
+        tm.run()
+        self.assertEqual(tm.cycle[1], 1)
+
+    def test_halting_machine_is_not_reported(self):
+        tm = make_machine(INCREMENT, '10111')
+        tm.run()
+        self.assertFalse(tm.error_occurred)
+        self.assertIsNone(tm.cycle)
+
+    def test_growing_tape_runs_to_limit(self):
+        tm = make_machine(RUNAWAY, '', max_steps=2000)
+        tm.run()
+        self.assertIsNone(tm.cycle)
+        self.assertEqual(tm.steps_done, 2000)
+
+    def test_hash_matches_recomputation(self):
+        from core.cycle import CycleDetector
+        tm = make_machine(INCREMENT, '1011')
+        for _ in range(5):
+            tm.step()
+            self.assertEqual(tm.cycles.hash, CycleDetector(tm).hash)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+import unittest
+from core.bench import INCREMENT, UNARY_ADD
+from core.tape import TuringTape, RleTape, Direction
+from core.machine import TuringMachine
+from core.engine import ChunkedRun, compile_machine, generate_source, generated_executor
+
+R, L, S = Direction.RIGHT, Direction.LEFT, Direction.STAY
+
+# Бесконечно пишет единицы вправо
+RUNAWAY = {
+    ('Q0', '_'): ('1', R, 'Q0'),
+}
+
+# Бегает влево-вправо, пока не упрётся в символ без правила
+BOUNCE = {
+    ('Q0', 'a'): ('b', L, 'Q1'),
+    ('Q1', '_'): ('a', R, 'Q0'),
+    ('Q0', 'b'): ('c', R, 'Q0'),
+}
+
+
+def make_machine(table, input_str, max_steps=1000, engine="interpreter", tape_class=TuringTape):
+    return TuringMachine(
+        initial_state='Q0',
+        final_states={'Qa'},
+        transition_table=table,
+        tape=tape_class(input_str, '_'),
+        alphabet={'0', '1', 'a', 'b', 'c', '_'},
+        max_steps=max_steps,
+        engine=engine
+    )
+
+
+def configuration(tm):
+    return (
+        tm.current_state, tm.tape.head, str(tm.tape), tm.tape.items(),
+        tm.steps_done, tm.is_halted, tm.error_occurred, tm.error_message
+    )
+
+
+class TestCompiledEngine(unittest.TestCase):
+    engine = "compiled"
+    tape_class = TuringTape
+
+    def assertSameAsInterpreter(self, table, input_str, max_steps=1000):
+        reference = make_machine(table, input_str, max_steps)
+        reference.run()
+        fast = make_machine(table, input_str, max_steps, engine=self.engine, tape_class=self.tape_class)
+        fast.run()
+        self.assertEqual(configuration(fast), configuration(reference))
+        return fast
+
+    def test_increment(self):
+        for input_str in ['', '0', '1', '1011', '1111', '100111']:
+            tm = self.assertSameAsInterpreter(INCREMENT, input_str)
+            self.assertFalse(tm.error_occurred)
+
+    def test_step_limit(self):
+        tm = self.assertSameAsInterpreter(RUNAWAY, '', max_steps=500)
+        self.assertTrue(tm.error_occurred)
+        self.assertEqual(tm.steps_done, 500)
+        self.assertEqual(str(tm.tape), '1' * 500)
+
+    def test_missing_rule(self):
+        tm = self.assertSameAsInterpreter(BOUNCE, 'a')
+        self.assertIn("'Q0'", tm.error_message)
+
+    def test_unknown_tape_symbol(self):
+        tm = self.assertSameAsInterpreter(INCREMENT, '10x1')
+        self.assertIn("'x'", tm.error_message)
+
+    def test_resume_after_steps(self):
+        reference = make_machine(INCREMENT, '1011')
+        reference.run()
+        tm = make_machine(INCREMENT, '1011')
+        for _ in range(3):
+            tm.step()
+        tm.run_fast()
+        self.assertEqual(configuration(tm)[:3], configuration(reference)[:3])
+        self.assertEqual(tm.steps_done, reference.steps_done)
+
+    def test_growth_to_the_left(self):
+        table = {('Q0', '_'): ('1', L, 'Q0')}
+        tm = self.assertSameAsInterpreter(table, '', max_steps=300)
+        self.assertEqual(tm.tape.head, -300)
+
+
+    def test_tape_backends(self):
+        for input_str in ['1011', '1111']:
+            reference = make_machine(INCREMENT, input_str)
+            reference.run()
+            for engine in ("interpreter", self.engine):
+                tm = TuringMachine.from_input(
+                    'Q0', {'Qa'}, INCREMENT, input_str, {'0', '1'}, engine=engine
+                )
+                tm.run()
+                self.assertIsNot(type(tm.tape), TuringTape)
+                self.assertEqual(configuration(tm), configuration(reference))
+
+
+# Проход вправо, стирающий проход влево и бесконечный уход влево по пустой ленте
+ERASE_AND_ESCAPE = {
+    ('Q0', 'a'): ('a', R, 'Q0'),
+    ('Q0', '_'): ('_', L, 'Q1'),
+    ('Q1', 'a'): ('_', L, 'Q1'),
+    ('Q1', '_'): ('_', L, 'Q2'),
+    ('Q2', '_'): ('_', L, 'Q2'),
+}
+
+
+class TestMacroEngine(TestCompiledEngine):
+    engine = "macro"
+
+    def test_unary_addition(self):
+        for a, b in [(0, 0), (1, 0), (3, 4), (70, 200)]:
+            tm = self.assertSameAsInterpreter(UNARY_ADD, '1' * a + '0' + '1' * b, max_steps=10 ** 4)
+            self.assertEqual(str(tm.tape), '1' * (a + b))
+
+    def test_limit_inside_sweep(self):
+        for max_steps in (1, 50, 99, 100, 101, 150):
+            self.assertSameAsInterpreter(UNARY_ADD, '1' * 100 + '0' + '1' * 100, max_steps=max_steps)
+
+    def test_sweeps_left_and_into_blank(self):
+        for max_steps in (5, 10, 11, 21, 22, 23, 500):
+            self.assertSameAsInterpreter(ERASE_AND_ESCAPE, 'a' * 10, max_steps=max_steps)
+        tm = self.assertSameAsInterpreter(ERASE_AND_ESCAPE, 'a' * 10, max_steps=500)
+        self.assertEqual(tm.tape.head, -480)
+        self.assertEqual(str(tm.tape), '')
+
+    def test_long_sweep_is_fast(self):
+        n = 10 ** 5
+        tm = make_machine(
+            UNARY_ADD, '1' * n + '0' + '1' * n, max_steps=10 ** 7, engine="macro", tape_class=self.tape_class
+        )
+        tm.run()
+        self.assertFalse(tm.error_occurred)
+        self.assertEqual(tm.steps_done, 4 * n + 4)
+
+    def test_short_runs(self):
+        # Серии длиной 1, 2, 3, 8, 9 и лимит шагов внутри каждой из них
+        input_str = '0110111' + '0' * 8 + '1' * 9 + '01'
+        for max_steps in range(1, len(input_str) + 4):
+            self.assertSameAsInterpreter(INCREMENT, input_str, max_steps=max_steps)
+        self.assertSameAsInterpreter(INCREMENT, input_str)
+
+    def test_short_runs_skip_slices(self):
+        # Чередующиеся символы проходятся обычными шагами, без срезов массива
+        import core.engine as engine
+        calls = []
+        run_right = engine._run_right
+        engine._run_right = lambda *args: calls.append(args) or run_right(*args)
+        try:
+            self.assertSameAsInterpreter(INCREMENT, '011' * 200, max_steps=10 ** 4)
+        finally:
+            engine._run_right = run_right
+        self.assertEqual(calls, [])
+
+
+class TestCodegenEngine(TestCompiledEngine):
+    engine = "codegen"
+
+    def test_unary_addition(self):
+        for max_steps in (1, 50, 101, 10 ** 4):
+            self.assertSameAsInterpreter(UNARY_ADD, '1' * 100 + '0' + '1' * 100, max_steps=max_steps)
+        for max_steps in (5, 11, 22, 500):
+            self.assertSameAsInterpreter(ERASE_AND_ESCAPE, 'a' * 10, max_steps=max_steps)
+
+    def test_many_states(self):
+        # Цепочка из 40 состояний: ветка выбирается деревом сравнений
+        table = {(f'Q{i}', '_'): ('1', R if i % 3 else L, f'Q{i + 1}') for i in range(40)}
+        table[('Q40', '1')] = ('_', S, 'Qa')
+        table[('Q40', '_')] = ('1', L, 'Q0')
+        for max_steps in (10, 41, 1000):
+            self.assertSameAsInterpreter(table, '', max_steps=max_steps)
+
+    def test_cached_by_table(self):
+        first, _ = compile_machine(make_machine(UNARY_ADD, '101'))
+        second, _ = compile_machine(make_machine(dict(UNARY_ADD), '1'))
+        self.assertIs(generated_executor(first), generated_executor(second))
+        other, _ = compile_machine(make_machine(INCREMENT, '1'))
+        self.assertIsNot(generated_executor(other), generated_executor(first))
+
+    def test_state_names_stay_in_comments(self):
+        table = {('Q0', '_'): ('1', R, 'Q0\nimport os')}
+        source = generate_source(compile_machine(make_machine(table, ''))[0])
+        self.assertNotIn("\nimport os", source)
+        self.assertSameAsInterpreter(table, '', max_steps=10)
+
+
+class TestChunkedRun(unittest.TestCase):
+    def assertChunksMatch(self, table, input_str, max_steps, chunk, macro=False, codegen=False):
+        reference = make_machine(table, input_str, max_steps, engine="macro" if macro else "interpreter")
+        reference.run()
+        tm = make_machine(table, input_str, max_steps)
+        run = ChunkedRun(tm, macro, codegen)
+        chunks = 0
+        while not run.advance(chunk):
+            chunks += 1
+            self.assertLessEqual(run.steps, chunks * chunk)
+        self.assertEqual(tm.steps_done, 0)
+        run.finish()
+        self.assertEqual(configuration(tm), configuration(reference))
+        return run
+
+    def test_chunks_match_single_run(self):
+        for macro in (False, True):
+            for chunk in (1, 7, 100):
+                self.assertChunksMatch(UNARY_ADD, '1' * 30 + '0' + '1' * 40, 10 ** 4, chunk, macro)
+                self.assertChunksMatch(BOUNCE, 'a', 1000, chunk, macro)
+                self.assertChunksMatch(RUNAWAY, '', 500, chunk, macro)
+                self.assertChunksMatch(ERASE_AND_ESCAPE, 'a' * 10, 500, chunk, macro)
+
+    def test_generated_chunks(self):
+        for chunk in (1, 7, 100):
+            self.assertChunksMatch(UNARY_ADD, '1' * 30 + '0' + '1' * 40, 10 ** 4, chunk, codegen=True)
+            self.assertChunksMatch(BOUNCE, 'a', 1000, chunk, codegen=True)
+            self.assertChunksMatch(RUNAWAY, '', 500, chunk, codegen=True)
+
+    def test_escape_into_blank_between_chunks(self):
+        run = self.assertChunksMatch(ERASE_AND_ESCAPE, 'a' * 10, 10 ** 9, 1000, macro=True)
+        self.assertEqual(run.steps, 10 ** 9)
+
+    def test_extent(self):
+        tm = make_machine(RUNAWAY, '', 100)
+        run = ChunkedRun(tm)
+        lo, hi = run.extent()
+        self.assertGreater(lo, hi)
+        run.advance(40)
+        self.assertEqual(run.extent(), (0, 39))
+
+
+class TestMacroEngineOnBlocks(TestMacroEngine):
+    tape_class = RleTape
+
+    def test_huge_runs(self):
+        n = 10 ** 9
+        tm = make_machine(UNARY_ADD, '', max_steps=10 ** 12, engine="macro", tape_class=RleTape)
+        tm.tape.restore({0: '0'}, -1)
+        tm.tape.fill_run('1', n, Direction.LEFT)
+        tm.tape.head = 1
+        tm.tape.fill_run('1', n, Direction.RIGHT)
+        tm.tape.head = -n
+        tm.run()
+        self.assertFalse(tm.error_occurred)
+        self.assertEqual(tm.steps_done, 4 * n + 4)
+        self.assertEqual(tm.tape.blocks(), [(-n, '1', 2 * n)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from core.deciders import CYCLER, HALT, TRANSLATED_CYCLER, UNDECIDED, decide
+from core.enumeration import (
+    _compile, _read_progress, explore, machine_code, main, parse_code, run_enumeration, split, summarize,
+    transitions
+)
+from core.machine import TuringMachine
+from core.tape import TuringTape
+
+
+def classify(code, max_steps=1000):
+    rules, n, m = parse_code(code)
+    return decide(_compile(rules, n, m), "Q0", max_steps)
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestDeciders(unittest.TestCase):
+    def test_halt(self):
+        self.assertEqual(classify("1RB1LB_1LA---"), {"class": HALT, "steps": 5})
+
+    def test_cycler(self):
+        # Головка ходит между двумя ячейками, ничего не меняя
+        result = classify("1RB1LB_1LA1RA")
+        self.assertEqual(result["class"], CYCLER)
+        self.assertGreater(result["period"], 0)
+
+    def test_translated_cycler(self):
+        # Пишет 1 и уходит вправо по пустой ленте
+        result = classify("1RA---")
+        self.assertEqual(result["class"], TRANSLATED_CYCLER)
+        self.assertEqual((result["period"], result["shift"]), (1, 1))
+
+        # Отходит назад на две ячейки на каждом шаге влево
+        result = classify("1LB0RA_1LA---")
+        self.assertEqual(result["class"], TRANSLATED_CYCLER)
+        self.assertLess(result["shift"], 0)
+
+    def test_undecided(self):
+        # Бинарный счётчик не повторяется и не ограничен
+        self.assertEqual(classify("0RB0LA_1LA1RB_------", 300)["class"], UNDECIDED)
+
+
+class TestEnumeration(unittest.TestCase):
+    def test_codes(self):
+        code = "1RB1LB_1LA---"
+        rules, n, m = parse_code(code)
+        self.assertEqual((n, m), (2, 2))
+        self.assertEqual(machine_code(rules, n, m), code)
+        with self.assertRaises(ValueError):
+            parse_code("1XB1LB_1LA---")
+
+    def test_transitions_run_in_machine(self):
+        rules, n, m = parse_code("1RB1LB_1LA---")
+        tm = TuringMachine("Q0", {"Qa"}, transitions(rules, n, m), TuringTape("", "_"), {"_", "1"}, 1000)
+        tm.run()
+        self.assertEqual((tm.steps_done, tm.current_state), (6, "Qa"))
+        self.assertEqual(sum(1 for _, s in tm.tape.items() if s == "1"), 4)
+
+    def test_busy_beavers(self):
+        for n, steps, sigma, max_steps in ((2, 6, 4, 100), (3, 21, 6, 300)):
+            with self.subTest(n=n):
+                records = explore((None,) * (2 * n), n, 2, max_steps)
+                halting = [r for r in records if r["class"] == HALT]
+                self.assertEqual(max(r["steps"] for r in halting), steps)
+                self.assertEqual(max(r["sigma"] for r in halting), sigma)
+                codes = [r["machine"] for r in records]
+                self.assertEqual(len(codes), len(set(codes)))
+
+    def test_pruning(self):
+        records = explore((None,) * 4, 2, 2, 100)
+        self.assertEqual(len(records), 61)
+        for record in records:
+            first = record["machine"][:3]
+            self.assertIn(first[1:], ("--", "RA", "RB"))
+        undecided = [r for r in records if r["class"] == UNDECIDED]
+        self.assertEqual(undecided, [])
+
+    def test_split_covers_tree(self):
+        records = explore((None,) * 6, 3, 2, 300)
+        top, roots = split(3, 2, 300, 20)
+        self.assertGreaterEqual(len(roots), 20)
+        for rules in roots:
+            top.extend(explore(rules, 3, 2, 300))
+        self.assertEqual(sorted(r["machine"] for r in top), sorted(r["machine"] for r in records))
+
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            full = os.path.join(tmp, "full.jsonl")
+            run_enumeration(3, 2, full, 300)
+            expected = sorted(json.dumps(r) for r in read_records(full))
+
+            # Прерванный перебор: часть поддеревьев завершена, хвост файла недописан
+            partial = os.path.join(tmp, "partial.jsonl")
+            run_enumeration(3, 2, partial, 300)
+            with open(partial + ".done", encoding="utf-8") as f:
+                marks = f.readlines()
+            kept = marks[:len(marks) // 2]
+            offset = json.loads(kept[-1])["offset"]
+            with open(partial + ".done", "w", encoding="utf-8") as f:
+                f.writelines(kept)
+                f.write('{"unit": "1R')
+            with open(partial, "r+b") as f:
+                f.truncate(offset + 10)
+
+            run_enumeration(3, 2, partial, 300, resume=True)
+            self.assertEqual(sorted(json.dumps(r) for r in read_records(partial)), expected)
+            # Отметки продолжения записаны вместо недописанной строки
+            self.assertEqual(len(_read_progress(partial + ".done")[0]), len(marks))
+
+    def test_resume_with_other_jobs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "bb3.jsonl")
+            run_enumeration(3, 2, output, 300)
+            expected = sorted(json.dumps(r) for r in read_records(output))
+            with open(output + ".done", encoding="utf-8") as f:
+                marks = f.readlines()
+            kept = marks[:len(marks) // 2]
+            with open(output + ".done", "w", encoding="utf-8") as f:
+                f.writelines(kept)
+            with open(output, "r+b") as f:
+                f.truncate(json.loads(kept[-1])["offset"])
+
+            run_enumeration(3, 2, output, 300, jobs=3, resume=True)
+            self.assertEqual(sorted(json.dumps(r) for r in read_records(output)), expected)
+
+    def test_process_pool(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sequential = os.path.join(tmp, "sequential.jsonl")
+            parallel = os.path.join(tmp, "parallel.jsonl")
+            run_enumeration(3, 2, sequential, 300)
+            run_enumeration(3, 2, parallel, 300, jobs=2)
+            self.assertEqual(
+                sorted(map(json.dumps, read_records(parallel))),
+                sorted(map(json.dumps, read_records(sequential)))
+            )
+
+    def test_command_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "bb2.jsonl")
+            out = io.StringIO()
+            with redirect_stdout(out):
+                self.assertEqual(main(["-n", "2", "-o", output, "--max-steps", "100", "-j", "1"]), 0)
+            summary = json.loads(out.getvalue())
+            self.assertEqual(summary, summarize(output))
+            self.assertEqual(summary["machines"], 61)
+            self.assertEqual(summary["champion"]["steps"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from core.tape import TuringTape, Direction
+from core.machine import TuringMachine
+from core.history import ExecutionHistory
+
+R, L, S = Direction.RIGHT, Direction.LEFT, Direction.STAY
+
+# Счётчик в двоичной записи: бесконечно прибавляет единицу к числу на ленте
+COUNTER = {
+    ('Q0', '0'): ('0', R, 'Q0'),
+    ('Q0', '1'): ('1', R, 'Q0'),
+    ('Q0', '_'): ('_', L, 'Q1'),
+    ('Q1', '1'): ('0', L, 'Q1'),
+    ('Q1', '0'): ('1', S, 'Q0'),
+    ('Q1', '_'): ('1', S, 'Q0'),
+}
+
+
+def make_machine(**kwargs):
+    return TuringMachine('Q0', {'Qa'}, COUNTER, TuringTape('0', '_'), {'0', '1', '_'}, max_steps=10 ** 6, **kwargs)
+
+
+def configuration(tm):
+    return tm.current_state, tm.tape.head, tm.tape.items(), tm.steps_done, tm.is_halted
+
+
+def reference(step):
+    tm = make_machine()
+    for _ in range(step):
+        tm.step()
+    return configuration(tm)
+
+
+class TestReverseStepping(unittest.TestCase):
+    def test_step_back(self):
+        tm = make_machine(history=True)
+        for _ in range(50):
+            tm.step()
+        self.assertEqual(tm.step_back(), 1)
+        self.assertEqual(configuration(tm), reference(49))
+        self.assertEqual(tm.step_back(10), 10)
+        self.assertEqual(configuration(tm), reference(39))
+        self.assertEqual(len(tm.trace), 39)
+        tm.step()
+        self.assertEqual(configuration(tm), reference(40))
+
+    def test_seek_through_checkpoints(self):
+        tm = make_machine(history=True, checkpoint_interval=16)
+        tm.history.undo_limit = 10
+        tm.seek(300)
+        self.assertEqual(configuration(tm), reference(300))
+        for step in (295, 250, 3, 0, 123, 300, 299):
+            tm.seek(step)
+            self.assertEqual(configuration(tm), reference(step))
+        self.assertEqual(tm.step_back(1000), 299)
+
+    def test_checkpoints_are_thinned(self):
+        history = ExecutionHistory(checkpoint_interval=4, max_checkpoints=8)
+        tm = make_machine()
+        tm.history = history
+        history.start(tm)
+        tm.seek(1000)
+        self.assertLessEqual(len(history.checkpoints), 8)
+        self.assertEqual(history.first_step, 0)
+        tm.seek(1)
+        self.assertEqual(configuration(tm), reference(1))
+
+    def test_step_back_clears_error(self):
+        tm = TuringMachine('Q0', {'Qa'}, {('Q0', 'a'): ('b', R, 'Q0')}, TuringTape('aa', '_'), {'a', 'b', '_'},
+                           history=True)
+        tm.run()
+        self.assertTrue(tm.error_occurred)
+        tm.step_back()
+        self.assertFalse(tm.is_halted)
+        self.assertFalse(tm.error_occurred)
+        self.assertEqual(str(tm.tape), 'ba')
+        self.assertEqual(tm.tape.head, 1)
+
+    def test_without_history(self):
+        with self.assertRaises(RuntimeError):
+            make_machine().step_back()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+
+from core.multitape import MultiTapeTuringMachine
+from core.project import ProjectError, build_machine, project_from_json, project_to_json
+from core.tape import Direction, TuringTape
+from core.trace import TRACE_FULL, TRACE_OFF
+
+R, L, S = Direction.RIGHT, Direction.LEFT, Direction.STAY
+
+# Палиндром за O(n): копия входа на вторую ленту, возврат первой головки
+# в начало и сравнение первой ленты слева направо со второй справа налево
+PALINDROME = {
+    ('Q0', ('0', '_')): (('0', '0'), (R, R), 'Q0'),
+    ('Q0', ('1', '_')): (('1', '1'), (R, R), 'Q0'),
+    ('Q0', ('_', '_')): (('_', '_'), (L, L), 'Q1'),
+    ('Q1', ('0', '0')): (('0', '0'), (L, S), 'Q1'),
+    ('Q1', ('0', '1')): (('0', '1'), (L, S), 'Q1'),
+    ('Q1', ('1', '0')): (('1', '0'), (L, S), 'Q1'),
+    ('Q1', ('1', '1')): (('1', '1'), (L, S), 'Q1'),
+    ('Q1', ('_', '0')): (('_', '0'), (R, S), 'Q2'),
+    ('Q1', ('_', '1')): (('_', '1'), (R, S), 'Q2'),
+    ('Q1', ('_', '_')): (('_', '_'), (S, S), 'Qa'),
+    ('Q2', ('0', '0')): (('0', '0'), (R, L), 'Q2'),
+    ('Q2', ('1', '1')): (('1', '1'), (R, L), 'Q2'),
+    ('Q2', ('_', '_')): (('_', '_'), (S, S), 'Qa'),
+}
+
+
+def make_machine(input_str, max_steps=1000):
+    return MultiTapeTuringMachine(
+        initial_state='Q0',
+        final_states={'Qa'},
+        transition_table=PALINDROME,
+        tapes=[TuringTape(input_str), TuringTape()],
+        alphabet={'0', '1', '_'},
+        max_steps=max_steps
+    )
+
+
+class TestMultiTapeMachine(unittest.TestCase):
+    def test_palindromes(self):
+        for input_str, accepted in [("", True), ("0", True), ("0110", True), ("10101", True),
+                                    ("01", False), ("0010", False)]:
+            tm = make_machine(input_str)
+            tm.run()
+            self.assertEqual(not tm.error_occurred, accepted, input_str)
+            self.assertEqual(tm.get_tape_outputs()[1], input_str)
+
+    def test_linear_step_count(self):
+        tm = make_machine("01" * 50 + "10" * 50)
+        tm.run()
+        self.assertEqual(tm.current_state, 'Qa')
+        self.assertEqual(tm.steps_done, 3 * 200 + 3)
+
+    def test_no_rule_message(self):
+        tm = make_machine("01")
+        tm.run()
+        self.assertIn("символов '01'", tm.error_message)
+
+    def test_arity_mismatch(self):
+        with self.assertRaises(ValueError):
+            MultiTapeTuringMachine('Q0', {'Qa'}, PALINDROME, [TuringTape("0")], {'0', '1', '_'})
+
+    def test_project_round_trip(self):
+        data = project_to_json(["0", "1", "_"], ["0110", ""], PALINDROME, {}, tape_count=2)
+        self.assertEqual(data["transitions"]["Q1"]["_0"]["direction"], ["RIGHT", "STAY"])
+        project = project_from_json(data)
+        self.assertEqual(project["tape_count"], 2)
+        self.assertEqual(project["segments"], [[(0, "0110")], []])
+        self.assertEqual(project["transitions"], PALINDROME)
+
+        tm = build_machine(project, "0110")
+        self.assertIsInstance(tm, MultiTapeTuringMachine)
+        tm.run()
+        self.assertEqual(tm.current_state, 'Qa')
+
+    def test_unsupported_options_rejected(self):
+        data = project_to_json(["0", "1", "_"], ["0110", ""], PALINDROME, {}, tape_count=2)
+        project = project_from_json(data)
+        for options in ({"engine": "compiled"}, {"trace": TRACE_FULL}, {"detect_cycles": True}):
+            with self.subTest(options=options), self.assertRaises(ProjectError):
+                build_machine(project, "0110", **options)
+        tm = build_machine(project, "0110", engine="interpreter", trace=TRACE_OFF)
+        self.assertIsInstance(tm, MultiTapeTuringMachine)
+
+    def test_project_tape_list_required(self):
+        data = project_to_json(["0", "_"], "0", {}, {})
+        data["tape_count"] = 2
+        with self.assertRaises(ValueError):
+            project_from_json(data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from core.tape import Direction
+from core.ntm import NondeterministicTuringMachine, PersistentTape
+
+R, L, S = Direction.RIGHT, Direction.LEFT, Direction.STAY
+
+# Принимает строки над {a, b}, содержащие подстроку "abb": машина "угадывает" её начало
+CONTAINS_ABB = {
+    ('Q0', 'a'): [('a', R, 'Q0'), ('a', R, 'Q1')],
+    ('Q0', 'b'): [('b', R, 'Q0')],
+    ('Q1', 'b'): [('b', R, 'Q2')],
+    ('Q2', 'b'): [('b', S, 'Qa')],
+}
+
+# Ветвится бесконечно: пишет a или b и идёт вправо, принимает только после "ba"
+GUESS_BA = {
+    ('Q0', '_'): [('a', R, 'Q0'), ('b', R, 'Q1')],
+    ('Q1', '_'): [('a', S, 'Qa'), ('b', R, 'Q1')],
+}
+
+
+class TestPersistentTape(unittest.TestCase):
+    def test_copy_on_write(self):
+        tape = PersistentTape.from_string("abc")
+        other = tape.write(1, "x").write(200, "y")
+        self.assertEqual(str(tape), "abc")
+        self.assertEqual(other.read(1), "x")
+        self.assertEqual(other.read(200), "y")
+        self.assertIs(tape.write(200, "y").chunks[0], tape.chunks[0])
+        self.assertIs(tape.write(0, "a"), tape)
+        self.assertEqual(other.write(200, "_").write(1, "b").key(), tape.key())
+
+
+class TestNondeterministicMachine(unittest.TestCase):
+    def test_accepts_with_path(self):
+        for strategy in ("bfs", "iddfs"):
+            tm = NondeterministicTuringMachine('Q0', {'Qa'}, CONTAINS_ABB, "babbab")
+            self.assertTrue(tm.run(strategy))
+            self.assertEqual(len(tm.accepting_path), 4)
+            self.assertEqual(tm.accepting_path[1], ('Q0', 'a', 'a', R, 'Q1'))
+            self.assertEqual(tm.final_state, 'Qa')
+            self.assertGreater(tm.explored, 0)
+
+    def test_rejects(self):
+        for strategy in ("bfs", "iddfs"):
+            tm = NondeterministicTuringMachine('Q0', {'Qa'}, CONTAINS_ABB, "abababa")
+            self.assertFalse(tm.run(strategy))
+            self.assertFalse(tm.error_occurred)
+
+    def test_infinite_branching_finds_shortest_path(self):
+        for strategy in ("bfs", "iddfs"):
+            tm = NondeterministicTuringMachine('Q0', {'Qa'}, GUESS_BA, "", max_steps=20)
+            self.assertTrue(tm.run(strategy))
+            self.assertEqual(str(tm.final_tape), "ba")
+
+    def test_initial_state_final(self):
+        for strategy in ("bfs", "iddfs"):
+            tm = NondeterministicTuringMachine('Qa', {'Qa'}, {}, "1")
+            self.assertTrue(tm.run(strategy))
+            self.assertEqual(tm.accepting_path, [])
+            self.assertEqual((tm.final_state, tm.final_head, str(tm.final_tape)), ('Qa', 0, "1"))
+
+    def test_configuration_budget(self):
+        tm = NondeterministicTuringMachine('Q0', {'Qz'}, GUESS_BA, "", max_steps=100, max_configurations=50)
+        self.assertFalse(tm.run())
+        self.assertTrue(tm.error_occurred)
+
+    def test_deterministic_table(self):
+        table = {('Q0', 'a'): ('b', R, 'Q0'), ('Q0', '_'): ('_', S, 'Qa')}
+        tm = NondeterministicTuringMachine('Q0', {'Qa'}, table, "aaa")
+        self.assertTrue(tm.run())
+        self.assertEqual(str(tm.final_tape), "bbb")
+        self.assertEqual(len(tm.accepting_path), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import random
+import unittest
+
+from core.optimize import collapse_stays, optimize_machine, optimize_table
+from core.tape import Direction
+from tests.test_engine import INCREMENT, UNARY_ADD, make_machine
+
+R, L, S = Direction.RIGHT, Direction.LEFT, Direction.STAY
+
+# INCREMENT после генератора: копия Q1 под именем Q3, недостижимое Q4,
+# цепочка STAY Q2 -> Q5 -> Qa и правило из заключительного состояния
+BLOATED = {
+    ('Q0', '0'): ('0', R, 'Q0'),
+    ('Q0', '1'): ('1', R, 'Q0'),
+    ('Q0', '_'): ('_', L, 'Q1'),
+    ('Q1', '0'): ('1', S, 'Q2'),
+    ('Q1', '1'): ('0', L, 'Q3'),
+    ('Q1', '_'): ('1', S, 'Q2'),
+    ('Q3', '0'): ('1', S, 'Q2'),
+    ('Q3', '1'): ('0', L, 'Q1'),
+    ('Q3', '_'): ('1', S, 'Q2'),
+    ('Q2', '1'): ('1', S, 'Q5'),
+    ('Q5', '1'): ('1', S, 'Qa'),
+    ('Q4', '0'): ('1', R, 'Q0'),
+    ('Q4', '1'): ('1', S, 'Q4'),
+    ('Qa', '1'): ('1', R, 'Q0'),
+}
+
+
+def outcome(tm):
+    # Наблюдаемый результат: лента, головка, заключительное состояние и ошибка
+    return tm.tape.items(), tm.tape.head, tm.is_halted, tm.error_occurred, \
+        tm.current_state if tm.current_state in tm.final_states else None
+
+
+class TestOptimize(unittest.TestCase):
+    def assertSameResults(self, table, optimized, inputs, max_steps=10 ** 4):
+        for input_str in inputs:
+            for engine in ("interpreter", "compiled", "macro"):
+                before = make_machine(table, input_str, max_steps, engine=engine)
+                before.run()
+                after = make_machine(optimized, input_str, max_steps, engine=engine)
+                after.run()
+                self.assertEqual(outcome(after), outcome(before), (input_str, engine))
+                self.assertLessEqual(after.steps_done, before.steps_done)
+
+    def test_bloated_table(self):
+        table, report = optimize_table(BLOATED, 'Q0', {'Qa'})
+        self.assertEqual(report.unreachable, ['Q4'])
+        self.assertEqual(report.bypassed, ['Q2', 'Q5'])
+        self.assertEqual(report.merged, {'Q3': 'Q1'})
+        self.assertEqual(report.dead_rules, 1)
+        self.assertEqual(set(report.collapsed), {('Q1', '0'), ('Q1', '_')})
+        self.assertEqual(table[('Q1', '0')], ('1', S, 'Qa'))
+        self.assertEqual(table[('Q1', '1')], ('0', L, 'Q1'))
+        self.assertEqual((report.states_before, report.states_after), (6, 2))
+        self.assertEqual((report.rules_before, report.rules_after), (14, 6))
+        self.assertIn("Q3 → Q1", report.summary())
+
+        inputs = ['', '0', '1', '1011', '111', '10' * 20]
+        self.assertSameResults(BLOATED, table, inputs)
+        steps = []
+        for source in (BLOATED, table):
+            tm = make_machine(source, '1011')
+            tm.run()
+            self.assertEqual(tm.get_tape_output(), '1100')
+            steps.append(tm.steps_done)
+        self.assertEqual(steps, [10, 8])
+
+    def test_optimal_table_unchanged(self):
+        for source in (INCREMENT, UNARY_ADD):
+            table, report = optimize_table(source, 'Q0', {'Qa'})
+            self.assertFalse(report.changed)
+            self.assertEqual(table, source)
+            self.assertEqual(report.summary(), "Таблица уже оптимальна.")
+
+    def test_stay_chain_edge_cases(self):
+        table = {
+            ('Q0', 'a'): ('b', S, 'Q1'),
+            ('Q1', 'b'): ('c', S, 'Q2'),
+            ('Q2', 'b'): ('a', R, 'Q0'),
+            ('Q0', 'b'): ('b', S, 'Q3'),
+            ('Q3', 'b'): ('b', S, 'Q0'),
+        }
+        collapsed, saved = collapse_stays(table, {'Qa'})
+        # Q2 не читает c: ошибка «нет правила» остаётся в том же состоянии
+        self.assertEqual(collapsed[('Q0', 'a')], ('c', S, 'Q2'))
+        self.assertEqual(saved[('Q0', 'a')], 1)
+        # Бесконечный цикл из STAY оставлен как есть
+        self.assertEqual(collapsed[('Q0', 'b')], ('b', S, 'Q3'))
+        self.assertNotIn(('Q0', 'b'), saved)
+
+    def test_renumber(self):
+        table, report = optimize_table(BLOATED, 'Q0', {'Qa'}, renumber=True)
+        self.assertEqual(report.renamed, {'Q0': 'Q0', 'Q1': 'Q1'})
+        shuffled = {
+            (('Q7' if s == 'Q0' else s), sym): (w, d, ('Q7' if n == 'Q0' else n))
+            for (s, sym), (w, d, n) in INCREMENT.items()
+        }
+        table, report = optimize_table(shuffled, 'Q7', {'Qa'}, renumber=True)
+        self.assertEqual(table, INCREMENT)
+
+    def test_machine(self):
+        tm = make_machine(dict(BLOATED), '1011', engine="compiled")
+        report = optimize_machine(tm)
+        self.assertTrue(report.changed)
+        tm.run()
+        self.assertEqual((tm.get_tape_output(), tm.current_state), ('1100', 'Qa'))
+
+    def test_random_tables(self):
+        rng = random.Random(7)
+        symbols = ['_', '0', '1']
+        for _ in range(200):
+            states = [f"Q{i}" for i in range(rng.randint(1, 6))]
+            table = {}
+            for state in states:
+                for symbol in symbols:
+                    if rng.random() < 0.85:
+                        table[(state, symbol)] = (
+                            rng.choice(symbols), rng.choice((L, R, S, S)), rng.choice(states + ['Qa'])
+                        )
+            optimized, report = optimize_table(table, 'Q0', {'Qa'})
+            self.assertLessEqual(report.states_after, report.states_before)
+            inputs = [''.join(rng.choice('01') for _ in range(rng.randint(0, 8))) for _ in range(5)]
+            for input_str in inputs:
+                before = make_machine(table, input_str, 500)
+                before.run()
+                if before.error_occurred and not before.error_message.startswith("Ошибка"):
+                    continue
+                after = make_machine(optimized, input_str, 500)
+                after.run()
+                self.assertEqual(outcome(after), outcome(before), (table, input_str))
+                self.assertLessEqual(after.steps_done, before.steps_done)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from core.engine import ChunkedRun
+from core.tape import Direction, RleTape, TuringTape
+from tests.test_breakpoints import collect_hits
+from tests.test_engine import BOUNCE, ERASE_AND_ESCAPE, INCREMENT, UNARY_ADD, make_machine
+
+ENGINES = ("interpreter", "compiled", "macro")
+
+
+def profile_of(tm):
+    profile = tm.profile
+    return profile.hits(), profile.state_hits(), (profile.head_min, profile.head_max), profile.extent
+
+
+class TestProfile(unittest.TestCase):
+    def assertSameProfiles(self, table, input_str, max_steps=10 ** 4, setup=None):
+        results = []
+        for engine in ENGINES:
+            for tape_class in (TuringTape, RleTape):
+                tm = make_machine(table, input_str, max_steps, engine=engine, tape_class=tape_class)
+                tm.start_profiling()
+                if setup is not None:
+                    setup(tm.breakpoints)
+                    collect_hits(tm)
+                else:
+                    tm.run()
+                self.assertEqual(tm.profile.total, tm.steps_done)
+                results.append(profile_of(tm))
+        for result in results[1:]:
+            self.assertEqual(result, results[0])
+        return results[0]
+
+    def test_increment(self):
+        hits, states, head, extent = self.assertSameProfiles(INCREMENT, '1011')
+        self.assertEqual(hits, {('Q0', '0'): 1, ('Q0', '1'): 3, ('Q0', '_'): 1, ('Q1', '1'): 2, ('Q1', '0'): 1})
+        self.assertEqual(states, {'Q0': 5, 'Q1': 3})
+        self.assertEqual((head, extent), ((0, 4), (0, 3)))
+
+    def test_sweeps_are_counted(self):
+        hits, states, head, extent = self.assertSameProfiles(UNARY_ADD, '1' * 40 + '0' + '1' * 25)
+        self.assertEqual(hits[('Q0', '1')], 40)
+        self.assertEqual(hits[('Q3', '1')], 65)
+        self.assertEqual((head, extent), ((-1, 66), (0, 64)))
+
+    def test_escape_into_blank(self):
+        hits, _, head, extent = self.assertSameProfiles(ERASE_AND_ESCAPE, 'aaa', max_steps=10 ** 5)
+        self.assertEqual(hits[('Q2', '_')], 10 ** 5 - 8)
+        self.assertEqual((head, extent), ((-10 ** 5 + 6, 3), None))
+
+    def test_breakpoints(self):
+        def setup(bp):
+            bp.add_transition('Q1', '1')
+            bp.add_state('Q3')
+            bp.add_step(7)
+        self.assertSameProfiles(UNARY_ADD, '111011', setup=setup)
+
+    def test_no_rule(self):
+        hits, *_ = self.assertSameProfiles(BOUNCE, 'a')
+        self.assertEqual(sum(hits.values()), 3)
+
+    def test_hot_rules_and_stop(self):
+        tm = make_machine(UNARY_ADD, '1' * 5 + '0' + '1' * 3)
+        profile = tm.start_profiling()
+        tm.run()
+        self.assertEqual(profile.hot_rules(2), [(('Q3', '1'), 8), (('Q0', '1'), 5)])
+        self.assertIs(tm.stop_profiling(), profile)
+        self.assertIsNone(tm.profile)
+
+    def test_chunked_run_flushes_on_finish(self):
+        tm = make_machine(UNARY_ADD, '1' * 30 + '0' + '1' * 30, engine="macro")
+        profile = tm.start_profiling()
+        run = ChunkedRun(tm, macro=True)
+        while not run.advance(7):
+            self.assertEqual(profile.total, 0)
+        run.finish()
+        self.assertEqual(profile.total, tm.steps_done)
+
+    def test_rule_added_during_profiling(self):
+        table = dict(BOUNCE)
+        tm = make_machine(table, 'a')
+        profile = tm.start_profiling()
+        table[('Q0', '_')] = ('_', Direction.STAY, 'Qa')
+        tm.run()
+        self.assertEqual(profile.hits()[('Q0', '_')], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+
+from core.batch import np
+from core.tape import Direction
+from core.project import project_to_json, load_project, build_machine
+from core.run import main
+from tests.test_engine import INCREMENT, RUNAWAY
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp.name, "increment.json")
+        with open(self.project, "w", encoding="utf-8") as f:
+            json.dump(project_to_json(["0", "1", "_"], "", INCREMENT, {"task": "", "comments": ""}), f)
+        self.inputs = os.path.join(self.tmp.name, "inputs.txt")
+        with open(self.inputs, "w", encoding="utf-8") as f:
+            f.write("\n".join(["1011", "111", "", "10x"]) + "\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_main(self, *args):
+        output = os.path.join(self.tmp.name, "results.jsonl")
+        code = main([self.project, "-i", self.inputs, "-o", output, *args])
+        self.assertEqual(code, 0)
+        with open(output, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_project_round_trip(self):
+        self.assertEqual(load_project(self.project)["transitions"], INCREMENT)
+
+    def test_results(self):
+        results = self.run_main("-j", "1")
+        self.assertEqual([r["input"] for r in results], ["1011", "111", "", "10x"])
+        self.assertEqual([r["tape"] for r in results[:3]], ["1100", "1000", "1"])
+        self.assertEqual(results[0]["state"], "Qa")
+        self.assertIsNone(results[0]["error"])
+        self.assertIn("'x'", results[3]["error"])
+
+    def test_process_pool_matches_sequential(self):
+        for engine in ("interpreter", "compiled", "macro", "codegen"):
+            self.assertEqual(
+                self.run_main("-j", "2", "--chunksize", "1", "--engine", engine),
+                self.run_main("-j", "1")
+            )
+
+    @unittest.skipUnless(np is not None, "NumPy не установлен")
+    def test_batch_engine_matches_sequential(self):
+        self.assertEqual(self.run_main("--engine", "batch"), self.run_main("-j", "1"))
+
+    def test_detect_cycles(self):
+        bounce = {
+            ('Q0', '1'): ('1', Direction.RIGHT, 'Q1'),
+            ('Q1', '_'): ('_', Direction.LEFT, 'Q0'),
+        }
+        with open(self.project, "w", encoding="utf-8") as f:
+            json.dump(project_to_json(["1", "_"], "", bounce, {}), f)
+        with open(self.inputs, "w", encoding="utf-8") as f:
+            f.write("1\n0\n")
+        results = self.run_main("-j", "1", "--detect-cycles")
+        self.assertEqual(results[0]["cycle"], [3, 2])
+        self.assertIsNone(results[1]["cycle"])
+        self.assertIsNotNone(results[1]["error"])
+
+    def test_step_limit(self):
+        project = {"alphabet": ["1", "_"], "tape": "", "transitions": RUNAWAY, "notes": {}}
+        tm = build_machine(project, "", max_steps=10, engine="compiled")
+        tm.run()
+        self.assertTrue(tm.error_occurred)
+        self.assertEqual(tm.get_tape_output(), "1" * 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
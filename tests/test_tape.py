@@ -1,5 +1,5 @@
 import unittest
-from core.tape import TuringTape, Direction
+from core.tape import TuringTape, ArrayTape, BitTape, RleTape, Direction, make_tape
 
 class TestTuringTape(unittest.TestCase):
     def test_initialization(self):
@@ -26,5 +26,256 @@ class TestTuringTape(unittest.TestCase):
         self.assertIn("[a]", snapshot)
         self.assertIn("b", snapshot)
 
+
+class TestTapeBackends(unittest.TestCase):
+    def exercise(self, tape):
+        tape.write("1")
+        tape.move(Direction.LEFT, 100)
+        tape.write("1")
+        tape.set_symbol(-3, "1")
+        tape.set_symbol(-3, "_")
+        tape.move(Direction.RIGHT, 250)
+        tape.write("1")
+        tape.move(Direction.STAY)
+        return tape
+
+    def test_backends_match_dict_tape(self):
+        reference = self.exercise(TuringTape("1_1", "_"))
+        for tape in (ArrayTape("1_1", "_"), BitTape("1_1", "_"), RleTape("1_1", "_")):
+            self.exercise(tape)
+            self.assertEqual(tape.items(), reference.items())
+            self.assertEqual(str(tape), str(reference))
+            self.assertEqual(tape.head, reference.head)
+            self.assertEqual(tape.read(), reference.read())
+            self.assertEqual(tape.get_tape_snapshot(3), reference.get_tape_snapshot(3))
+
+    def test_array_tape_reset_and_restore(self):
+        tape = ArrayTape("abc", "_")
+        tape.reset("xyz")
+        self.assertEqual(str(tape), "xyz")
+        tape.restore({-5: "a", 2: "b", 3: "_"}, -5)
+        self.assertEqual(tape.read(), "a")
+        self.assertEqual(str(tape), "a______b")
+
+    def test_bit_tape_rejects_second_symbol(self):
+        tape = BitTape("11", "_")
+        with self.assertRaises(ValueError):
+            tape.write("0")
+
+    def test_rle_tape_random_edits(self):
+        import random
+        rng = random.Random(7)
+        reference = TuringTape("aab_ba", "_")
+        tape = RleTape("aab_ba", "_")
+        for _ in range(2000):
+            op = rng.randrange(4)
+            if op == 0:
+                symbol = rng.choice("ab__")
+                reference.write(symbol)
+                tape.write(symbol)
+            elif op == 1:
+                direction = rng.choice([Direction.LEFT, Direction.RIGHT])
+                steps = rng.randrange(1, 4)
+                reference.move(direction, steps)
+                tape.move(direction, steps)
+            elif op == 2:
+                pos, symbol = rng.randrange(-20, 20), rng.choice("ab_")
+                reference.set_symbol(pos, symbol)
+                tape.set_symbol(pos, symbol)
+            else:
+                tape.head = reference.head = rng.randrange(-30, 30)
+            self.assertEqual(tape.read(), reference.read())
+        self.assertEqual(tape.items(), reference.items())
+        self.assertEqual(str(tape), str(reference))
+        tape.restore(dict(reference.items()), 3)
+        self.assertEqual(tape.items(), reference.items())
+        self.assertEqual(tape.get_symbol(3), reference.get_symbol(3))
+
+    def test_rle_tape_block_operations(self):
+        tape = RleTape("111011", "_")
+        self.assertEqual(tape.blocks(), [(0, "1", 3), (3, "0", 1), (4, "1", 2)])
+        self.assertEqual(tape.run_length(Direction.RIGHT), 3)
+        tape.fill_run("x", 3, Direction.RIGHT)
+        self.assertEqual(tape.head, 3)
+        self.assertEqual(str(tape), "xxx011")
+        tape.move(Direction.RIGHT, 3)
+        self.assertIsNone(tape.run_length(Direction.RIGHT))
+        tape.fill_run("1", 10 ** 9, Direction.RIGHT)
+        self.assertEqual(tape.head, 6 + 10 ** 9)
+        self.assertEqual(tape.blocks()[-1], (4, "1", 2 + 10 ** 9))
+        tape.head = 1
+        self.assertEqual(tape.run_length(Direction.LEFT), 2)
+        tape.fill_run("_", 2, Direction.LEFT)
+        self.assertEqual(tape.head, -1)
+        self.assertEqual(tape.blocks()[0], (2, "x", 1))
+
+    def assertSameNavigation(self, tape, reference):
+        self.assertEqual(tape.extent(), reference.extent())
+        self.assertEqual(tape.image(), reference.image())
+        for pos in range(-80, 80, 7):
+            self.assertEqual(tape.next_nonblank(pos), reference.next_nonblank(pos), pos)
+            self.assertEqual(tape.prev_nonblank(pos), reference.prev_nonblank(pos), pos)
+            self.assertEqual(tape.span(pos, pos + 13), reference.span(pos, pos + 13), pos)
+
+    def test_extent_and_navigation(self):
+        import io
+        import random
+        rng = random.Random(11)
+        reference = TuringTape("1_11", "_")
+        tapes = [ArrayTape("1_11", "_"), BitTape("1_11", "_"), RleTape("1_11", "_")]
+        for step in range(1500):
+            pos, symbol = rng.randrange(-60, 60), rng.choice("11__")
+            if step % 500 == 250:
+                # Стирание всей ленты: крайние позиции пересчитываются с нуля
+                for tape in tapes + [reference]:
+                    for cell, _ in tape.items():
+                        tape.set_symbol(cell, "_")
+            for tape in tapes + [reference]:
+                tape.set_symbol(pos, symbol)
+            if step % 50 == 0:
+                for tape in tapes:
+                    self.assertSameNavigation(tape, reference)
+        for tape in tapes:
+            self.assertSameNavigation(tape, reference)
+            self.assertEqual(str(tape), str(reference))
+            out = io.StringIO()
+            self.assertEqual(tape.export(out, chunk=7), (reference.extent()[0], len(str(reference))))
+            self.assertEqual(out.getvalue(), str(reference))
+
+    def test_extent_after_erasing_edges(self):
+        # Крайние ячейки в разных кусках буфера, между ними пустые куски
+        cells = [-20000, -9000, -8999, 3, 4100, 12000, 30001]
+        for cls in (ArrayTape, BitTape, RleTape):
+            tape = cls("1", "_")
+            for pos in cells:
+                tape.set_symbol(pos, "1")
+            remaining = sorted(set(cells) | {0})
+            while remaining:
+                self.assertEqual(tape.extent(), (remaining[0], remaining[-1]), cls.__name__)
+                pos = remaining.pop(0 if len(remaining) % 2 else -1)
+                tape.set_symbol(pos, "_")
+            self.assertIsNone(tape.extent(), cls.__name__)
+            tape.load("11", 5000)
+            self.assertEqual(tape.extent(), (5000, 5001), cls.__name__)
+
+    def test_far_write_falls_back_to_dict(self):
+        for cls in (ArrayTape, BitTape):
+            tape = cls("11", "_", ["1", "_"])
+            tape.head = 1
+            changes = []
+            tape.add_observer(type("Observer", (), {"on_tape_changed": lambda _, c: changes.append(c)})())
+            tape.set_symbol(10 ** 9, "1")
+            self.assertIs(type(tape), TuringTape, cls.__name__)
+            self.assertEqual(tape.items(), [(0, "1"), (1, "1"), (10 ** 9, "1")])
+            self.assertEqual((tape.extent(), tape.head, len(changes)), ((0, 10 ** 9), 1, 1))
+            # Пустой буфер не разрастается, а переносится к записи
+            tape = cls("", "_", ["1", "_"])
+            tape.set_symbol(-10 ** 9, "1")
+            tape.set_symbol(-10 ** 9 + 3, "1")
+            self.assertIs(type(tape), cls)
+            self.assertEqual(tape.extent(), (-10 ** 9, -10 ** 9 + 3))
+
+    def test_empty_tape_navigation(self):
+        import io
+        for tape in (TuringTape("", "_"), ArrayTape("", "_"), BitTape("", "_"), RleTape("", "_")):
+            self.assertIsNone(tape.extent())
+            self.assertIsNone(tape.next_nonblank(0))
+            self.assertIsNone(tape.prev_nonblank(0))
+            self.assertEqual(tape.span(-2, 2), "_____")
+            self.assertEqual(tape.export(io.StringIO()), (0, 0))
+            tape.set_symbol(-5, "1")
+            self.assertEqual(tape.extent(), (-5, -5))
+            self.assertEqual((tape.next_nonblank(-100), tape.prev_nonblank(100)), (-5, -5))
+            self.assertEqual(tape.span(-6, -4), "_1_")
+
+    def test_cell_index(self):
+        import random
+        from core.tape import CellIndex
+        rng = random.Random(5)
+        positions = set(rng.sample(range(-5000, 5000), 3000))
+        index = CellIndex(positions)
+        # Маленькие корзины, чтобы проверить их деление и удаление
+        small = CellIndex()
+        small.LOAD = 4
+        for pos in positions:
+            small.add(pos)
+        for _ in range(5000):
+            pos = rng.randrange(-6000, 6000)
+            if rng.random() < 0.5:
+                index.add(pos)
+                small.add(pos)
+                positions.add(pos)
+            else:
+                index.discard(pos)
+                small.discard(pos)
+                positions.discard(pos)
+        ordered = sorted(positions)
+        for cells in (index, small):
+            self.assertEqual(list(cells), ordered)
+            self.assertEqual((len(cells), cells.first(), cells.last()), (len(ordered), ordered[0], ordered[-1]))
+            for pos in range(-6100, 6100, 37):
+                self.assertEqual(cells.next_after(pos), min((p for p in ordered if p > pos), default=None))
+                self.assertEqual(cells.prev_before(pos), max((p for p in ordered if p < pos), default=None))
+
+    def test_make_tape_by_alphabet_size(self):
+        self.assertIsInstance(make_tape("101", "0", {"0", "1"}), BitTape)
+        self.assertIsInstance(make_tape("ab", "_", {"a", "b"}), ArrayTape)
+        self.assertIs(type(make_tape("", "_", {chr(i) for i in range(300)})), TuringTape)
+        self.assertIsInstance(make_tape("ab", "_", {"a", "b"}, backend="rle"), RleTape)
+
+
+class RecordingObserver:
+    def __init__(self):
+        self.changes = []
+
+    def on_tape_changed(self, change):
+        self.changes.append(change)
+
+
+class TestTapeNotifications(unittest.TestCase):
+    def test_single_operations(self):
+        for tape in (TuringTape("ab", "_"), RleTape("ab", "_")):
+            observer = RecordingObserver()
+            tape.add_observer(observer)
+            tape.write("x")
+            tape.move(Direction.RIGHT)
+            tape.move(Direction.STAY)
+            tape.reset("a")
+            self.assertEqual(len(observer.changes), 4)
+            self.assertEqual(observer.changes[0].cells, {0})
+            self.assertEqual(observer.changes[1].head_delta, 1)
+            # STAY тоже оповещает наблюдателей, как и прежде
+            self.assertEqual(observer.changes[2].head_delta, 0)
+            self.assertEqual(observer.changes[2].cells, set())
+            self.assertTrue(observer.changes[3].full)
+
+    def test_batch_coalesces_changes(self):
+        for tape in (TuringTape("ab", "_"), RleTape("ab", "_")):
+            observer = RecordingObserver()
+            tape.add_observer(observer)
+            with tape.batch():
+                tape.write("x")
+                tape.move(Direction.RIGHT)
+                with tape.batch():
+                    tape.write("y")
+                    tape.set_symbol(-4, "z")
+                    tape.move(Direction.LEFT, 3)
+                self.assertEqual(observer.changes, [])
+            self.assertEqual(len(observer.changes), 1)
+            change = observer.changes[0]
+            self.assertEqual(change.cells, {0, 1, -4})
+            self.assertEqual(change.head_delta, -2)
+            self.assertFalse(change.full)
+
+    def test_large_batch_becomes_full(self):
+        tape = TuringTape("", "_")
+        observer = RecordingObserver()
+        tape.add_observer(observer)
+        with tape.batch():
+            for pos in range(200):
+                tape.set_symbol(pos, "a")
+        self.assertTrue(observer.changes[0].full)
+        self.assertEqual(observer.changes[0].cells, set())
+
 if __name__ == '__main__':
     unittest.main()
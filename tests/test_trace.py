@@ -0,0 +1,49 @@
+import unittest
+from core.tape import TuringTape, Direction
+from core.machine import TuringMachine
+from core.trace import ExecutionTrace
+from tests.test_engine import INCREMENT, RUNAWAY
+
+
+def make_machine(table, input_str, **kwargs):
+    return TuringMachine('Q0', {'Qa'}, table, TuringTape(input_str, '_'), {'0', '1', '_'}, **kwargs)
+
+
+class TestExecutionTrace(unittest.TestCase):
+    def test_full_trace_matches_steps(self):
+        tm = make_machine(INCREMENT, '1011')
+        tm.run()
+        self.assertEqual(len(tm.trace), tm.steps_done)
+        self.assertEqual(tm.trace[0], ('Q0', '1', '1', Direction.RIGHT, 'Q0'))
+        self.assertEqual(tm.trace[-1], ('Q1', '0', '1', Direction.STAY, 'Qa'))
+        self.assertEqual(len(list(tm.trace)), tm.steps_done)
+
+    def test_ring_buffer_keeps_last_steps(self):
+        full = make_machine(INCREMENT, '100111')
+        full.run()
+        tm = make_machine(INCREMENT, '100111', trace="last", trace_limit=4)
+        tm.run()
+        self.assertEqual(len(tm.trace), 4)
+        self.assertEqual(tm.trace.total, tm.steps_done)
+        self.assertEqual(list(tm.trace), list(full.trace)[-4:])
+        with self.assertRaises(IndexError):
+            tm.trace[4]
+
+    def test_off(self):
+        tm = make_machine(RUNAWAY, '', trace="off", max_steps=100)
+        tm.run()
+        self.assertEqual(len(tm.trace), 0)
+        self.assertEqual(tm.trace.memory_usage(), 0)
+
+    def test_memory_is_bounded(self):
+        tm = make_machine(RUNAWAY, '', trace="last", trace_limit=10, max_steps=5000)
+        tm.run()
+        self.assertEqual(tm.trace.memory_usage(), ExecutionTrace("last", 10).memory_usage())
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            ExecutionTrace("sometimes")
+
+
+if __name__ == '__main__':
+    unittest.main()